@@ -0,0 +1,90 @@
+"""
+来源分布分配基准测试（LLMProcessor._enforce_strict_distribution / _fallback_select）
+用法：python benchmarks/bench_distribution.py [--sizes 1000 5000 ...] [--feeds N] [--repeat N]
+随机生成候选池，模拟模型返回的预选结果集中在少数来源，分别测量小目标（日报 25 篇）
+和大目标（候选数的 10%）两种场景的耗时，并校验单源上限、去重和篇数
+"""
+import os
+import io
+import sys
+import time
+import random
+import argparse
+import contextlib
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from daily_report_generator import LLMProcessor
+
+DEFAULT_SIZES = [1000, 5000, 10000, 20000, 50000]
+
+
+def make_pool(size: int, feeds: int, seed: int = 42) -> list:
+    """来源大小服从长尾分布，少数来源贡献大部分文章"""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(feeds)]
+    names = rng.choices([f'feed-{i:03d}' for i in range(feeds)], weights=weights, k=size)
+    return [{'id': i + 1, 'feed_name': name, 'quality_score': rng.randint(0, 100)}
+            for i, name in enumerate(names)]
+
+
+def llm_like_selection(pool: list, count: int, seed: int = 7) -> list:
+    """模拟模型的预选结果：偏向最大的几个来源"""
+    rng = random.Random(seed)
+    top_feeds = {name for name, _ in Counter(a['feed_name'] for a in pool).most_common(3)}
+    biased = [a for a in pool if a['feed_name'] in top_feeds]
+    return rng.sample(biased, min(count, len(biased)))
+
+
+def check(result: list, final_limit: int, max_per_feed: int, strict: bool):
+    ids = [a['id'] for a in result]
+    assert len(ids) == len(set(ids)), "结果中有重复文章"
+    assert len(result) <= final_limit, "结果超过目标篇数"
+    if strict and result:
+        assert max(Counter(a['feed_name'] for a in result).values()) <= max_per_feed, "单源超过上限"
+
+
+def bench(func, repeat: int) -> float:
+    """返回单次调用的平均耗时（毫秒），屏蔽函数内的日志输出"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        func()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="来源分布分配基准测试")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="候选池大小")
+    parser.add_argument('--feeds', type=int, default=60, help="来源数量")
+    parser.add_argument('--max-per-feed', type=int, default=8)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"来源数: {args.feeds}  单源上限: {args.max_per_feed}  重复: {args.repeat}")
+    print(f"{'候选数':>8} {'目标':>6} {'单源上限':>8} {'enforce ms':>12} {'fallback ms':>12} {'fallback µs/篇':>15}")
+
+    for size in args.sizes:
+        pool = make_pool(size, args.feeds)
+        selected = llm_like_selection(pool, 40)
+        for final_limit in (25, size // 10):
+            # 大目标按比例放宽单源上限，保证各来源需要多轮分配
+            max_per_feed = args.max_per_feed if final_limit == 25 else max(args.max_per_feed, final_limit // 20)
+            with contextlib.redirect_stdout(io.StringIO()):
+                enforced = LLMProcessor._enforce_strict_distribution(selected, pool, final_limit, max_per_feed)
+                fallback = LLMProcessor._fallback_select(pool, final_limit, max_per_feed)
+            # 来源都达到上限时 enforce 会用超标文章补位，只校验去重和篇数
+            check(enforced, max(final_limit, len(selected)), max_per_feed, strict=False)
+            check(fallback, final_limit, max_per_feed, strict=True)
+
+            enforce_ms = bench(lambda: LLMProcessor._enforce_strict_distribution(
+                selected, pool, final_limit, max_per_feed), args.repeat)
+            fallback_ms = bench(lambda: LLMProcessor._fallback_select(pool, final_limit, max_per_feed), args.repeat)
+            print(f"{size:>8} {final_limit:>6} {max_per_feed:>8} {enforce_ms:>12.2f} {fallback_ms:>12.2f} "
+                  f"{fallback_ms * 1000 / size:>15.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+HTML 清洗后端基准测试
+用法：python benchmarks/bench_html_cleaner.py [HTML目录] [--repeat N]
+默认使用 benchmarks/fixtures/html 下的样本，另外把最长的样本重复 30 次模拟超长页面
+fixtures/html 中是手工编写的合成样本（模仿新闻页、技术博客、公众号文章的结构，链接和 id 为占位符），
+只用于快速比较和冒烟测试；评估真实效果时请把抓取到的订阅源/网页 HTML 保存到一个目录，并作为参数传入
+"""
+import os
+import sys
+import time
+import argparse
+import difflib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from html_cleaner import HtmlCleaner, HAS_LXML, HAS_SELECTOLAX
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'html')
+
+
+def load_corpus(directory: str) -> dict:
+    corpus = {}
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(('.html', '.htm')):
+            with open(os.path.join(directory, name), 'rb') as f:
+                corpus[name] = f.read()
+    if corpus:
+        longest = max(corpus, key=lambda k: len(corpus[k]))
+        corpus[f'{longest} x30'] = corpus[longest] * 30
+    return corpus
+
+
+def bench(cleaner: HtmlCleaner, html: bytes, repeat: int) -> float:
+    """返回单次清洗的平均耗时（毫秒）"""
+    cleaner.clean(html)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        cleaner.clean(html)
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="HTML 清洗后端基准测试")
+    arg_parser.add_argument('directory', nargs='?', default=FIXTURE_DIR,
+                            help="HTML 样本目录，默认为内置的合成样本")
+    arg_parser.add_argument('--repeat', type=int, default=200)
+    args = arg_parser.parse_args()
+
+    corpus = load_corpus(args.directory)
+    if not corpus:
+        print(f"{args.directory} 中没有 HTML 样本")
+        return
+
+    backends = ['bs4', 'stdlib']
+    if HAS_LXML:
+        backends.append('lxml')
+    if HAS_SELECTOLAX:
+        backends.append('selectolax')
+    cleaners = {name: HtmlCleaner(name) for name in backends}
+
+    header = f"{'样本':<28}{'大小KB':>8}" + ''.join(f"{name:>12}" for name in backends)
+    print(header)
+    print('-' * len(header))
+    totals = dict.fromkeys(backends, 0.0)
+    for name, html in corpus.items():
+        row = f"{name:<28}{len(html) / 1024:>8.1f}"
+        for backend in backends:
+            ms = bench(cleaners[backend], html, args.repeat)
+            totals[backend] += ms
+            row += f"{ms:>10.3f}ms"
+        print(row)
+
+    print('-' * len(header))
+    print(f"{'合计':<36}" + ''.join(f"{totals[b]:>10.3f}ms" for b in backends))
+    print(f"{'相对 bs4':<36}" + ''.join(f"{totals['bs4'] / totals[b]:>11.1f}x" for b in backends))
+
+    # 输出一致性：与 bs4 结果的相似度
+    print("\n与 bs4 输出的相似度")
+    for name, html in corpus.items():
+        reference = cleaners['bs4'].clean(html)
+        ratios = []
+        for backend in backends[1:]:
+            text = cleaners[backend].clean(html)
+            ratio = 1.0 if text == reference else difflib.SequenceMatcher(None, reference, text).ratio()
+            ratios.append(f"{backend}={ratio:.3f}")
+        print(f"  {name:<28}" + '  '.join(ratios))
+
+
+if __name__ == '__main__':
+    main()
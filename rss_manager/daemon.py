@@ -0,0 +1,341 @@
+"""
+无界面后台服务 - 按计划循环执行 抓取 → 摘要 → 日报，不依赖 PyQt
+用法：python main.py --headless [--once]
+"""
+import os
+import sys
+import io
+import json
+import signal
+import threading
+import contextlib
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from typing import Dict, Optional
+import logging
+
+from database import Database
+from fetcher import RSSFetcher, Summarizer
+from scheduler import FeedScheduler
+from summary_queue import SummaryJobRunner
+
+logger = logging.getLogger(__name__)
+
+# 上次生成日报的日期，保存在 settings 表，重启后不会重复生成
+LAST_REPORT_SETTING = 'daemon_last_report_date'
+
+
+class JsonLogFormatter(logging.Formatter):
+    """每条日志输出为一行 JSON，便于 jq / 日志采集处理"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created).strftime('%Y-%m-%d %H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        # 通过 extra={'event': ..., 'data': {...}} 附带的结构化字段
+        for key in ('event', 'data'):
+            if hasattr(record, key):
+                entry[key] = getattr(record, key)
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def setup_logging(log_file: str = None, level: str = 'INFO'):
+    """替换根日志记录器的输出：写 JSON 行到 stderr，配置了 log_file 时同时写入滚动文件"""
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    formatter = JsonLogFormatter()
+    handlers = [logging.StreamHandler(sys.stderr)]
+    if log_file:
+        log_dir = os.path.dirname(log_file)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        handlers.append(RotatingFileHandler(log_file, maxBytes=10 * 1024 * 1024,
+                                            backupCount=5, encoding='utf-8'))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        root.addHandler(handler)
+    root.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+
+
+class _LogWriter(io.TextIOBase):
+    """把 print 输出逐行转发到日志（日报生成器内部使用 print）"""
+
+    def __init__(self, target: logging.Logger):
+        self.target = target
+        self._buffer = ''
+
+    def write(self, text: str) -> int:
+        self._buffer += text
+        while '\n' in self._buffer:
+            line, self._buffer = self._buffer.split('\n', 1)
+            if line.strip():
+                self.target.info(line.strip())
+        return len(text)
+
+    def flush(self):
+        if self._buffer.strip():
+            self.target.info(self._buffer.strip())
+        self._buffer = ''
+
+
+class PidLock:
+    """
+    PID 文件 + 排他文件锁，保证同一数据库只有一个后台进程
+    进程异常退出时锁随文件描述符自动释放，不会留下僵死锁
+    退出时只清空文件而不删除：删除会让等待中的进程锁住已被删除的旧文件，
+    同时另一个进程新建同名文件也能加锁，导致两个后台进程同时运行
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def acquire(self):
+        self._file = open(self.path, 'a+')
+        try:
+            self._lock(self._file)
+        except OSError:
+            self._file.seek(0)
+            owner = self._file.read().strip()
+            self._file.close()
+            self._file = None
+            raise RuntimeError(f"后台服务已在运行 (PID {owner or '未知'})，锁文件: {self.path}")
+
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.write(str(os.getpid()))
+        self._file.flush()
+
+    def release(self):
+        if not self._file:
+            return
+        try:
+            self._file.seek(0)
+            self._file.truncate()
+            self._unlock(self._file)
+        finally:
+            self._file.close()
+            self._file = None
+
+    @staticmethod
+    def _lock(f):
+        try:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except ImportError:
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+
+    @staticmethod
+    def _unlock(f):
+        try:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        except ImportError:
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class RSSDaemon:
+    """
+    后台服务主循环
+    - 每个周期抓取到期的订阅源（与 GUI 共用 FeedScheduler 的调度状态）
+    - 为最近的新文章生成摘要（任务存放在数据库队列中，中断后下个周期继续）
+    - 每天到达 daemon_report_time 后生成一次日报
+    - 收到 SIGTERM / SIGINT 后完成当前步骤再退出，不会中断正在写入的数据
+    """
+
+    def __init__(self, config: Dict):
+        self.config = config
+        self.db = Database(config.get('database_path', 'rss_data.db'))
+
+        api_key = config.get('openai_api_key', '')
+        base_url = config.get('openai_base_url', 'http://localhost:11434/v1')
+        model_name = config.get('openai_model_name', 'qwen3:8b')
+
+        self.fetcher = RSSFetcher(
+            self.db,
+            max_workers=config.get('fetch_max_workers', 8),
+            per_host_limit=config.get('fetch_per_host_limit', 2),
+            fetch_deadline=config.get('fetch_deadline_seconds', 600),
+            max_feed_bytes=config.get('fetch_max_feed_mb', 10) * 1024 * 1024,
+            max_age_days=config.get('fetch_max_age_days', 3),
+            html_cleaner_backend=config.get('html_cleaner_backend', 'auto')
+        )
+        self.summarizer = Summarizer(self.db, api_key=api_key, base_url=base_url, model_name=model_name)
+        # 摘要任务从数据库队列领取，可与 GUI 或其他后台进程同时运行
+        self.summary_runner = SummaryJobRunner(self.db, self.summarizer,
+                                               lease_seconds=config.get('summary_job_lease_seconds', 600))
+        self.scheduler = FeedScheduler(
+            self.db,
+            min_interval=config.get('fetch_min_interval_minutes', 15) * 60,
+            max_interval=config.get('fetch_max_interval_hours', 24) * 3600,
+            default_interval=config.get('fetch_interval_hours', 24) * 3600
+        )
+
+        self.llm_config = {
+            'api_key': api_key or 'ollama',
+            'base_url': base_url,
+            'model': config.get('daemon_report_model_name', model_name),
+            'prompt_token_budget': config.get('report_prompt_token_budget', 6000),
+            'select_max_workers': config.get('report_select_max_workers', 4),
+        }
+        self.tick_seconds = max(5, config.get('daemon_tick_seconds', 60))
+        self.summary_batch = config.get('daemon_summary_batch', 50)
+        self.report_time = self._parse_time(config.get('daemon_report_time', '08:00'))
+        self.report_dir = config.get('daemon_report_dir', 'Daily')
+
+        self._stop = threading.Event()
+
+    @staticmethod
+    def _parse_time(value: Optional[str]):
+        """'HH:MM' -> (时, 分)；为空时不生成日报"""
+        if not value:
+            return None
+        try:
+            hour, minute = (int(part) for part in str(value).split(':', 1))
+            return hour, minute
+        except ValueError:
+            logger.warning(f"daemon_report_time 格式应为 HH:MM，当前为 {value!r}，已关闭日报生成")
+            return None
+
+    def stop(self, signum=None, frame=None):
+        if not self._stop.is_set():
+            logger.info("收到停止信号，完成当前步骤后退出", extra={'event': 'stopping', 'data': {'signal': signum}})
+        self._stop.set()
+
+    @property
+    def stopping(self) -> bool:
+        return self._stop.is_set()
+
+    def install_signal_handlers(self):
+        signal.signal(signal.SIGINT, self.stop)
+        if hasattr(signal, 'SIGTERM'):
+            signal.signal(signal.SIGTERM, self.stop)
+
+    # ---------- 各步骤 ----------
+
+    def fetch(self) -> Dict:
+        result = self.scheduler.run(self.fetcher, due_only=True)
+        if result['total_feeds']:
+            logger.info("抓取完成", extra={'event': 'fetch', 'data': {
+                'feeds': result['total_feeds'],
+                'new_articles': result['new_articles'],
+                'duplicates': result.get('duplicate_articles', 0),
+                'failed': len(result.get('failed_feed_ids', [])),
+            }})
+        return result
+
+    def summarize(self) -> Dict:
+        """把最近的待摘要文章加入任务队列，再从队列领取任务处理；每批之间检查停止信号"""
+        queued = self.db.enqueue_pending_summaries(days_ago=1)
+        if queued:
+            logger.info("摘要任务入队", extra={'event': 'enqueue', 'data': {'queued': queued}})
+        totals = self.summary_runner.drain(should_stop=lambda: self.stopping, max_jobs=self.summary_batch)
+        if totals['total']:
+            logger.info("摘要完成", extra={'event': 'summarize', 'data': totals})
+        return totals
+
+    def report_due(self, now: datetime = None) -> bool:
+        if not self.report_time:
+            return False
+        now = now or datetime.now()
+        if (now.hour, now.minute) < self.report_time:
+            return False
+        return self.db.get_setting(LAST_REPORT_SETTING) != now.strftime('%Y-%m-%d')
+
+    def generate_report(self):
+        # 日报生成器只在用到时导入；每次新建实例，保证报告日期正确
+        from daily_report_generator import DailyReportGenerator
+
+        today = datetime.now().strftime('%Y-%m-%d')
+        writer = _LogWriter(logging.getLogger('daily_report_generator'))
+        with contextlib.redirect_stdout(writer):
+            generator = DailyReportGenerator(
+                db_path=self.db.db_path,
+                use_llm=self.config.get('daemon_report_use_llm', True),
+                llm_config=self.llm_config,
+                use_keyword_filter=self.config.get('daemon_report_keyword_filter', True)
+            )
+            generator.save_report(output_dir=self.report_dir)
+        writer.flush()
+        # 无论是否有可用文章都记为已完成，当天不再重试
+        self.db.set_setting(LAST_REPORT_SETTING, today)
+        logger.info("日报生成完成", extra={'event': 'report', 'data': {'date': today, 'dir': self.report_dir}})
+
+    def run_once(self):
+        """执行一个完整周期，单个步骤失败不影响后续步骤"""
+        steps = [('fetch', self.fetch), ('summarize', self.summarize)]
+        if self.report_due():
+            steps.append(('report', self.generate_report))
+
+        for name, step in steps:
+            if self.stopping:
+                return
+            try:
+                step()
+            except Exception:
+                logger.exception(f"步骤 {name} 执行失败", extra={'event': 'error', 'data': {'step': name}})
+
+    def run(self, once: bool = False):
+        logger.info("后台服务启动", extra={'event': 'start', 'data': {
+            'pid': os.getpid(), 'db': self.db.db_path, 'tick_seconds': self.tick_seconds,
+        }})
+        try:
+            while not self.stopping:
+                self.run_once()
+                if once:
+                    break
+                self._stop.wait(self.tick_seconds)
+        finally:
+            self.summary_runner.release()
+            self.db.close()
+            logger.info("后台服务已退出", extra={'event': 'exit'})
+
+
+def load_config(path: str = None) -> Dict:
+    path = path or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.json')
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def main(once: bool = False, config_path: str = None) -> int:
+    config = load_config(config_path)
+    setup_logging(config.get('daemon_log_file', 'logs/daemon.jsonl'), config.get('log_level', 'INFO'))
+
+    lock = PidLock(config.get('daemon_pid_file', 'rss_daemon.pid'))
+    try:
+        lock.acquire()
+    except RuntimeError as e:
+        logger.error(str(e), extra={'event': 'locked'})
+        return 1
+
+    try:
+        daemon = RSSDaemon(config)
+        daemon.install_signal_handlers()
+        daemon.run(once=once)
+    finally:
+        lock.release()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(once='--once' in sys.argv))
@@ -5,8 +5,13 @@ import time
 from datetime import datetime, date, timedelta
 from typing import List, Dict, Any, Tuple, Optional
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import heapq
 import os
 
+from database import Database
+from keyword_matcher import KeywordMatcher, SQL_FUNCTION_NAME
+
 try:
     from openai import OpenAI
     from openai import APIConnectionError, AuthenticationError, RateLimitError
@@ -15,6 +20,21 @@ try:
 except ImportError:
     HAS_OPENAI = False
 
+# 中日韩文字和全角符号，约1个字符1个token
+_CJK_RE = re.compile(r'[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff00-\uffef]')
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算token数：中日韩字符每字约1个token，其余字符约4个字符1个token"""
+    if not text:
+        return 0
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+# CTE 的 MATERIALIZED 提示需要 SQLite 3.35+；旧版本不加提示，查询结果相同，只是关键词得分可能多算一次
+_CTE_MATERIALIZED = "MATERIALIZED " if sqlite3.sqlite_version_info >= (3, 35, 0) else ""
+
 
 class KeywordFilter:
     """关键词过滤管理器"""
@@ -22,7 +42,7 @@ class KeywordFilter:
     def __init__(self, db_path: str = "rss_data.db"):
         self.db_path = db_path
         self._init_keyword_table()
-        self.keywords = self._load_keywords()
+        self.reload()
         print(f"[LOG] 关键词过滤初始化: 加载{len(self.keywords)}个关键词")
 
     def _get_connection(self):
@@ -46,16 +66,21 @@ class KeywordFilter:
             conn.commit()
             print("[LOG] 关键词表已初始化")
 
-    def _load_keywords(self) -> List[str]:
-        """加载活跃关键词"""
+    def _load_keywords(self) -> List[Tuple[str, int]]:
+        """加载活跃关键词及权重"""
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                SELECT keyword FROM filter_keywords 
+                SELECT keyword, weight FROM filter_keywords 
                 WHERE is_active = 1 
                 ORDER BY weight DESC, created_at DESC
             """)
-            return [row[0] for row in cursor.fetchall()]
+            return [(row[0], row[1]) for row in cursor.fetchall()]
+
+    def reload(self):
+        """重新加载关键词并编译匹配器，关键词表变化后调用"""
+        self.matcher = KeywordMatcher(self._load_keywords())
+        self.keywords = list(self.matcher.keywords)
 
     def add_keyword(self, keyword: str, weight: int = 1) -> bool:
         """添加关键词"""
@@ -67,7 +92,7 @@ class KeywordFilter:
                     VALUES (?, ?, 1)
                 """, (keyword.lower().strip(), weight))
                 conn.commit()
-            self.keywords = self._load_keywords()
+            self.reload()
             print(f"[LOG] 添加关键词: {keyword}")
             return True
         except Exception as e:
@@ -83,7 +108,7 @@ class KeywordFilter:
                     UPDATE filter_keywords SET is_active = 0 WHERE keyword = ?
                 """, (keyword.lower().strip(),))
                 conn.commit()
-            self.keywords = self._load_keywords()
+            self.reload()
             print(f"[LOG] 移除关键词: {keyword}")
             return True
         except Exception as e:
@@ -98,52 +123,54 @@ class KeywordFilter:
         if not self.keywords:
             return True, []  # 无关键词时全部通过
 
-        # 合并检查字段
-        text_to_check = " ".join([
-            str(article.get('title', '')),
-            str(article.get('keywords', '')),
-            str(article.get('summary', ''))
-        ]).lower()
+        matched = self.matcher.find(article.get('title'), article.get('keywords'), article.get('summary'))
+        return len(matched) > 0, matched
 
-        matched = []
-        for kw in self.keywords:
-            if kw.lower() in text_to_check:
-                matched.append(kw)
+    def score_article(self, article: Dict[str, Any]) -> int:
+        """命中关键词的权重之和"""
+        return self.matcher.score(article.get('title'), article.get('keywords'), article.get('summary'))
 
-        return len(matched) > 0, matched
+    def register_sql_function(self, conn: sqlite3.Connection):
+        """在连接上注册关键词得分函数，执行 build_sql_filter / build_sql_score 生成的SQL前调用"""
+        self.matcher.register(conn)
+
+    def build_sql_score(self) -> str:
+        """关键词得分的SQL表达式，需先 register_sql_function"""
+        return f"{SQL_FUNCTION_NAME}(a.title, a.keywords, a.summary)"
 
     def build_sql_filter(self) -> str:
         """
         构建SQL过滤条件
-        用于在数据库层面过滤
+        用于在数据库层面过滤，关键词匹配由注册的自定义函数完成，SQL文本不随关键词数量变化
         """
         if not self.keywords:
             return ""
+        return f"{self.build_sql_score()} > 0"
 
-        # 构建LIKE条件
-        conditions = []
-        for kw in self.keywords:
-            # 转义SQL通配符
-            safe_kw = kw.replace('%', '\\%').replace('_', '\\_')
-            conditions.append(f"""
-                (LOWER(a.title) LIKE '%{safe_kw}%' 
-                 OR LOWER(a.keywords) LIKE '%{safe_kw}%' 
-                 OR LOWER(a.summary) LIKE '%{safe_kw}%')
-            """)
-
-        return " OR ".join(conditions)
 
 class LLMProcessor:
     """LLM处理器：用于热点筛选 + 内容创作"""
 
+    # 分片筛选时每个分片的晋级名额 = ceil(目标篇数 / 分片数) × 该倍数，留出决赛轮的挑选空间
+    SHARD_OVERSELECT = 2
+    # 晋级文章仍超出预算时最多再进行的淘汰轮数
+    MAX_TOURNAMENT_ROUNDS = 3
+
     def __init__(self, api_key: str = "ollama", base_url: str = "http://localhost:11434/v1",
-                 model: str = "qwen3:8b", temperature: float = 1.0):
+                 model: str = "qwen3:8b", temperature: float = 1.0,
+                 prompt_token_budget: int = 6000, max_parallel_shards: int = 4):
+        """
+        :param prompt_token_budget: 热点筛选单个Prompt的token上限（估算值），超出时分片筛选
+        :param max_parallel_shards: 分片筛选的最大并发请求数
+        """
         if not HAS_OPENAI:
             raise ImportError("请安装 openai 库：pip install openai")
         self.client = OpenAI(api_key=api_key, base_url=base_url)
         self.model = model
         self.temperature = temperature
         self.is_kimi = "kimi" in model.lower()
+        self.prompt_token_budget = prompt_token_budget
+        self.max_parallel_shards = max(1, int(max_parallel_shards or 1))
         print(
             f"[LOG] LLM 初始化完成 -> Model: {model}, BaseURL: {base_url}, Temperature: {temperature}, IsKimi: {self.is_kimi}")
 
@@ -208,41 +235,18 @@ class LLMProcessor:
         print(f"[ERROR] 所有JSON提取方式失败")
         return None
 
-    def select_hot_articles(self, articles: List[Dict[str, Any]], final_limit: int = 25,
-                            max_per_feed: int = 8, retry: int = 2) -> List[Dict[str, Any]]:
-        """
-        第一阶段：AI热点筛选 - 严格强制执行来源分布
-        """
-        print(f"[LOG] 开始热点筛选：输入文章数={len(articles)}")
-
-        if not articles:
-            return []
-
-        # 构建ID到文章对象的映射
-        id_to_article = {art.get('id'): art for art in articles if art.get('id')}
-        valid_ids = set(id_to_article.keys())
-        print(f"[LOG] 构建ID映射: {len(id_to_article)}篇文章，ID范围: {min(valid_ids)}-{max(valid_ids)}")
-
-        # 按来源分组，用于后续强制分布
-        feed_groups = defaultdict(list)
-        for art in articles:
-            feed_groups[art.get('feed_name', 'unknown')].append(art)
-        print(f"[LOG] 候选池来源分布: {dict((k, len(v)) for k, v in feed_groups.items())}")
-
-        # 构建输入上下文
-        context_lines = []
-        for art in articles:
-            art_id = art.get('id', 0)
-            title = (art.get('title') or '无标题')[:50]
-            keywords = (art.get('keywords') or '')[:30]
-            feed = (art.get('feed_name') or 'unknown')[:25]
-            context_lines.append(f"ID:{art_id}|来源:{feed}|标题:{title}|关键词:{keywords}")
-
-        full_context = "\n".join(context_lines)
-        print(f"[LOG] 筛选Prompt长度约={len(full_context)}字符")
+    @staticmethod
+    def _format_candidate(art: Dict[str, Any]) -> str:
+        art_id = art.get('id', 0)
+        title = (art.get('title') or '无标题')[:50]
+        keywords = (art.get('keywords') or '')[:30]
+        feed = (art.get('feed_name') or 'unknown')[:25]
+        return f"ID:{art_id}|来源:{feed}|标题:{title}|关键词:{keywords}"
 
+    @staticmethod
+    def _build_select_prompt(context: str, total: int, final_limit: int, max_per_feed: int) -> str:
         # 增强Prompt - 更严格的约束
-        prompt = f"""你是资深科技编辑，从以下{len(articles)}篇文章中筛选出{final_limit}篇最具热点价值的AI/科技资讯。
+        return f"""你是资深科技编辑，从以下{total}篇文章中筛选出{final_limit}篇最具热点价值的AI/科技资讯。
 
 【筛选标准】
 1. 热点价值：AI技术突破、重大发布、争议事件、数据亮眼
@@ -250,7 +254,7 @@ class LLMProcessor:
 3. 质量把关：排除非科技/AI主题内容
 
 【文章列表】
-{full_context}
+{context}
 
 【强制约束】
 - 只能从上述ID中选择，禁止编造ID
@@ -265,9 +269,59 @@ class LLMProcessor:
 严格返回JSON：
 {{"selected_ids": [ID1, ID2, ...], "source_dist": {{"来源A": 数量, "来源B": 数量}}}}"""
 
+    def _pack_shards(self, articles: List[Dict[str, Any]], final_limit: int,
+                     max_per_feed: int) -> List[List[Dict[str, Any]]]:
+        """
+        按token预算把候选文章装入若干分片，全部放得下时只返回一个分片
+        各来源轮流取文章后放入当前最小的分片，使每个分片的来源和长度都大致均衡
+        """
+        lines = {id(art): self._format_candidate(art) for art in articles}
+        costs = {key: estimate_tokens(line) + 1 for key, line in lines.items()}
+        total_cost = sum(costs.values())
+        overhead = estimate_tokens(self._build_select_prompt('', len(articles), final_limit, max_per_feed))
+        # 预算过小时至少给每个分片留出若干行的空间
+        capacity = max(self.prompt_token_budget - overhead, max(costs.values()) * 4)
+        if total_cost <= capacity:
+            return [articles]
+
+        feed_groups = defaultdict(list)
+        for art in articles:
+            feed_groups[art.get('feed_name', 'unknown')].append(art)
+        interleaved = []
+        queues = list(feed_groups.values())
+        depth = 0
+        while queues:
+            interleaved.extend(q[depth] for q in queues)
+            depth += 1
+            queues = [q for q in queues if len(q) > depth]
+
+        shard_count = -(-total_cost // capacity)
+        shards = [[] for _ in range(shard_count)]
+        loads = [0] * shard_count
+        for art in interleaved:
+            cost = costs[id(art)]
+            index = min(range(len(shards)), key=loads.__getitem__)
+            if loads[index] + cost > capacity:
+                shards.append([])
+                loads.append(0)
+                index = len(shards) - 1
+            shards[index].append(art)
+            loads[index] += cost
+        return [shard for shard in shards if shard]
+
+    def _select_from_pool(self, articles: List[Dict[str, Any]], final_limit: int,
+                          max_per_feed: int, retry: int, label: str = "") -> Optional[List[Dict[str, Any]]]:
+        """对一个放得进单个Prompt的候选池请求模型筛选，返回有效ID对应的文章，全部尝试失败时返回None"""
+        id_to_article = {art.get('id'): art for art in articles if art.get('id')}
+        valid_ids = set(id_to_article.keys())
+
+        full_context = "\n".join(self._format_candidate(art) for art in articles)
+        prompt = self._build_select_prompt(full_context, len(articles), final_limit, max_per_feed)
+        print(f"[LOG] {label}筛选Prompt长度约={len(prompt)}字符，估算{estimate_tokens(prompt)} tokens")
+
         for attempt in range(retry):
             try:
-                print(f"[LOG] 热点筛选尝试{attempt + 1}/{retry}...")
+                print(f"[LOG] {label}热点筛选尝试{attempt + 1}/{retry}...")
 
                 response = self._call_api_with_retry(
                     messages=[{"role": "user", "content": prompt}],
@@ -280,182 +334,233 @@ class LLMProcessor:
                     continue
 
                 content = response.choices[0].message.content.strip()
-                print(f"[LOG] 原始响应长度={len(content)}")
+                print(f"[LOG] {label}原始响应长度={len(content)}")
 
                 result = self._extract_json(content)
 
                 if result and "selected_ids" in result:
                     selected_ids = result.get("selected_ids", [])
-                    print(f"[LOG] AI返回{len(selected_ids)}个ID")
+                    print(f"[LOG] {label}AI返回{len(selected_ids)}个ID")
 
-                    # 严格验证ID有效性
+                    # 严格验证ID有效性，去掉重复ID
                     selected_ids = [int(x) for x in selected_ids if str(x).isdigit()]
-                    valid_selected_ids = [aid for aid in selected_ids if aid in valid_ids]
+                    valid_selected_ids = list(dict.fromkeys(aid for aid in selected_ids if aid in valid_ids))
                     invalid_ids = [aid for aid in selected_ids if aid not in valid_ids]
 
                     if invalid_ids:
-                        print(f"[WARN] 过滤{len(invalid_ids)}个无效ID: {invalid_ids[:5]}...")
+                        print(f"[WARN] {label}过滤{len(invalid_ids)}个无效ID: {invalid_ids[:5]}...")
 
-                    print(f"[LOG] 有效ID: {len(valid_selected_ids)}个")
+                    print(f"[LOG] {label}有效ID: {len(valid_selected_ids)}个")
+                    return [id_to_article[aid] for aid in valid_selected_ids]
 
-                    # 获取文章并强制执行分布限制
-                    prelim_articles = [id_to_article[aid] for aid in valid_selected_ids]
+            except Exception as e:
+                print(f"[ERROR] {label}热点筛选异常：{type(e).__name__}: {e}")
+                continue
 
-                    # 强制执行单一来源不超过8篇
-                    final_articles = self._enforce_strict_distribution(
-                        prelim_articles, articles, final_limit, max_per_feed
-                    )
+        return None
 
-                    # 验证最终分布
-                    final_dist = defaultdict(int)
-                    for art in final_articles:
-                        final_dist[art.get('feed_name', 'unknown')] += 1
-                    print(f"[LOG] 最终来源分布: {dict(final_dist)}")
+    def _tournament_select(self, articles: List[Dict[str, Any]], final_limit: int,
+                           max_per_feed: int, retry: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        候选池超出token预算时的分片淘汰赛：
+        各分片并行筛选出晋级文章，晋级文章合并后再筛选一轮；仍超出预算则继续分片
+        """
+        pool = articles
+        for round_num in range(1, self.MAX_TOURNAMENT_ROUNDS + 1):
+            shards = self._pack_shards(pool, final_limit, max_per_feed)
+            if len(shards) == 1:
+                label = "[决赛] " if pool is not articles else ""
+                selected = self._select_from_pool(pool, final_limit, max_per_feed, retry, label)
+                if selected is None and pool is not articles:
+                    # 晋级文章已经过模型筛选，决赛失败时在它们之中均匀选取
+                    print(f"[WARN] 决赛轮筛选失败，从{len(pool)}篇晋级文章中降级选取")
+                    return self._fallback_select(pool, final_limit, max_per_feed)
+                return selected
+
+            # 晋级名额不超过分片平均大小的一半，保证每轮候选池至少减半
+            base_quota = -(-final_limit // len(shards))
+            quota = min(base_quota * self.SHARD_OVERSELECT, max(base_quota, len(pool) // (2 * len(shards))))
+            print(f"[LOG] 第{round_num}轮分片筛选：{len(pool)}篇 -> {len(shards)}个分片，"
+                  f"每片晋级{quota}篇，并发{min(self.max_parallel_shards, len(shards))}")
+
+            def run_shard(index: int, shard: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+                if len(shard) <= quota:
+                    return shard
+                label = f"[R{round_num}-分片{index + 1}/{len(shards)}] "
+                winners = self._select_from_pool(shard, quota, max_per_feed, retry, label)
+                if winners is None:
+                    print(f"[WARN] {label}筛选失败，使用均匀分布降级")
+                    winners = self._fallback_select(shard, quota, max_per_feed)
+                return winners[:quota]
+
+            with ThreadPoolExecutor(max_workers=min(self.max_parallel_shards, len(shards))) as executor:
+                results = list(executor.map(run_shard, range(len(shards)), shards))
+
+            winners = [art for shard_winners in results for art in shard_winners]
+            print(f"[LOG] 第{round_num}轮晋级{len(winners)}篇")
+            if len(winners) >= len(pool):
+                # 分片过小导致没有淘汰任何文章，继续分片也无法收敛
+                print(f"[WARN] 分片筛选未能缩小候选池，改用降级策略")
+                return self._fallback_select(pool, final_limit, max_per_feed)
+            pool = winners
+
+        print(f"[WARN] {self.MAX_TOURNAMENT_ROUNDS}轮后晋级文章仍超出token预算，改用降级策略")
+        return self._fallback_select(pool, final_limit, max_per_feed)
 
-                    # 检查约束
-                    max_count = max(final_dist.values()) if final_dist else 0
-                    if max_count > max_per_feed:
-                        print(f"[WARN] 警告：单一来源{max_count}篇，超过{max_per_feed}篇限制")
+    def select_hot_articles(self, articles: List[Dict[str, Any]], final_limit: int = 25,
+                            max_per_feed: int = 8, retry: int = 2) -> List[Dict[str, Any]]:
+        """
+        第一阶段：AI热点筛选 - 严格强制执行来源分布
+        候选池超出token预算时分片并行筛选，再由晋级文章进行决赛
+        """
+        print(f"[LOG] 开始热点筛选：输入文章数={len(articles)}")
 
-                    print(f"[LOG] ✅ 筛选完成: 选中{len(final_articles)}篇")
-                    return final_articles
+        if not articles:
+            return []
 
-            except Exception as e:
-                print(f"[ERROR] 热点筛选异常：{type(e).__name__}: {e}")
-                continue
+        valid_ids = {art.get('id') for art in articles if art.get('id')}
+        print(f"[LOG] 构建ID映射: {len(valid_ids)}篇文章，ID范围: {min(valid_ids)}-{max(valid_ids)}")
 
-        # 降级
-        print(f"[WARN] AI筛选失败，启用均匀分布降级策略")
-        return self._fallback_select(articles, final_limit, max_per_feed)
+        # 按来源分组，用于后续强制分布
+        feed_groups = defaultdict(list)
+        for art in articles:
+            feed_groups[art.get('feed_name', 'unknown')].append(art)
+        print(f"[LOG] 候选池来源分布: {dict((k, len(v)) for k, v in feed_groups.items())}")
 
-    def _enforce_strict_distribution(self, selected: List[Dict], candidates: List[Dict],
+        prelim_articles = self._tournament_select(articles, final_limit, max_per_feed, retry)
+
+        if prelim_articles is None:
+            # 降级
+            print(f"[WARN] AI筛选失败，启用均匀分布降级策略")
+            return self._fallback_select(articles, final_limit, max_per_feed)
+
+        # 强制执行单一来源上限，不足时从完整候选池补充
+        final_articles = self._enforce_strict_distribution(
+            prelim_articles, articles, final_limit, max_per_feed
+        )
+
+        # 验证最终分布
+        final_dist = defaultdict(int)
+        for art in final_articles:
+            final_dist[art.get('feed_name', 'unknown')] += 1
+        print(f"[LOG] 最终来源分布: {dict(final_dist)}")
+
+        # 检查约束
+        max_count = max(final_dist.values()) if final_dist else 0
+        if max_count > max_per_feed:
+            print(f"[WARN] 警告：单一来源{max_count}篇，超过{max_per_feed}篇限制")
+
+        print(f"[LOG] ✅ 筛选完成: 选中{len(final_articles)}篇")
+        return final_articles
+
+    @staticmethod
+    def _quality_order(articles: List[Dict]) -> List[Dict]:
+        """按质量分从高到低排序，同分保持原顺序"""
+        return sorted(articles, key=lambda x: x.get('quality_score', 0) or 0, reverse=True)
+
+    @staticmethod
+    def _enforce_strict_distribution(selected: List[Dict], candidates: List[Dict],
                                      final_limit: int, max_per_feed: int) -> List[Dict]:
         """
         强制执行来源分布限制 - 超标时从其他来源补充
+        用计数器和最小堆分配名额：每次从当前篇数最少的来源取质量最高的文章，O(n log n)
         """
         print(f"[LOG] 强制执行分布限制: 当前{len(selected)}篇，目标{final_limit}篇，单源上限{max_per_feed}")
 
-        # 统计当前分布
         feed_counts = defaultdict(int)
-        for art in selected:
-            feed_counts[art.get('feed_name', 'unknown')] += 1
-
-        print(f"[LOG] 初始分布: {dict(feed_counts)}")
-
         result = []
         excess_pool = []  # 超标的文章暂存
 
         # 第一轮：保留未超标的，收集超标的
         for art in selected:
             feed = art.get('feed_name', 'unknown')
-            current_count = sum(1 for a in result if a.get('feed_name', 'unknown') == feed)
-            if current_count < max_per_feed:
+            if feed_counts[feed] < max_per_feed:
                 result.append(art)
+                feed_counts[feed] += 1
             else:
                 excess_pool.append(art)
 
+        print(f"[LOG] 初始分布: {dict(feed_counts)}")
         if excess_pool:
             print(f"[LOG] 发现{len(excess_pool)}篇超标文章，暂存替换")
 
-        # 从候选池补充其他来源的文章
+        # 从候选池补充其他来源的文章，按来源分组并按质量排序
         selected_ids = {a.get('id') for a in result}
-        available = [a for a in candidates if a.get('id') not in selected_ids]
-
-        # 按来源分组可用文章
         available_by_feed = defaultdict(list)
-        for art in available:
-            available_by_feed[art.get('feed_name', 'unknown')].append(art)
-
-        # 优先从文章少的来源补充
-        while len(result) < final_limit:
-            current_dist = defaultdict(int)
-            for a in result:
-                current_dist[a.get('feed_name', 'unknown')] += 1
-
-            # 找出当前文章数最少的来源
-            all_feeds = set(available_by_feed.keys()) | set(current_dist.keys())
-            sorted_feeds = sorted(all_feeds, key=lambda f: current_dist.get(f, 0))
-
-            added = False
-            for feed in sorted_feeds:
-                if current_dist.get(feed, 0) >= max_per_feed:
-                    continue
-
-                # 获取该来源可用文章，按质量排序
-                avail = [a for a in available_by_feed.get(feed, [])
-                         if a.get('id') not in {x.get('id') for x in result}]
-
-                if avail:
-                    avail.sort(key=lambda x: x.get('quality_score', 0), reverse=True)
-                    result.append(avail[0])
-                    added = True
-                    break
-
-            if not added:
-                # 所有来源都到上限了，从超标池取回质量最高的
-                if excess_pool and len(result) < final_limit:
-                    excess_pool.sort(key=lambda x: x.get('quality_score', 0), reverse=True)
-                    result.append(excess_pool.pop(0))
-                    print(f"[WARN] 所有来源已达上限，被迫使用超标文章")
-                    added = True
+        for art in candidates:
+            if art.get('id') not in selected_ids:
+                available_by_feed[art.get('feed_name', 'unknown')].append(art)
+
+        # 堆元素：(当前篇数, 来源首次出现的顺序, 来源)，优先从文章少的来源补充
+        queues = {}
+        heap = []
+        for order, (feed, avail) in enumerate(available_by_feed.items()):
+            if feed_counts[feed] < max_per_feed:
+                queues[feed] = iter(LLMProcessor._quality_order(avail))
+                heap.append((feed_counts[feed], order, feed))
+        heapq.heapify(heap)
+
+        while len(result) < final_limit and heap:
+            count, order, feed = heapq.heappop(heap)
+            art = next(queues[feed], None)
+            # 跳过同一ID的重复文章
+            while art is not None and art.get('id') in selected_ids:
+                art = next(queues[feed], None)
+            if art is None:
+                continue
+            result.append(art)
+            selected_ids.add(art.get('id'))
+            feed_counts[feed] = count + 1
+            if count + 1 < max_per_feed:
+                heapq.heappush(heap, (count + 1, order, feed))
+
+        # 所有来源都到上限了，从超标池取回质量最高的
+        if len(result) < final_limit and excess_pool:
+            backfill = LLMProcessor._quality_order(excess_pool)[:final_limit - len(result)]
+            print(f"[WARN] 所有来源已达上限，被迫使用{len(backfill)}篇超标文章")
+            for art in backfill:
+                result.append(art)
+                feed_counts[art.get('feed_name', 'unknown')] += 1
 
-                if not added:
-                    break
-
-        final_dist = defaultdict(int)
-        for a in result:
-            final_dist[a.get('feed_name', 'unknown')] += 1
-        print(f"[LOG] 强制分布后: {len(result)}篇，分布: {dict(final_dist)}")
+        print(f"[LOG] 强制分布后: {len(result)}篇，分布: {dict(feed_counts)}")
 
         return result
 
-    def _fallback_select(self, articles: List[Dict[str, Any]], final_limit: int = 25,
+    @staticmethod
+    def _fallback_select(articles: List[Dict[str, Any]], final_limit: int = 25,
                          max_per_feed: int = 8) -> List[Dict[str, Any]]:
         """
         降级策略：严格轮询确保均匀分布
+        每次从已选篇数最少的来源取其质量最高的下一篇，用最小堆实现，O(n log n)
         """
         print(f"[LOG] 降级筛选：候选{len(articles)}篇，目标{final_limit}篇，单源上限{max_per_feed}")
 
         feed_groups = defaultdict(list)
         for art in articles:
-            feed = art.get('feed_name', 'unknown')
-            feed_groups[feed].append(art)
-
-        # 每个来源按质量排序
-        for feed in feed_groups:
-            feed_groups[feed].sort(key=lambda x: x.get('quality_score', 0), reverse=True)
+            feed_groups[art.get('feed_name', 'unknown')].append(art)
 
         print(f"[LOG] 来源数: {len(feed_groups)}个")
 
+        # 每个来源按质量排序
+        queues = {feed: iter(LLMProcessor._quality_order(group)) for feed, group in feed_groups.items()}
+        heap = [(0, order, feed) for order, feed in enumerate(feed_groups)] if max_per_feed > 0 else []
+
         selected = []
+        selected_ids = set()
         feed_counts = defaultdict(int)
-        round_num = 0
-
-        while len(selected) < final_limit and round_num < 50:
-            added_this_round = 0
-            # 按当前数量排序，优先从少的来源取
-            feeds_sorted = sorted(feed_groups.keys(), key=lambda f: feed_counts[f])
-
-            for feed in feeds_sorted:
-                if feed_counts[feed] >= max_per_feed:
-                    continue
 
-                # 获取该来源下一篇未选的文章
-                already_ids = {a.get('id') for a in selected}
-                next_art = None
-                for art in feed_groups[feed]:
-                    if art.get('id') not in already_ids:
-                        next_art = art
-                        break
-
-                if next_art:
-                    selected.append(next_art)
-                    feed_counts[feed] += 1
-                    added_this_round += 1
-
-            if added_this_round == 0:
-                break
-            round_num += 1
+        while len(selected) < final_limit and heap:
+            count, order, feed = heapq.heappop(heap)
+            art = next(queues[feed], None)
+            while art is not None and art.get('id') in selected_ids:
+                art = next(queues[feed], None)
+            if art is None:
+                continue
+            selected.append(art)
+            selected_ids.add(art.get('id'))
+            feed_counts[feed] = count + 1
+            if count + 1 < max_per_feed:
+                heapq.heappush(heap, (count + 1, order, feed))
 
         print(f"[LOG] ✅ 降级完成: {len(selected)}篇，分布: {dict(feed_counts)}")
         return selected
@@ -686,6 +791,9 @@ class DailyReportGenerator:
         # self.weekday_map = {0: "星期一", 1: "星期二", 2: "星期三", 3: "星期四", 4: "星期五", 5: "星期六", 6: "星期日"}
         # self.weekday = self.weekday_map[base_date.weekday()]
 
+        # 确保文章表已迁移到最新结构（published_day 等字段及索引）
+        Database(db_path).close()
+
         self.use_llm = use_llm
         self.temperature = temperature
         self.llm_processor = None
@@ -701,7 +809,9 @@ class DailyReportGenerator:
                     api_key=config.get("api_key", "ollama"),
                     base_url=config.get("base_url", "http://localhost:11434/v1"),
                     model=config.get("model", "qwen3:8b"),
-                    temperature=self.temperature
+                    temperature=self.temperature,
+                    prompt_token_budget=config.get("prompt_token_budget", 6000),
+                    max_parallel_shards=config.get("select_max_workers", 4)
                 )
             except Exception as e:
                 print(f"[ERROR] 大模型初始化失败：{e}，将降级为本地模式。")
@@ -716,26 +826,23 @@ class DailyReportGenerator:
         """
         获取文章 - 支持关键词过滤
         """
-        # 构建基础WHERE条件
+        # 构建基础WHERE条件：report_eligible 在摘要完成时写入（见 database.is_report_eligible），走部分索引
         base_conditions = """
-            date(a.published_at) = date(?)
-            AND a.quality_recommendation IN ('推荐阅读', '强烈推荐', '一般浏览')
-            AND summary IS NOT NULL
-            AND summary NOT LIKE '%格式错误无法解析%'
-            and summary not like '%摘要生成失败%'
-            and summary not like '%文章内容过短%'
+            a.published_day = date(?)
+            AND a.report_eligible = 1
         """
 
         # 添加关键词过滤条件
         keyword_condition = ""
+        keyword_score = "0"
         if self.keyword_filter and self.keyword_filter.keywords:
-            keyword_sql = self.keyword_filter.build_sql_filter()
-            if keyword_sql:
-                keyword_condition = f"AND ({keyword_sql})"
-                print(f"[LOG] 启用关键词过滤: {self.keyword_filter.keywords}")
+            keyword_score = self.keyword_filter.build_sql_score()
+            keyword_condition = "WHERE keyword_score > 0"
+            print(f"[LOG] 启用关键词过滤: {self.keyword_filter.keywords}")
 
+        # 关键词得分在 matched 中只计算一次，排名时同质量分优先关键词得分高的文章
         query = f"""
-            WITH ranked AS (
+            WITH matched AS {_CTE_MATERIALIZED}(
                 SELECT 
                     a.id,
                     a.title,
@@ -744,22 +851,33 @@ class DailyReportGenerator:
                     a.keywords,
                     a.quality_score,
                     a.quality_recommendation,
+                    a.published_at,
                     f.name as feed_name,
-                    ROW_NUMBER() OVER (PARTITION BY f.name ORDER BY a.quality_score DESC, a.published_at DESC) as rn
+                    {keyword_score} as keyword_score
                 FROM articles a
                 JOIN feeds f ON a.feed_id = f.id
                 WHERE {base_conditions}
+            ),
+            ranked AS (
+                SELECT 
+                    *,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY feed_name ORDER BY quality_score DESC, keyword_score DESC, published_at DESC
+                    ) as rn
+                FROM matched
                 {keyword_condition}
             )
             SELECT 
                 id, title, summary, url, keywords, 
-                quality_score, quality_recommendation, feed_name
+                quality_score, quality_recommendation, feed_name, keyword_score
             FROM ranked 
             WHERE rn <= {max_per_feed}
-            ORDER BY feed_name, quality_score DESC
+            ORDER BY feed_name, quality_score DESC, keyword_score DESC
         """
         # print((f"[LOG] 数据获取SQL: {query}"))
         with self._get_connection() as conn:
+            if keyword_condition:
+                self.keyword_filter.register_sql_function(conn)
             cursor = conn.cursor()
             cursor.execute(query, (self.today_str,))
             articles = [dict(row) for row in cursor.fetchall()]
@@ -895,7 +1013,7 @@ class DailyReportGenerator:
                 print(f"[WARN] AI筛选返回空，使用降级策略")
         else:
             print(f"⚠️ 步骤 2/4: LLM不可用，使用降级策略...")
-            selected_articles = self.llm_processor._fallback_select(candidate_articles, 25, 8)
+            selected_articles = LLMProcessor._fallback_select(candidate_articles, 25, 8)
 
         # 验证分布
         final_dist = defaultdict(int)
@@ -993,7 +1111,7 @@ def manage_keywords():
                 print(f"  {i}. {kw}")
         elif choice == "4":
             init_keywords()
-            kf.keywords = kf._load_keywords()
+            kf.reload()
         elif choice == "0":
             break
 
@@ -4,28 +4,127 @@
 import sqlite3
 import json
 import os
+import threading
+import weakref
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 
 import logging  # <--- 1. 导入 logging
 logger = logging.getLogger(__name__)
 
+# SQLite 单条语句的参数个数上限（旧版本为 999），IN 查询按此分批
+SQL_BATCH_SIZE = 500
+
+
+# 摘要状态（articles.summary_status）
+SUMMARY_PENDING = 'pending'    # 等待生成
+SUMMARY_DONE = 'done'          # 已生成
+SUMMARY_SKIPPED = 'skipped'    # 内容过短、疑似广告等，不再尝试
+SUMMARY_FAILED = 'failed'      # 调用或解析失败，summary_next_retry_at 到期后重试，为空表示已放弃
+
+# 摘要任务优先级（summary_jobs.priority），同一优先级内标星/选中的文章先处理
+SUMMARY_JOB_PRIORITY_NORMAL = 0    # 抓取后自动入队
+SUMMARY_JOB_PRIORITY_MANUAL = 10   # 用户手动要求生成
+
+# 可进入日报候选池的推荐等级
+REPORT_RECOMMENDATIONS = ('推荐阅读', '强烈推荐', '一般浏览')
+
+
+def _chunked(items: List, size: int = SQL_BATCH_SIZE):
+    """按固定大小切分列表"""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def is_report_eligible(summary_status: Optional[str], quality_recommendation: Optional[str],
+                       duplicate_of: Optional[int] = None) -> bool:
+    """文章能否进入日报候选池：非重复、摘要已生成且推荐等级合格"""
+    if duplicate_of is not None or summary_status != SUMMARY_DONE:
+        return False
+    return quality_recommendation in REPORT_RECOMMENDATIONS
+
+
+class _ThreadConnection:
+    """
+    线程私有的连接，保存在 threading.local 中
+    所属线程结束时 thread-local 数据被回收，连接随之关闭；不依赖 threading.enumerate()，
+    QThread 等非 threading 创建的线程同样适用，线程 id 被复用也不会影响旧连接的关闭
+    """
+    __slots__ = ('conn', '__weakref__')
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def close(self):
+        try:
+            self.conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"关闭数据库连接失败：{e}")
+
+    def __del__(self):
+        self.close()
+
+
 class Database:
+    # 每个连接的页缓存大小（负数表示 KiB），约 16MB
+    CACHE_SIZE_KIB = 16000
+    # 写锁被占用时的最长等待时间（秒）
+    BUSY_TIMEOUT = 30
+
     def __init__(self, db_path: str = "rss_data.db"):
         self.db_path = db_path
+        # 线程级连接池：每个线程复用自己的连接，GUI 线程、抓取线程、摘要线程互不干扰
+        self._local = threading.local()
+        # 线程 id -> 该线程的连接（弱引用，线程结束后自动移除），用于 interrupt() 和 close()
+        self._connections = weakref.WeakValueDictionary()
+        self._pool_lock = threading.Lock()
         self._init_db()
 
-    def _get_connection(self):
-        conn = sqlite3.connect(self.db_path)
+    def _create_connection(self) -> sqlite3.Connection:
+        # check_same_thread=False 仅用于 close() 时由其他线程关闭，连接本身只在所属线程中使用
+        conn = sqlite3.connect(self.db_path, timeout=self.BUSY_TIMEOUT, check_same_thread=False)
         conn.row_factory = sqlite3.Row
+        # WAL 模式下 NORMAL 已能保证数据库不损坏，只可能丢失断电前最后几个事务
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA cache_size = -{self.CACHE_SIZE_KIB}")
+        conn.execute("PRAGMA temp_store = MEMORY")
         return conn
 
+    def _get_connection(self) -> sqlite3.Connection:
+        """获取当前线程的连接，首次调用时创建并登记到连接池"""
+        holder = getattr(self._local, 'holder', None)
+        if holder is None:
+            holder = _ThreadConnection(self._create_connection())
+            self._local.holder = holder
+            with self._pool_lock:
+                self._connections[threading.get_ident()] = holder
+        return holder.conn
+
+    def interrupt(self, thread_ident: int):
+        """中断指定线程连接上正在执行的查询（该查询抛出 sqlite3.OperationalError: interrupted）"""
+        with self._pool_lock:
+            holder = self._connections.get(thread_ident)
+            if holder is not None:
+                holder.conn.interrupt()
+
+    def close(self):
+        """关闭连接池中的所有连接（程序退出时调用，调用前应先停止使用数据库的线程）"""
+        with self._pool_lock:
+            holders = list(self._connections.values())
+            self._connections.clear()
+        for holder in holders:
+            holder.close()
+        self._local = threading.local()
+
     def _init_db(self):
         """初始化数据库表结构"""
         with self._get_connection() as conn:
             cursor = conn.cursor()
 
+            # WAL 模式：读写互不阻塞，GUI 读取不再等待抓取线程的写事务（该设置会持久化到数据库文件）
+            cursor.execute("PRAGMA journal_mode = WAL")
+
             # 订阅源表
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS feeds (
@@ -34,6 +133,8 @@ class Database:
                     name TEXT NOT NULL,
                     category TEXT DEFAULT '默认',
                     last_fetched TEXT,
+                    etag TEXT,                                -- 上次响应的 ETag，用于条件请求
+                    last_modified TEXT,                       -- 上次响应的 Last-Modified，用于条件请求
                     created_at TEXT DEFAULT CURRENT_TIMESTAMP
                 )
             ''')
@@ -51,6 +152,13 @@ class Database:
                     keywords TEXT,
                     is_starred INTEGER DEFAULT 0,
                     published_at TEXT,
+                    published_day TEXT,                       -- 发布日期 YYYY-MM-DD，入库时由 date(published_at) 生成，供日期筛选走索引
+                    duplicate_of INTEGER,                     -- 近似重复文章指向的原文 id，原文本身为 NULL
+                    report_eligible INTEGER DEFAULT 0,        -- 可进入日报候选池，生成摘要时按 is_report_eligible 写入
+                    summary_status TEXT DEFAULT 'pending',    -- 摘要状态 pending/done/skipped/failed
+                    summary_attempts INTEGER DEFAULT 0,       -- 已尝试生成摘要的次数
+                    summary_error TEXT,                       -- 最近一次失败或跳过的原因
+                    summary_next_retry_at TEXT,               -- 失败后下次重试时间（UTC），为空表示不再重试
                     is_read INTEGER DEFAULT 0,
                     is_selected INTEGER DEFAULT 0,
                     fetched_at TEXT DEFAULT CURRENT_TIMESTAMP,
@@ -66,14 +174,35 @@ class Database:
                 )
             ''')
 
+            # 旧数据库补齐新增字段
+            self._migrate_schema(cursor)
+
+            # 全文索引
+            self.fts_enabled = self._init_fts(cursor)
+
             # 创建索引以提升查询性能
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_feed_id ON articles(feed_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_published_at ON articles(published_at)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_published_day ON articles(published_day)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_feed_published ON articles(feed_id, published_at)')
+            # 键集分页按时间排序的表达式索引（与 KEYSET_SORT_KEYS['time'] 一致）
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_articles_published_key ON articles(COALESCE(published_at, ''), id)"
+            )
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_is_starred ON articles(is_starred)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_is_selected ON articles(is_selected)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_is_read ON articles(is_read)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_fetched_at ON articles(fetched_at)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_quality_recommendation ON articles(quality_recommendation)')
+            # 摘要任务队列：按状态和重试时间取待处理文章
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS idx_articles_summary_queue ON articles(summary_status, summary_next_retry_at)'
+            )
+            # 日报候选池：只索引合格文章，按日期取候选时不再扫描全表
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_articles_report_candidates
+                ON articles(published_day, feed_id, quality_score DESC) WHERE report_eligible = 1
+            ''')
             # 设置表
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS settings (
@@ -81,9 +210,183 @@ class Database:
                     value TEXT
                 )
             ''')
+            # 摘要缓存表：按归一化内容哈希复用模型结果
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS summary_cache (
+                    content_hash TEXT PRIMARY KEY,
+                    keywords TEXT,
+                    summary_content TEXT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    hit_count INTEGER DEFAULT 0
+                )
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_summary_cache_last_used ON summary_cache(last_used_at)')
+            # 订阅源抓取调度状态：按各源的更新频率计算下次抓取时间，重启后从这里继续
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS feed_schedule (
+                    feed_id INTEGER PRIMARY KEY,
+                    interval_seconds INTEGER NOT NULL,
+                    next_due_at TEXT NOT NULL,
+                    failure_count INTEGER DEFAULT 0,
+                    last_attempt_at TEXT,
+                    last_success_at TEXT,
+                    FOREIGN KEY (feed_id) REFERENCES feeds(id) ON DELETE CASCADE
+                )
+            ''')
+            # 近似重复检测的 SimHash 指纹，4 个 16 位分段分别建索引
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS article_fingerprints (
+                    article_id INTEGER PRIMARY KEY,
+                    simhash INTEGER NOT NULL,
+                    band0 INTEGER NOT NULL,
+                    band1 INTEGER NOT NULL,
+                    band2 INTEGER NOT NULL,
+                    band3 INTEGER NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (article_id) REFERENCES articles(id) ON DELETE CASCADE
+                )
+            ''')
+            for band in range(4):
+                cursor.execute(
+                    f'CREATE INDEX IF NOT EXISTS idx_fingerprints_band{band} ON article_fingerprints(band{band})'
+                )
+            # 摘要任务队列：领取时写入租约并把 available_at 推迟到租约到期，
+            # 进程崩溃后租约到期的任务会被其他工作者重新领取
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS summary_jobs (
+                    article_id INTEGER PRIMARY KEY,
+                    priority INTEGER NOT NULL DEFAULT 0,
+                    available_at TEXT NOT NULL DEFAULT (datetime('now')),
+                    lease_owner TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (article_id) REFERENCES articles(id) ON DELETE CASCADE
+                )
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_summary_jobs_available ON summary_jobs(available_at)')
 
             conn.commit()
 
+    def _migrate_schema(self, cursor):
+        """为旧版本数据库补充后续新增的字段"""
+        self._add_column_if_missing(cursor, 'feeds', 'etag', 'TEXT')
+        self._add_column_if_missing(cursor, 'feeds', 'last_modified', 'TEXT')
+
+        self._add_column_if_missing(cursor, 'articles', 'duplicate_of', 'INTEGER')
+
+        if self._add_column_if_missing(cursor, 'articles', 'published_day', 'TEXT'):
+            cursor.execute(
+                "UPDATE articles SET published_day = date(published_at) WHERE published_at IS NOT NULL"
+            )
+            logger.info(f"数据库迁移：已回填 {cursor.rowcount} 篇文章的 published_day")
+
+        summary_status_added = self._add_column_if_missing(
+            cursor, 'articles', 'summary_status', f"TEXT DEFAULT '{SUMMARY_PENDING}'"
+        )
+        self._add_column_if_missing(cursor, 'articles', 'summary_attempts', 'INTEGER DEFAULT 0')
+        self._add_column_if_missing(cursor, 'articles', 'summary_error', 'TEXT')
+        self._add_column_if_missing(cursor, 'articles', 'summary_next_retry_at', 'TEXT')
+        if summary_status_added:
+            self._migrate_summary_sentinels(cursor)
+
+        if self._add_column_if_missing(cursor, 'articles', 'report_eligible', 'INTEGER DEFAULT 0'):
+            # 与 is_report_eligible 的判断一致
+            cursor.execute(f"""
+                UPDATE articles SET report_eligible = 1
+                WHERE duplicate_of IS NULL
+                  AND summary_status = ?
+                  AND quality_recommendation IN ({','.join('?' * len(REPORT_RECOMMENDATIONS))})
+            """, (SUMMARY_DONE,) + REPORT_RECOMMENDATIONS)
+            logger.info(f"数据库迁移：已标记 {cursor.rowcount} 篇日报候选文章")
+
+    @staticmethod
+    def _migrate_summary_sentinels(cursor):
+        """
+        旧版本把失败原因以“⚠️ ...”写在 summary 中，这里转换为 summary_status：
+        内容过短、低质、内容为空记为 skipped，其余记为 failed 并立即允许重试；summary 和占位关键词清空
+        """
+        cursor.execute(
+            "UPDATE articles SET summary_status = ? WHERE summary IS NOT NULL AND summary != '' AND summary NOT LIKE '⚠️%'",
+            (SUMMARY_DONE,)
+        )
+        done = cursor.rowcount
+        skip_markers = ('无需生成', '低质', '内容为空')
+        cursor.execute(f"""
+            UPDATE articles
+            SET summary_status = ?, summary_error = ltrim(summary, '⚠️ '), summary_attempts = 1,
+                summary = NULL, keywords = NULL
+            WHERE summary LIKE '⚠️%' AND ({' OR '.join('instr(summary, ?) > 0' for _ in skip_markers)})
+        """, (SUMMARY_SKIPPED,) + skip_markers)
+        skipped = cursor.rowcount
+        cursor.execute("""
+            UPDATE articles
+            SET summary_status = ?, summary_error = ltrim(summary, '⚠️ '), summary_attempts = 1,
+                summary_next_retry_at = datetime('now'), summary = NULL, keywords = NULL
+            WHERE summary LIKE '⚠️%'
+        """, (SUMMARY_FAILED,))
+        logger.info(f"数据库迁移：摘要状态 done={done}，skipped={skipped}，failed={cursor.rowcount}")
+
+    def _init_fts(self, cursor) -> bool:
+        """
+        创建文章全文索引 articles_fts（FTS5 外部内容表，由触发器与 articles 保持同步）
+        使用 trigram 分词，按字符三元组建索引，中文无需分词即可检索
+        当前 SQLite 不支持 FTS5 trigram（需要 3.34+）时返回 False，搜索退回 LIKE
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'articles_fts'")
+        is_new = cursor.fetchone() is None
+
+        try:
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+                    title, summary, keywords, content,
+                    content='articles', content_rowid='id',
+                    tokenize='trigram'
+                )
+            ''')
+        except sqlite3.OperationalError as e:
+            logger.warning(f"当前 SQLite 不支持 FTS5 trigram，文章搜索将使用 LIKE：{e}")
+            return False
+
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS articles_fts_ai AFTER INSERT ON articles BEGIN
+                INSERT INTO articles_fts (rowid, title, summary, keywords, content)
+                VALUES (new.id, new.title, new.summary, new.keywords, new.content);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS articles_fts_ad AFTER DELETE ON articles BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, title, summary, keywords, content)
+                VALUES ('delete', old.id, old.title, old.summary, old.keywords, old.content);
+            END
+        ''')
+        # 只在被索引的字段变化时更新，标星/选中等操作不触碰全文索引
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS articles_fts_au
+            AFTER UPDATE OF title, summary, keywords, content ON articles BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, title, summary, keywords, content)
+                VALUES ('delete', old.id, old.title, old.summary, old.keywords, old.content);
+                INSERT INTO articles_fts (rowid, title, summary, keywords, content)
+                VALUES (new.id, new.title, new.summary, new.keywords, new.content);
+            END
+        ''')
+
+        if is_new:
+            # 首次创建时为已有文章建立索引
+            cursor.execute("INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')")
+            logger.info("数据库迁移：已为现有文章建立全文索引")
+        return True
+
+    @staticmethod
+    def _add_column_if_missing(cursor, table: str, column: str, definition: str) -> bool:
+        """字段不存在时执行 ALTER TABLE 添加，返回是否新增了字段"""
+        cursor.execute(f"PRAGMA table_info({table})")
+        if column in {row[1] for row in cursor.fetchall()}:
+            return False
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        logger.info(f"数据库迁移：{table} 表新增字段 {column}")
+        return True
+
     # ==================== 订阅源操作 ====================
 
     def add_feed(self, url: str, name: str, category: str = "默认") -> int:
@@ -128,15 +431,16 @@ class Database:
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM feeds WHERE id = ?", (feed_id,))
+            cursor.execute("DELETE FROM feed_schedule WHERE feed_id = ?", (feed_id,))
             conn.commit()
 
-    def update_feed_fetch_time(self, feed_id: int):
-        """更新订阅源最后抓取时间"""
+    def update_feed_fetch_time(self, feed_id: int, etag: str = None, last_modified: str = None):
+        """更新订阅源最后抓取时间，同时保存本次响应的缓存校验信息"""
         with self._get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                "UPDATE feeds SET last_fetched = ? WHERE id = ?",
-                (datetime.now().isoformat(), feed_id)
+                "UPDATE feeds SET last_fetched = ?, etag = ?, last_modified = ? WHERE id = ?",
+                (datetime.now().isoformat(), etag, last_modified, feed_id)
             )
             conn.commit()
 
@@ -150,15 +454,97 @@ class Database:
             cursor = conn.cursor()
             try:
                 cursor.execute('''
-                    INSERT INTO articles (feed_id, guid, title, url, content, published_at)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (feed_id, guid, title, url, content, published_at))
+                    INSERT INTO articles (feed_id, guid, title, url, content, published_at, published_day)
+                    VALUES (?, ?, ?, ?, ?, ?, date(?))
+                ''', (feed_id, guid, title, url, content, published_at, published_at))
                 conn.commit()
                 return cursor.lastrowid
             except sqlite3.IntegrityError:
                 # 文章已存在
                 return None
 
+    def get_existing_guids(self, feed_id: int, guids: List[str]) -> set:
+        """返回订阅源下已入库的 guid，用于在清洗正文前跳过旧文章"""
+        existing = set()
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            for chunk in _chunked(list(guids)):
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(
+                    f"SELECT guid FROM articles WHERE feed_id = ? AND guid IN ({placeholders})",
+                    [feed_id, *chunk]
+                )
+                existing.update(row[0] for row in cursor.fetchall())
+        return existing
+
+    def add_articles_bulk(self, feed_id: int, entries: List[Dict]) -> List[int]:
+        """
+        批量添加同一订阅源的文章，整批在一个事务内完成
+        :param entries: 每项包含 guid, title, url, content, published_at
+        :return: 实际新插入的文章 id 列表（按 entries 顺序，已存在的文章不返回）
+        """
+        # 同一批次内按 guid 去重，保留第一次出现的条目
+        unique_entries = {}
+        for entry in entries:
+            if entry.get('guid'):
+                unique_entries.setdefault(entry['guid'], entry)
+        if not unique_entries:
+            return []
+
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            # 立即获取写锁，避免查询已存在 guid 与插入之间被其他线程插入同一文章
+            cursor.execute("BEGIN IMMEDIATE")
+
+            existing_guids = set()
+            for chunk in _chunked(list(unique_entries)):
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(
+                    f"SELECT guid FROM articles WHERE feed_id = ? AND guid IN ({placeholders})",
+                    [feed_id, *chunk]
+                )
+                existing_guids.update(row[0] for row in cursor.fetchall())
+
+            new_entries = [e for guid, e in unique_entries.items() if guid not in existing_guids]
+            if not new_entries:
+                conn.commit()
+                return []
+
+            cursor.executemany('''
+                INSERT OR IGNORE INTO articles (feed_id, guid, title, url, content, published_at, published_day)
+                VALUES (?, ?, ?, ?, ?, ?, date(?))
+            ''', [
+                (feed_id, e['guid'], e['title'], e.get('url'), e.get('content'),
+                 e.get('published_at'), e.get('published_at'))
+                for e in new_entries
+            ])
+
+            ids_by_guid = {}
+            new_guids = [e['guid'] for e in new_entries]
+            for chunk in _chunked(new_guids):
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(
+                    f"SELECT id, guid FROM articles WHERE feed_id = ? AND guid IN ({placeholders})",
+                    [feed_id, *chunk]
+                )
+                ids_by_guid.update({row[1]: row[0] for row in cursor.fetchall()})
+            conn.commit()
+
+        return [ids_by_guid[guid] for guid in new_guids if guid in ids_by_guid]
+
+    def get_articles_by_ids(self, article_ids: List[int], columns: List[str] = None) -> List[Dict]:
+        """按 id 批量获取文章，返回顺序与 article_ids 一致"""
+        select = ', '.join(columns) if columns else '*'
+        rows = {}
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            for chunk in _chunked(list(article_ids)):
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(f"SELECT {select} FROM articles WHERE id IN ({placeholders})", chunk)
+                for row in cursor.fetchall():
+                    rows[row['id']] = dict(row)
+        return [rows[i] for i in article_ids if i in rows]
+
     def get_articles(self, feed_id: int = None, selected_only: bool = False,
                     starred_only: bool = False) -> List[Dict]:
         """获取文章列表"""
@@ -195,10 +581,10 @@ class Database:
 
             # 日期范围筛选
             if start_date:
-                query += " AND date(a.published_at) >= date(?)"
+                query += " AND a.published_day >= date(?)"
                 params.append(start_date)
             if end_date:
-                query += " AND date(a.published_at) <= date(?)"
+                query += " AND a.published_day <= date(?)"
                 params.append(end_date)
 
             # 订阅源筛选
@@ -302,10 +688,61 @@ class Database:
             )
             conn.commit()
 
+    def _set_flag_bulk(self, column: str, article_ids: List[int], value: bool) -> int:
+        """批量设置 is_selected / is_starred，整批在一个事务内完成，返回更新的行数"""
+        if column not in ('is_selected', 'is_starred'):
+            raise ValueError(f"不支持批量设置的字段：{column}")
+        article_ids = list(article_ids)
+        if not article_ids:
+            return 0
+
+        updated = 0
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            for chunk in _chunked(article_ids):
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(
+                    f"UPDATE articles SET {column} = ? WHERE id IN ({placeholders})",
+                    [1 if value else 0, *chunk]
+                )
+                updated += cursor.rowcount
+            conn.commit()
+        return updated
+
+    def select_articles(self, article_ids: List[int], selected: bool = True) -> int:
+        """批量设置文章选中状态"""
+        return self._set_flag_bulk('is_selected', article_ids, selected)
+
+    def star_articles(self, article_ids: List[int], starred: bool = True) -> int:
+        """批量设置文章标星状态"""
+        return self._set_flag_bulk('is_starred', article_ids, starred)
+
+    def select_articles_by_filter(self, selected: bool = True, **filters) -> int:
+        """
+        按筛选条件（与 get_articles_paginated 相同的参数）一次性设置所有匹配文章的选中状态
+        :return: 更新的行数
+        """
+        join, where, params, _ = self._build_article_filters(**filters)
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"UPDATE articles SET is_selected = ? WHERE id IN (SELECT a.id FROM articles a{join}{where})",
+                [1 if selected else 0, *params]
+            )
+            conn.commit()
+            return cursor.rowcount
+
     def get_selected_articles(self) -> List[Dict]:
         """获取选中的文章"""
         return self.get_articles(selected_only=True)
 
+    def get_selected_count(self) -> int:
+        """获取选中文章数量"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM articles WHERE is_selected = 1")
+            return cursor.fetchone()[0]
+
     def get_starred_articles(self) -> List[Dict]:
         """获取标星的文章"""
         return self.get_articles(starred_only=True)
@@ -346,122 +783,348 @@ class Database:
 
     # ==================== 分页查询方法 ====================
 
+    def _build_search_filter(self, search_keyword: str) -> Tuple[str, str, List, Optional[str]]:
+        """
+        构建搜索条件
+        - 长度 >= 3 的词走 FTS5 trigram 全文索引（MATCH），并可按 bm25 相关度排序
+        - trigram 无法匹配少于 3 个字符的词（如“模型”），这类词退回到 LIKE 匹配（标题、摘要、关键词、正文）
+        :return: (额外 JOIN, WHERE 片段, 参数, 相关度排序表达式或 None)
+        """
+        terms = search_keyword.split()
+        fts_terms = [t for t in terms if len(t) >= 3] if self.fts_enabled else []
+        like_terms = [t for t in terms if t not in fts_terms]
+
+        join = ""
+        conditions = []
+        params = []
+        rank_expr = None
+
+        if fts_terms:
+            # 每个词作为短语加引号，避免用户输入被解析为 FTS 查询语法
+            match_query = ' '.join('"' + t.replace('"', '""') + '"' for t in fts_terms)
+            join = " JOIN articles_fts ON articles_fts.rowid = a.id"
+            conditions.append("articles_fts MATCH ?")
+            params.append(match_query)
+            # 标题命中的权重最高，其次是摘要和关键词
+            rank_expr = "bm25(articles_fts, 10.0, 5.0, 5.0, 1.0)"
+
+        for term in like_terms:
+            keyword = f"%{term}%"
+            # 与全文索引覆盖相同的四列，搜索结果不随词长变化；LIKE 无法用索引，
+            # 需要逐行扫描正文，但通常与其他筛选条件或长词的 MATCH 组合使用，扫描范围有限
+            conditions.append("(a.title LIKE ? OR a.summary LIKE ? OR a.keywords LIKE ? OR a.content LIKE ?)")
+            params.extend([keyword, keyword, keyword, keyword])
+
+        return join, " AND ".join(conditions), params, rank_expr
+
+    def _build_article_filters(self, feed_id: int = None, selected_only: bool = False,
+                               starred_only: bool = False, start_date: str = None,
+                               end_date: str = None, has_summary: bool = None,
+                               search_keyword: str = None,
+                               quality_recommendation: str = None) -> Tuple[str, str, List, Optional[str]]:
+        """
+        构建文章列表的筛选条件，分页查询和计数共用
+        :return: (额外 JOIN, WHERE 子句, 参数, 相关度排序表达式或 None)
+        """
+        join = ""
+        where = " WHERE 1=1"
+        params = []
+        rank_expr = None
+
+        if feed_id:
+            where += " AND a.feed_id = ?"
+            params.append(feed_id)
+        if selected_only:
+            where += " AND a.is_selected = 1"
+        if starred_only:
+            where += " AND a.is_starred = 1"
+
+        # 日期范围筛选
+        if start_date:
+            where += " AND a.published_day >= date(?)"
+            params.append(start_date)
+        if end_date:
+            where += " AND a.published_day <= date(?)"
+            params.append(end_date)
+
+        # 摘要状态筛选
+        if has_summary is not None:
+            if has_summary:
+                where += " AND a.summary IS NOT NULL AND a.summary != ''"
+            else:
+                where += " AND (a.summary IS NULL OR a.summary = '')"
+
+        # 全文搜索
+        if search_keyword and search_keyword.strip():
+            join, search_where, search_params, rank_expr = self._build_search_filter(search_keyword)
+            if search_where:
+                where += f" AND {search_where}"
+                params.extend(search_params)
+
+        # 推荐建议：直接使用字段精确匹配
+        if quality_recommendation:
+            where += " AND a.quality_recommendation = ?"
+            params.append(quality_recommendation)
+
+        return join, where, params, rank_expr
+
     def get_articles_paginated(self, feed_id: int = None, selected_only: bool = False,
                                starred_only: bool = False, start_date: str = None,
                                end_date: str = None, has_summary: bool = None,
                                search_keyword: str = None,
                                page: int = 1, page_size: int = 50,
                                sort_by: str = 'time',
-                               quality_recommendation: str = None) -> List[Dict]: # 确保参数列表包含此字段
+                               quality_recommendation: str = None) -> List[Dict]:
         """
         分页获取文章列表
+        sort_by: time(时间倒序) / score, time_score(评分优先) / relevance(搜索相关度，无搜索词时按时间)
         """
+        join, where, params, rank_expr = self._build_article_filters(
+            feed_id=feed_id, selected_only=selected_only, starred_only=starred_only,
+            start_date=start_date, end_date=end_date, has_summary=has_summary,
+            search_keyword=search_keyword, quality_recommendation=quality_recommendation
+        )
+
+        query = f"SELECT a.*, f.name as feed_name, f.category FROM articles a JOIN feeds f ON a.feed_id = f.id{join}{where}"
+
+        # 排序逻辑
+        if sort_by == 'relevance' and rank_expr:
+            query += f" ORDER BY {rank_expr}, a.published_at DESC"
+        elif sort_by in ('score', 'time_score'):
+            query += " ORDER BY COALESCE(a.quality_score, 0) DESC, a.published_at DESC, a.id DESC"
+        else:
+            query += " ORDER BY a.published_at DESC, a.id DESC"
+
+        # 分页
+        offset = (page - 1) * page_size
+        query += " LIMIT ? OFFSET ?"
+        params.extend([page_size, offset])
+
         with self._get_connection() as conn:
             cursor = conn.cursor()
-
-            query = "SELECT a.*, f.name as feed_name, f.category FROM articles a JOIN feeds f ON a.feed_id = f.id WHERE 1=1"
-            params = []
-
-            if feed_id:
-                query += " AND a.feed_id = ?"
-                params.append(feed_id)
-            if selected_only:
-                query += " AND a.is_selected = 1"
-            if starred_only:
-                query += " AND a.is_starred = 1"
-            if start_date:
-                query += " AND date(a.published_at) >= date(?)"
-                params.append(start_date)
-            if end_date:
-                query += " AND date(a.published_at) <= date(?)"
-                params.append(end_date)
-            if has_summary is not None:
-                if has_summary:
-                    query += " AND a.summary IS NOT NULL AND a.summary != ''"
-                else:
-                    query += " AND (a.summary IS NULL OR a.summary = '')"
-            if search_keyword:
-                keyword = f"%{search_keyword}%"
-                query += " AND (a.title LIKE ? OR a.summary LIKE ? OR a.keywords LIKE ?)"
-                params.extend([keyword, keyword, keyword])
-
-            # === 修改开始：直接使用字段精确匹配 ===
-            if quality_recommendation:
-                query += " AND a.quality_recommendation = ?"
-                params.append(quality_recommendation)
-            # === 修改结束 ===
-
-            # 排序逻辑
-            if sort_by == 'score':
-                query += " ORDER BY a.quality_score DESC, a.published_at DESC"
-            elif sort_by == 'time_score':
-                query += " ORDER BY a.quality_score DESC, a.published_at DESC"
-            else:
-                query += " ORDER BY a.published_at DESC, a.fetched_at DESC"
-
-            # 分页
-            offset = (page - 1) * page_size
-            query += " LIMIT ? OFFSET ?"
-            params.extend([page_size, offset])
-
             cursor.execute(query, params)
             return [dict(row) for row in cursor.fetchall()]
 
-
     def get_articles_count(self, feed_id: int = None, selected_only: bool = False,
                           starred_only: bool = False, start_date: str = None,
                           end_date: str = None, has_summary: bool = None,
                           search_keyword: str = None,
-                          quality_recommendation: str = None) -> int: # 确保参数列表包含此字段
+                          quality_recommendation: str = None) -> int:
         """
         获取符合条件的文章总数
         """
+        join, where, params, _ = self._build_article_filters(
+            feed_id=feed_id, selected_only=selected_only, starred_only=starred_only,
+            start_date=start_date, end_date=end_date, has_summary=has_summary,
+            search_keyword=search_keyword, quality_recommendation=quality_recommendation
+        )
+
         with self._get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute(f"SELECT COUNT(*) FROM articles a{join}{where}", params)
+            return cursor.fetchone()[0]
 
-            query = "SELECT COUNT(*) FROM articles a WHERE 1=1"
-            params = []
+    # 键集分页的排序键：(SQL 表达式, 文章字典中的字段)，最后一列必须是唯一的 id
+    # 行值比较遇到 NULL 结果为 NULL，可能为空的列统一 COALESCE 成可比较的值（排序位置与 NULL 相同，排在最后）
+    KEYSET_SORT_KEYS = {
+        'time': [("COALESCE(a.published_at, '')", 'published_at'), ("a.id", 'id')],
+        'score': [("COALESCE(a.quality_score, 0)", 'quality_score'),
+                  ("COALESCE(a.published_at, '')", 'published_at'), ("a.id", 'id')],
+    }
+    # keyset_cursor 中与上面 COALESCE 对应的默认值
+    KEYSET_NULL_DEFAULTS = {'quality_score': 0, 'published_at': ''}
+    KEYSET_SORT_KEYS['time_score'] = KEYSET_SORT_KEYS['score']
+
+    @classmethod
+    def keyset_cursor(cls, article: Dict, sort_by: str = 'time') -> Tuple:
+        """根据一页中最后一篇文章生成下一页的游标"""
+        values = []
+        for _, field in cls.KEYSET_SORT_KEYS[sort_by]:
+            value = article.get(field)
+            # 与排序表达式中的 COALESCE 保持一致
+            if value is None:
+                value = cls.KEYSET_NULL_DEFAULTS.get(field)
+            values.append(value)
+        return tuple(values)
+
+    def get_articles_keyset(self, cursor: Tuple = None, page_size: int = 50,
+                            sort_by: str = 'time', **filters) -> List[Dict]:
+        """
+        键集（游标）分页获取文章列表，翻到任意深度的耗时都与第一页相同
+        :param cursor: 上一页最后一篇文章的排序键，由 keyset_cursor 生成；None 表示第一页
+                       按时间排序时为 (published_at, id)，按评分排序时为 (quality_score, published_at, id)
+        :param sort_by: time / score / time_score（相关度排序请使用 get_articles_paginated）
+        :param filters: 与 get_articles_paginated 相同的筛选条件
+        """
+        sort_keys = self.KEYSET_SORT_KEYS[sort_by]
+        join, where, params, _ = self._build_article_filters(**filters)
 
-            if feed_id:
-                query += " AND a.feed_id = ?"
-                params.append(feed_id)
+        if cursor is not None:
+            # 全部降序排列，行值比较 (k1, k2, id) < (?, ?, ?) 即为“排在游标之后”
+            columns = ', '.join(expr for expr, _ in sort_keys)
+            where += f" AND ({columns}) < ({', '.join('?' * len(sort_keys))})"
+            params.extend(cursor)
 
-            if selected_only:
-                query += " AND a.is_selected = 1"
+        order = ', '.join(f"{expr} DESC" for expr, _ in sort_keys)
+        query = (f"SELECT a.*, f.name as feed_name, f.category FROM articles a "
+                 f"JOIN feeds f ON a.feed_id = f.id{join}{where} ORDER BY {order} LIMIT ?")
+        params.append(page_size)
 
-            if starred_only:
-                query += " AND a.is_starred = 1"
+        with self._get_connection() as conn:
+            cur = conn.cursor()
+            cur.execute(query, params)
+            return [dict(row) for row in cur.fetchall()]
 
-            # 日期范围筛选
-            if start_date:
-                query += " AND date(a.published_at) >= date(?)"
-                params.append(start_date)
-            if end_date:
-                query += " AND date(a.published_at) <= date(?)"
-                params.append(end_date)
+    def get_articles_count_cached(self, **filters) -> int:
+        """
+        带缓存的文章计数，参数与 get_articles_count 相同
+        数据库自上次计数以来没有任何写入（本连接的 total_changes 与 PRAGMA data_version 均未变化）时直接返回缓存结果
+        """
+        conn = self._get_connection()
+        version = (conn.execute("PRAGMA data_version").fetchone()[0], conn.total_changes)
+        key = tuple(sorted(filters.items()))
+
+        # 缓存按线程保存，因为 data_version 只对同一连接有意义
+        cache = getattr(self._local, 'count_cache', None)
+        if cache is None or cache.get('version') != version:
+            cache = {'version': version, 'counts': {}}
+            self._local.count_cache = cache
+
+        if key not in cache['counts']:
+            cache['counts'][key] = self.get_articles_count(**filters)
+        return cache['counts'][key]
 
-            # 摘要状态筛选
-            if has_summary is not None:
-                if has_summary:
-                    query += " AND a.summary IS NOT NULL AND a.summary != ''"
-                else:
-                    query += " AND (a.summary IS NULL OR a.summary = '')"
 
-            # 模糊搜索
-            if search_keyword:
-                keyword = f"%{search_keyword}%"
-                query += " AND (a.title LIKE ? OR a.summary LIKE ? OR a.keywords LIKE ?)"
-                params.extend([keyword, keyword, keyword])
+    # ==================== 抓取调度 ====================
 
-            # === 修改开始：直接使用字段精确匹配 ===
-            if quality_recommendation:
-                query += " AND a.quality_recommendation = ?"
-                params.append(quality_recommendation)
-            # === 修改结束 ===
+    def get_feed_schedules(self) -> Dict[int, Dict]:
+        """获取所有订阅源的调度状态：{feed_id: 状态}"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM feed_schedule")
+            return {row['feed_id']: dict(row) for row in cursor.fetchall()}
 
+    def save_feed_schedules(self, schedules: List[Dict]):
+        """批量保存调度状态（每项包含 feed_schedule 表的全部字段）"""
+        if not schedules:
+            return
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                INSERT OR REPLACE INTO feed_schedule
+                    (feed_id, interval_seconds, next_due_at, failure_count, last_attempt_at, last_success_at)
+                VALUES (:feed_id, :interval_seconds, :next_due_at, :failure_count, :last_attempt_at, :last_success_at)
+            ''', schedules)
+            conn.commit()
+
+    def get_feed_publish_history(self, feed_id: int, limit: int = 20) -> List[str]:
+        """获取订阅源最近 limit 篇文章的发布时间（新到旧）"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT published_at FROM articles WHERE feed_id = ? AND published_at IS NOT NULL "
+                "ORDER BY published_at DESC LIMIT ?",
+                (feed_id, limit)
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    # ==================== 近似重复 ====================
+
+    def add_article_fingerprint(self, article_id: int, simhash: int, bands: List[int]):
+        """保存文章指纹（simhash 为有符号 64 位整数）"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT OR REPLACE INTO article_fingerprints "
+                "(article_id, simhash, band0, band1, band2, band3) VALUES (?, ?, ?, ?, ?, ?)",
+                (article_id, simhash, *bands)
+            )
+            conn.commit()
+
+    def find_fingerprint_candidates(self, bands: List[int], window_days: int = None) -> List[Dict]:
+        """查找任一分段相同的指纹，作为近似重复候选"""
+        query = '''
+            SELECT fp.article_id, fp.simhash, a.duplicate_of
+            FROM article_fingerprints fp
+            JOIN articles a ON a.id = fp.article_id
+            WHERE (fp.band0 = ? OR fp.band1 = ? OR fp.band2 = ? OR fp.band3 = ?)
+        '''
+        params = list(bands)
+        if window_days:
+            query += " AND fp.created_at >= datetime('now', ?)"
+            params.append(f"-{int(window_days)} days")
+
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
             cursor.execute(query, params)
-            return cursor.fetchone()[0]
+            return [dict(row) for row in cursor.fetchall()]
 
+    def mark_duplicates(self, duplicates: Dict[int, int]):
+        """把重复文章指向原文：{重复文章 id: 原文 id}"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(
+                "UPDATE articles SET duplicate_of = ?, report_eligible = 0 WHERE id = ?",
+                [(canonical_id, article_id) for article_id, canonical_id in duplicates.items()]
+            )
+            conn.commit()
+
+    # ==================== 摘要缓存 ====================
+
+    def get_cached_summary(self, content_hash: str) -> Optional[Dict]:
+        """按内容哈希查找缓存的摘要，命中时刷新最近使用时间"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT keywords, summary_content FROM summary_cache WHERE content_hash = ?",
+                (content_hash,)
+            )
+            row = cursor.fetchone()
+            if not row:
+                return None
+            cursor.execute(
+                "UPDATE summary_cache SET last_used_at = CURRENT_TIMESTAMP, hit_count = hit_count + 1 "
+                "WHERE content_hash = ?",
+                (content_hash,)
+            )
+            conn.commit()
+            return dict(row)
+
+    def put_cached_summary(self, content_hash: str, keywords: str, summary_content: str):
+        """写入摘要缓存（summary_content 含 ---QUALITY--- 之后的质量 JSON）"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT OR REPLACE INTO summary_cache (content_hash, keywords, summary_content) VALUES (?, ?, ?)",
+                (content_hash, keywords, summary_content)
+            )
+            conn.commit()
+
+    def prune_summary_cache(self, max_entries: int = None, ttl_days: int = None) -> int:
+        """
+        淘汰摘要缓存：先删除超过 ttl_days 未使用的条目，
+        再按最近使用时间（LRU）只保留 max_entries 条
+        :return: 删除的条目数
+        """
+        removed = 0
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            if ttl_days:
+                cursor.execute(
+                    "DELETE FROM summary_cache WHERE last_used_at < datetime('now', ?)",
+                    (f"-{int(ttl_days)} days",)
+                )
+                removed += cursor.rowcount
+            if max_entries:
+                cursor.execute('''
+                    DELETE FROM summary_cache WHERE content_hash NOT IN (
+                        SELECT content_hash FROM summary_cache
+                        ORDER BY last_used_at DESC LIMIT ?
+                    )
+                ''', (int(max_entries),))
+                removed += cursor.rowcount
+            conn.commit()
+        return removed
 
     # ==================== 设置操作 ====================
 
@@ -498,7 +1161,7 @@ class Database:
 
             # 按日期筛选
             if date:
-                query += " AND date(a.published_at) = date(?)"
+                query += " AND a.published_day = date(?)"
                 params.append(date)
 
             # 按摘要状态筛选
@@ -515,9 +1178,14 @@ class Database:
 
 
     def get_articles_without_summary(self, limit: int = 50,days_ago=None) -> List[Dict]:
-        """获取没有生成摘要的文章"""
-        query = "SELECT * FROM articles WHERE summary IS NULL OR summary = ''"
-        params = []
+        """获取待生成摘要的文章：未处理的，以及失败后已到重试时间的"""
+        # 近似重复的文章复用原文，不单独生成摘要
+        query = """
+            SELECT * FROM articles
+            WHERE (summary_status = ? OR (summary_status = ? AND summary_next_retry_at <= datetime('now')))
+              AND duplicate_of IS NULL
+        """
+        params = [SUMMARY_PENDING, SUMMARY_FAILED]
 
         if days_ago:
             # 添加时间过滤条件：published_at >= (当前时间 - days_ago 天)
@@ -530,7 +1198,7 @@ class Database:
             # 修复：使用上下文管理器获取连接和 cursor
             with self._get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute(query, (limit,))
+                cursor.execute(query, params)
                 rows = cursor.fetchall()
                 return [dict(zip([col[0] for col in cursor.description], row)) for row in rows]
         except Exception as e:
@@ -572,9 +1240,16 @@ class Database:
                 quality_recommendation = ?,
                 quality_honesty_level = ?,
                 quality_category = ?,
-                quality_raw_json = ?
+                quality_raw_json = ?,
+                summary_status = ?,
+                summary_attempts = summary_attempts + 1,
+                summary_error = NULL,
+                summary_next_retry_at = NULL,
+                report_eligible = CASE WHEN duplicate_of IS NULL THEN ? ELSE 0 END
             WHERE id = ?
         """
+        # 摘要完成时一次性判定能否进入日报候选池，生成日报时直接按索引取
+        eligible = int(is_report_eligible(SUMMARY_DONE, quality_rec))
 
         try:
             # 修复：使用上下文管理器获取连接和 cursor
@@ -588,6 +1263,8 @@ class Database:
                     quality_honesty,
                     quality_cat,
                     quality_json,
+                    SUMMARY_DONE,
+                    eligible,
                     article_id
                 ))
                 conn.commit() # 上下文管理器退出时会自动 commit/close，但显式调用也没问题
@@ -595,3 +1272,180 @@ class Database:
             logger.error(f"Error updating article summary and quality: {e}")
             # 注意：在使用 with 语句时，通常不需要手动 rollback，上下文管理器会在异常时处理
             # 但如果需要显式控制，可以在 with 块内捕获异常后处理，这里保持简单让 with 处理
+
+    def record_summary_failure(self, article_id: int, status: str, error: str,
+                               next_retry_at: Optional[str] = None):
+        """
+        记录摘要未生成的原因，summary 保持为空
+        :param status: SUMMARY_SKIPPED 或 SUMMARY_FAILED
+        :param next_retry_at: 下次重试时间（UTC，'YYYY-MM-DD HH:MM:SS'），为空表示不再重试
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE articles
+                SET summary_status = ?,
+                    summary_error = ?,
+                    summary_next_retry_at = ?,
+                    summary_attempts = summary_attempts + 1,
+                    report_eligible = 0
+                WHERE id = ?
+            """, (status, error, next_retry_at, article_id))
+            conn.commit()
+
+    # ==================== 摘要任务队列 ====================
+
+    def enqueue_pending_summaries(self, days_ago: int = None,
+                                  priority: int = SUMMARY_JOB_PRIORITY_NORMAL) -> int:
+        """
+        把待生成摘要的文章加入任务队列（已在队列中的不重复加入），返回新入队的篇数
+        失败待重试的文章在重试时间到达后才可领取
+        """
+        query = """
+            INSERT OR IGNORE INTO summary_jobs (article_id, priority, available_at)
+            SELECT id, ?, COALESCE(summary_next_retry_at, datetime('now')) FROM articles
+            WHERE (summary_status = ? OR (summary_status = ? AND summary_next_retry_at IS NOT NULL))
+              AND duplicate_of IS NULL
+        """
+        params = [priority, SUMMARY_PENDING, SUMMARY_FAILED]
+        if days_ago:
+            query += " AND published_at >= datetime('now', ?)"
+            params.append(f"-{days_ago} days")
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            conn.commit()
+            return cursor.rowcount
+
+    def enqueue_summary_jobs(self, article_ids: List[int], priority: int = SUMMARY_JOB_PRIORITY_MANUAL) -> int:
+        """
+        把指定文章加入任务队列；已在队列中的提升到较高的优先级，
+        未被领取的立即变为可领取（跳过失败后的重试等待）
+        :return: 实际新入队或被提前、提升优先级的任务数（不存在的文章和无需改动的任务不计）
+        """
+        if not article_ids:
+            return 0
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            # INSERT ... SELECT 后接 ON CONFLICT 时必须带 WHERE，这里正好用来过滤不存在的文章
+            cursor.executemany("""
+                INSERT INTO summary_jobs (article_id, priority)
+                SELECT id, ? FROM articles WHERE id = ?
+                ON CONFLICT(article_id) DO UPDATE SET
+                    priority = MAX(priority, excluded.priority),
+                    available_at = CASE WHEN lease_owner IS NULL
+                                        THEN MIN(available_at, excluded.available_at)
+                                        ELSE available_at END
+                WHERE excluded.priority > summary_jobs.priority
+                   OR (summary_jobs.lease_owner IS NULL AND summary_jobs.available_at > excluded.available_at)
+            """, [(priority, article_id) for article_id in article_ids])
+            conn.commit()
+            # executemany 的 rowcount 为各条语句实际修改行数之和
+            return cursor.rowcount
+
+    def claim_summary_jobs(self, lease_owner: str, limit: int, lease_seconds: int) -> List[Dict]:
+        """
+        领取最多 limit 个可执行的任务，返回对应文章（附带 job_lease_owner、job_attempts）
+        顺序：任务优先级 > 标星/选中 > 发布时间新的优先
+        领取和写租约在同一条 UPDATE 中完成，多个线程/进程同时领取不会拿到同一任务；
+        lease_owner 每次领取应唯一，完成或释放任务时凭它确认租约仍属于自己
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE summary_jobs
+                SET lease_owner = ?, available_at = datetime('now', ?), attempts = attempts + 1
+                WHERE article_id IN (
+                    SELECT j.article_id FROM summary_jobs j
+                    JOIN articles a ON a.id = j.article_id
+                    WHERE j.available_at <= datetime('now')
+                    ORDER BY j.priority DESC, (a.is_starred OR a.is_selected) DESC, a.published_at DESC
+                    LIMIT ?
+                )
+            """, (lease_owner, f"+{int(lease_seconds)} seconds", limit))
+            conn.commit()
+            if not cursor.rowcount:
+                return []
+            cursor.execute("""
+                SELECT a.*, j.lease_owner AS job_lease_owner, j.attempts AS job_attempts
+                FROM summary_jobs j
+                JOIN articles a ON a.id = j.article_id
+                WHERE j.lease_owner = ?
+                ORDER BY j.priority DESC, (a.is_starred OR a.is_selected) DESC, a.published_at DESC
+            """, (lease_owner,))
+            return [dict(row) for row in cursor.fetchall()]
+
+    def finish_summary_job(self, article_id: int, lease_owner: str, max_attempts: int, retry_seconds: int):
+        """
+        按文章的摘要状态结束任务：已生成、已跳过、已放弃或转为重复的出队；
+        失败待重试的释放租约，到 summary_next_retry_at 后再领取；
+        未记录状态（处理中途异常）的在 retry_seconds 后重试，任务领取达到 max_attempts 次后
+        把文章记为已放弃再出队，之后 enqueue_pending_summaries 不会再把它加入队列
+        租约已被他人接管（超时后重新领取）时不做任何修改
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE articles
+                SET summary_status = ?,
+                    summary_error = ?,
+                    summary_next_retry_at = NULL,
+                    summary_attempts = MAX(summary_attempts + 1, ?),
+                    report_eligible = 0
+                WHERE id = ? AND summary_status = ? AND EXISTS (
+                    SELECT 1 FROM summary_jobs
+                    WHERE article_id = articles.id AND lease_owner = ? AND attempts >= ?
+                )
+            """, (SUMMARY_FAILED, f"处理过程中异常中断 {max_attempts} 次，不再自动重试", max_attempts,
+                  article_id, SUMMARY_PENDING, lease_owner, max_attempts))
+            cursor.execute("""
+                DELETE FROM summary_jobs
+                WHERE article_id = ? AND lease_owner = ? AND EXISTS (
+                    SELECT 1 FROM articles a
+                    WHERE a.id = summary_jobs.article_id
+                      AND (a.duplicate_of IS NOT NULL
+                           OR a.summary_status IN (?, ?)
+                           OR (a.summary_status = ? AND a.summary_next_retry_at IS NULL))
+                )
+            """, (article_id, lease_owner, SUMMARY_DONE, SUMMARY_SKIPPED, SUMMARY_FAILED))
+            if not cursor.rowcount:
+                cursor.execute("""
+                    UPDATE summary_jobs
+                    SET lease_owner = NULL,
+                        available_at = COALESCE(
+                            (SELECT summary_next_retry_at FROM articles
+                             WHERE id = summary_jobs.article_id AND summary_status = ?),
+                            datetime('now', ?))
+                    WHERE article_id = ? AND lease_owner = ?
+                """, (SUMMARY_FAILED, f"+{int(retry_seconds)} seconds", article_id, lease_owner))
+            conn.commit()
+
+    def release_summary_jobs(self, lease_owners: List[str]) -> int:
+        """释放未完成任务的租约，使其立即可被重新领取（工作者正常退出时调用）"""
+        if not lease_owners:
+            return 0
+        released = 0
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            for chunk in _chunked(list(lease_owners)):
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(
+                    f"UPDATE summary_jobs SET lease_owner = NULL, available_at = datetime('now') "
+                    f"WHERE lease_owner IN ({placeholders})",
+                    chunk
+                )
+                released += cursor.rowcount
+            conn.commit()
+        return released
+
+    def get_summary_queue_stats(self) -> Dict[str, int]:
+        """队列概况：ready 为可立即领取的任务数，leased 为租约未到期的任务数，total 为队列中的总数"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT COUNT(*) AS total,
+                       COALESCE(SUM(available_at <= datetime('now')), 0) AS ready,
+                       COALESCE(SUM(lease_owner IS NOT NULL AND available_at > datetime('now')), 0) AS leased
+                FROM summary_jobs
+            """)
+            return dict(cursor.fetchone())
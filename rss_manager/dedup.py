@@ -0,0 +1,125 @@
+"""
+近似重复检测模块 - 基于 SimHash 识别多个订阅源转载的同一篇文章
+"""
+import re
+import hashlib
+import threading
+from typing import List, Dict, Optional
+import logging
+
+from database import Database
+
+logger = logging.getLogger(__name__)
+
+SIMHASH_BITS = 64
+# 64 位指纹切成 4 段，每段 16 位；汉明距离 <= 3 的两个指纹至少有一段完全相同
+SIMHASH_BANDS = 4
+BAND_BITS = SIMHASH_BITS // SIMHASH_BANDS
+
+
+def _normalize(text: str) -> str:
+    """转小写并去掉空白和标点，排版差异不影响指纹"""
+    return re.sub(r'[\W_]+', '', (text or '').lower())
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """计算文本的 64 位 SimHash（字符 n-gram 作为特征，中英文通用）"""
+    text = _normalize(text)
+    if len(text) < shingle_size:
+        return 0
+
+    hashes = {
+        format(int.from_bytes(
+            hashlib.blake2b(text[i:i + shingle_size].encode('utf-8'), digest_size=8).digest(), 'big'
+        ), '064b')
+        for i in range(len(text) - shingle_size + 1)
+    }
+    # 按位统计：某一位上为 1 的特征多于一半，则指纹该位为 1
+    half = len(hashes) / 2
+    bits = ''.join('1' if column.count('1') > half else '0' for column in zip(*hashes))
+    return int(bits, 2)
+
+
+def to_signed(fingerprint: int) -> int:
+    """SQLite INTEGER 为有符号 64 位，存储前转换"""
+    return fingerprint - (1 << SIMHASH_BITS) if fingerprint >= 1 << (SIMHASH_BITS - 1) else fingerprint
+
+
+def from_signed(value: int) -> int:
+    return value & ((1 << SIMHASH_BITS) - 1)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+def split_bands(fingerprint: int) -> List[int]:
+    """把指纹切成 SIMHASH_BANDS 段，用于数据库中的分段精确匹配"""
+    mask = (1 << BAND_BITS) - 1
+    return [fingerprint >> (i * BAND_BITS) & mask for i in range(SIMHASH_BANDS)]
+
+
+class NearDuplicateDetector:
+    """
+    入库时的近似重复检测
+    - 指纹持久化在 article_fingerprints 表，按 4 个分段建索引
+    - 先用分段精确匹配找候选，再计算汉明距离确认
+    - 重复文章通过 articles.duplicate_of 指向最早入库的原文
+    """
+
+    def __init__(self, db: Database, max_distance: int = 3,
+                 min_length: int = 200, window_days: int = 14):
+        self.db = db
+        self.max_distance = min(max_distance, SIMHASH_BANDS - 1)
+        self.min_length = min_length
+        self.window_days = window_days
+        # 多个订阅源并发入库时，串行化“查候选 + 写指纹”，避免同时入库的两份副本互相漏检
+        self._lock = threading.Lock()
+
+    def fingerprint(self, title: str, content: str) -> Optional[int]:
+        """正文过短时指纹不可靠，返回 None 不参与去重"""
+        if len(_normalize(content)) < self.min_length:
+            return None
+        return simhash(f"{title or ''} {content or ''}")
+
+    def process_new_articles(self, article_ids: List[int]) -> Dict[int, int]:
+        """
+        为新入库的文章计算指纹并标记重复
+        :return: {重复文章 id: 原文 id}
+        """
+        if not article_ids:
+            return {}
+
+        articles = self.db.get_articles_by_ids(article_ids, columns=['id', 'title', 'content'])
+        duplicates = {}
+        with self._lock:
+            for article in articles:
+                fp = self.fingerprint(article['title'], article['content'])
+                if fp is None:
+                    continue
+                canonical_id = self._find_canonical(fp, duplicates)
+                self.db.add_article_fingerprint(article['id'], to_signed(fp), split_bands(fp))
+                if canonical_id is not None:
+                    duplicates[article['id']] = canonical_id
+
+            if duplicates:
+                self.db.mark_duplicates(duplicates)
+                logger.info(f"检测到 {len(duplicates)} 篇近似重复文章")
+        return duplicates
+
+    def _find_canonical(self, fingerprint: int, pending: Dict[int, int]) -> Optional[int]:
+        """
+        在索引中查找最接近的原文，距离相同取最早入库的
+        :param pending: 本批次已判定但尚未写回数据库的重复关系
+        """
+        best = None
+        for candidate in self.db.find_fingerprint_candidates(split_bands(fingerprint), self.window_days):
+            distance = hamming_distance(fingerprint, from_signed(candidate['simhash']))
+            if distance > self.max_distance:
+                continue
+            article_id = candidate['article_id']
+            canonical_id = candidate['duplicate_of'] or pending.get(article_id, article_id)
+            key = (distance, canonical_id)
+            if best is None or key < best:
+                best = key
+        return best[1] if best else None
@@ -3,15 +3,25 @@ RSS获取和内容摘要生成模块
 """
 import feedparser
 import requests
-from bs4 import BeautifulSoup
 import logging
 import re
-from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Tuple, Callable
 import time
-from database import Database
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed, FIRST_COMPLETED
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from database import Database, SUMMARY_DONE, SUMMARY_SKIPPED, SUMMARY_FAILED
+from dedup import NearDuplicateDetector
+from html_cleaner import HtmlCleaner
+from main_content import MainContentExtractor
+from page_cache import PageCache
+from medium import get_browser_pool
 import json
 import os
+import hashlib
 from dateutil import parser
 
 # 配置日志
@@ -31,20 +41,97 @@ except Exception:
     logger = SimpleLogger()
 
 
+def read_limited(response: requests.Response, limit: int, url: str) -> bytes:
+    """分块读取 stream=True 的响应体，超过 limit 字节的部分丢弃（按解压后的大小计算）"""
+    declared = response.headers.get('Content-Length')
+    if limit and declared and declared.isdigit() and int(declared) > limit:
+        logger.warning(f"响应声明大小 {int(declared) // 1024}KB 超过上限，只读取前 {limit // 1024}KB：{url}")
+
+    buffer = bytearray()
+    for chunk in response.iter_content(chunk_size=64 * 1024):
+        buffer.extend(chunk)
+        if limit and len(buffer) >= limit:
+            logger.warning(f"响应超过 {limit // 1024}KB，已截断：{url}")
+            del buffer[limit:]
+            break
+    return bytes(buffer)
+
+
+class _FetchRound:
+    """
+    一轮并发抓取的写入闸门
+    截止时间到达后 abandon()：等正在进行的写入完成，之后被放弃的订阅源即使请求返回也不再写数据库
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._writers = 0
+        self.abandoned = False
+
+    def begin_write(self) -> bool:
+        """开始写入前调用，本轮已放弃时返回 False"""
+        with self._cond:
+            if self.abandoned:
+                return False
+            self._writers += 1
+            return True
+
+    def end_write(self):
+        with self._cond:
+            self._writers -= 1
+            self._cond.notify_all()
+
+    def abandon(self, timeout: float = None):
+        with self._cond:
+            self.abandoned = True
+            self._cond.wait_for(lambda: self._writers == 0, timeout)
+
+
 class RSSFetcher:
-    def __init__(self, db: Database, api_key: str = None, base_url: str = None, model_name: str = None):
+    def __init__(self, db: Database, api_key: str = None, base_url: str = None, model_name: str = None,
+                 max_workers: int = 8, per_host_limit: int = 2, fetch_deadline: float = 600,
+                 max_feed_bytes: int = 10 * 1024 * 1024, max_age_days: float = 3,
+                 stale_entry_limit: int = 5, html_cleaner_backend: str = 'auto'):
+        """
+        :param max_workers: 并发抓取的线程数，<= 1 时退化为逐个抓取
+        :param per_host_limit: 同一主机同时进行的请求数上限，避免把单个站点打挂
+        :param fetch_deadline: 一次 fetch_all_feeds 的全局截止时间（秒），超时未完成的订阅源本轮放弃
+        :param max_feed_bytes: 单个订阅源响应体的大小上限，超出部分不再下载
+        :param max_age_days: 发布超过这么多天的文章视为过期，不入库；<= 0 时不限制
+        :param stale_entry_limit: 连续遇到这么多篇过期文章后停止解析后续条目
+        :param html_cleaner_backend: HTML 转纯文本的解析后端，见 html_cleaner.BACKENDS
+        """
         self.db = db
+        self.max_workers = max(1, int(max_workers or 1))
+        self.per_host_limit = max(1, int(per_host_limit or 1))
+        self.fetch_deadline = fetch_deadline
+        self.max_feed_bytes = max_feed_bytes
+        self.max_age_days = max_age_days
+        self.stale_entry_limit = max(1, int(stale_entry_limit or 1))
+        self.html_cleaner = HtmlCleaner(html_cleaner_backend)
+
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
+        # 连接池大小与并发数保持一致，否则多线程下会频繁丢弃连接
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        # 入库后做近似重复检测，多源转载的同一篇文章只保留一份参与摘要和日报
+        self.dedup = NearDuplicateDetector(db)
 
         # 【新增】初始化 Summarizer，传入 db 和可能的配置
         # 如果不传参，Summarizer 内部会尝试读取环境变量或默认配置
         self.summarizer = Summarizer(db=db, api_key=api_key, base_url=base_url, model_name=model_name)
 
-    def fetch_feed(self, url: str) -> Optional[Dict]:
-        """解析RSS订阅源"""
+    def fetch_feed(self, url: str, etag: str = None, last_modified: str = None) -> Optional[Dict]:
+        """
+        解析RSS订阅源
+        传入上次保存的 etag / last_modified 时发送条件请求，
+        服务端返回 304 时不再解析，返回 {'not_modified': True, ...}
+        """
         try:
             logger.info(f"Fetching feed: {url}")
 
@@ -62,11 +149,31 @@ class RSSFetcher:
                 'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
                 'Connection': 'keep-alive'
             }
-            response = self.session.get(url, headers=headers, timeout=30)
-            # print("Response status code:", response.text)
-            response.raise_for_status()
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
+            # 流式下载，响应体超过 max_feed_bytes 时截断，避免异常订阅源占满内存
+            with self.session.get(url, headers=headers, timeout=30, stream=True) as response:
+                if response.status_code == 304:
+                    logger.info(f"Feed not modified: {url}")
+                    return {
+                        'title': None,
+                        'entries': [],
+                        'not_modified': True,
+                        'etag': etag,
+                        'last_modified': last_modified
+                    }
 
-            feed = feedparser.parse(response.content)
+                response.raise_for_status()
+                body = read_limited(response, self.max_feed_bytes, url)
+                new_etag = response.headers.get('ETag')
+                new_last_modified = response.headers.get('Last-Modified')
+
+            # feedparser 需要完整文档，这里解析的是已限制大小的缓冲区
+            feed = feedparser.parse(body)
+            del body
 
             if feed.bozo and not feed.entries:
                 logger.warning(f"Feed may be malformed: {url}")
@@ -74,132 +181,243 @@ class RSSFetcher:
 
             return {
                 'title': feed.feed.get('title', 'Unknown'),
-                'entries': [
-                    {
-                        'guid': entry.get('id') or entry.get('link') or entry.get('title'),
-                        'title': entry.get('title', 'No Title'),
-                        'link': entry.get('link'),
-                        'content': entry.get('content', [{}])[0].get('value')
-                                 or entry.get('summary', ''),
-                        'published': entry.get('published') or entry.get('updated')
-                                   or datetime.now().isoformat()
-                    }
-                    for entry in feed.entries[:50]  # 限制获取最近50条
-                ]
+                'not_modified': False,
+                'etag': new_etag,
+                'last_modified': new_last_modified,
+                'entries': self._fresh_entries(feed.entries[:50], url)  # 限制获取最近50条
             }
         except Exception as e:
             logger.error(f"Error fetching feed {url}: {e}")
             return None
 
-    def fetch_all_feeds(self) -> Dict:
-        """获取所有订阅源的文章"""
-        feeds = self.db.get_all_feeds()
+    @staticmethod
+    def _parse_published(raw_published_at: Optional[str]) -> str:
+        """发布时间统一为 '%Y-%m-%d %H:%M:%S'，缺失或无法解析时使用当前时间"""
+        if not raw_published_at:
+            return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            return parser.parse(raw_published_at).strftime("%Y-%m-%d %H:%M:%S")
+        except Exception as e:
+            logger.warning(f"Failed to parse published time: {raw_published_at}, error: {e}")
+            return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    def _fresh_entries(self, entries: List, url: str) -> List[Dict]:
+        """
+        只保留新鲜文章，正文保持原始 HTML（清洗留到确认需要入库时）
+        订阅源通常按时间倒序排列，连续 stale_entry_limit 篇过期后不再检查后面的条目
+        """
+        cutoff = None
+        if self.max_age_days and self.max_age_days > 0:
+            cutoff = (datetime.now() - timedelta(days=self.max_age_days)).strftime("%Y-%m-%d %H:%M:%S")
+
+        fresh = []
+        stale = stale_run = 0
+        for entry in entries:
+            published_at = self._parse_published(entry.get('published') or entry.get('updated'))
+            if cutoff and published_at <= cutoff:
+                stale += 1
+                stale_run += 1
+                if stale_run >= self.stale_entry_limit:
+                    break
+                continue
+            stale_run = 0
+
+            content = entry.get('content')
+            fresh.append({
+                'guid': entry.get('id') or entry.get('link') or entry.get('title'),
+                'title': entry.get('title', 'No Title'),
+                'link': entry.get('link'),
+                'content': (content[0].get('value') if content else None) or entry.get('summary', ''),
+                'published_at': published_at
+            })
+
+        if stale:
+            logger.info(f"跳过 {stale} 篇超过 {self.max_age_days} 天的文章：{url}")
+        return fresh
+
+    def fetch_all_feeds(self, feeds: List[Dict] = None) -> Dict:
+        """
+        获取订阅源的文章
+        :param feeds: 只抓取这些订阅源（由调度器筛出的到期订阅源），默认抓取全部
+        :return: failed_feed_ids 为请求或解析失败的订阅源
+        """
+        if feeds is None:
+            feeds = self.db.get_all_feeds()
         results = {
             'total_feeds': len(feeds),
             'new_articles': 0,
-            'feeds': []
+            'duplicate_articles': 0,
+            'feeds': [],
+            'failed_feed_ids': []
         }
 
-        for feed in feeds:
-            feed_result = self._fetch_single_feed(feed)
-            if feed_result:
-                results['feeds'].append(feed_result)
-                results['new_articles'] += feed_result['new_count']
+        if self.max_workers <= 1 or len(feeds) <= 1:
+            feed_results = []
+            for feed in feeds:
+                feed_result = self._fetch_single_feed(feed)
+                if feed_result:
+                    feed_results.append(feed_result)
+                else:
+                    results['failed_feed_ids'].append(feed['id'])
+        else:
+            feed_results, results['failed_feed_ids'] = self._fetch_feeds_concurrently(feeds)
+
+        for feed_result in feed_results:
+            results['feeds'].append(feed_result)
+            results['new_articles'] += feed_result['new_count']
+            results['duplicate_articles'] += feed_result.get('duplicate_count', 0)
 
         return results
 
-    def _fetch_single_feed(self, feed: Dict) -> Optional[Dict]:
-        """获取单个订阅源的文章并立即生成摘要"""
+    # 截止时间到达后，等待正在进行的数据库写入完成的最长时间（秒）
+    ABANDON_WRITE_WAIT = 30
+
+    def _fetch_feeds_concurrently(self, feeds: List[Dict]) -> Tuple[List[Dict], List[int]]:
+        """
+        并发抓取多个订阅源
+        - 线程池大小由 max_workers 控制
+        - 按主机排队：某主机正在进行的请求达到 per_host_limit 时，它的其余订阅源留在队列中，
+          线程让给其他主机，不会出现多个线程阻塞在同一主机上
+        - 超过 fetch_deadline 仍未完成的订阅源本轮放弃：未开始的直接取消，
+          已在运行的请求会在自身超时后结束，但不再写入数据库
+        :return: (成功的结果列表, 失败的订阅源 id 列表)；因截止时间放弃的订阅源两者都不包含
+        """
+        deadline = time.monotonic() + self.fetch_deadline if self.fetch_deadline else None
+        feed_results = []
+        failed_feed_ids = []
+
+        # 主机 -> 排队中的订阅源（按首次出现的顺序轮询各主机）
+        waiting: Dict[str, deque] = {}
+        for feed in feeds:
+            waiting.setdefault(urlparse(feed['url']).netloc.lower(), deque()).append(feed)
+        in_flight = defaultdict(int)
+        running = {}
+        fetch_round = _FetchRound()
+        workers = min(self.max_workers, len(feeds))
+
+        def submit_ready():
+            # 每轮给每个有空闲配额的主机提交一个订阅源，直到线程占满或没有可提交的
+            progressed = True
+            while progressed and len(running) < workers:
+                progressed = False
+                for host in list(waiting):
+                    if len(running) >= workers:
+                        break
+                    if in_flight[host] >= self.per_host_limit:
+                        continue
+                    feed = waiting[host].popleft()
+                    if not waiting[host]:
+                        del waiting[host]
+                    future = executor.submit(self._fetch_single_feed, feed, fetch_round)
+                    running[future] = (feed, host)
+                    in_flight[host] += 1
+                    progressed = True
+
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='feed-fetch')
+        try:
+            submit_ready()
+            while running:
+                timeout = None
+                if deadline is not None:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    feed, host = running.pop(future)
+                    in_flight[host] -= 1
+                    try:
+                        feed_result = future.result()
+                    except Exception as e:
+                        logger.error(f"Error fetching feed {feed['url']}: {e}")
+                        feed_result = None
+                    if feed_result:
+                        feed_results.append(feed_result)
+                    else:
+                        failed_feed_ids.append(feed['id'])
+                submit_ready()
+
+            abandoned = len(running) + sum(len(queue) for queue in waiting.values())
+            if abandoned:
+                logger.warning(f"抓取超过全局截止时间 {self.fetch_deadline}s，"
+                               f"放弃 {abandoned} 个未完成的订阅源")
+                # 返回前确保被放弃的订阅源不会在本轮结束后继续写数据库
+                fetch_round.abandon(self.ABANDON_WRITE_WAIT)
+        finally:
+            # 不等待仍在进行中的请求
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return feed_results, failed_feed_ids
+
+    def _fetch_single_feed(self, feed: Dict, fetch_round: _FetchRound = None) -> Optional[Dict]:
+        """
+        获取单个订阅源的文章并入库
+        :param fetch_round: 并发抓取时传入，本轮因截止时间放弃后不再写数据库
+        """
         url = feed['url']
         feed_id = feed['id']
 
-        parsed = self.fetch_feed(url)
+        parsed = self.fetch_feed(url, etag=feed.get('etag'), last_modified=feed.get('last_modified'))
         if not parsed:
             return None
 
-        new_count = 0
+        # 304：内容未变化，跳过解析和所有数据库写入
+        if parsed.get('not_modified'):
+            return {
+                'feed_id': feed_id,
+                'feed_name': feed['name'],
+                'new_count': 0,
+                'summarized_count': 0,
+                'total_count': 0,
+                'not_modified': True
+            }
+
         summarized_count = 0
+        articles_to_store = []
 
+        # 过期文章已在 fetch_feed 中丢弃；已入库的文章也不再清洗正文
+        existing_guids = self.db.get_existing_guids(
+            feed_id, [entry['guid'] for entry in parsed['entries'] if entry['guid']]
+        )
         for entry in parsed['entries']:
-            # 解析时间 (保持原有逻辑)
-            raw_published_at = entry.get('published') or entry.get('updated')
-            try:
-                parsed_time = parser.parse(raw_published_at)
-                formatted_published_at = parsed_time.strftime("%Y-%m-%d %H:%M:%S")
-            except Exception as e:
-                logger.warning(f"Failed to parse published time: {raw_published_at}, error: {e}")
-                formatted_published_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-            # 清理内容
-            clean_content = self._clean_html(entry['content'])
-
-            # 检查日期：如果文章发布日期早于当前时间 2 天以上，则跳过
-            try:
-                published_date = datetime.strptime(formatted_published_at, "%Y-%m-%d %H:%M:%S")
-                current_time = datetime.now()
-                days_diff = (current_time - published_date).days
-
-                if days_diff > 2:
-                    logger.info(f"跳过过期文章：{entry['title']}，发布日期：{formatted_published_at}，已过去{days_diff}天")
-                    continue
-            except Exception as e:
-                logger.warning(f"日期比较失败，使用默认逻辑：{e}")
-
-            # 存入数据库
-            article_id = self.db.add_article(
-                feed_id=feed_id,
-                guid=entry['guid'],
-                title=entry['title'],
-                url=entry['link'],
-                content=clean_content,
-                published_at=formatted_published_at
-            )
+            if not entry['guid'] or entry['guid'] in existing_guids:
+                continue
+            articles_to_store.append({
+                'guid': entry['guid'],
+                'title': entry['title'],
+                'url': entry['link'],
+                'content': self._clean_html(entry['content']),
+                'published_at': entry['published_at']
+            })
+
+        if fetch_round and not fetch_round.begin_write():
+            logger.info(f"本轮抓取已超过截止时间，结果不再入库：{url}")
+            return None
+        try:
+            # 整批存入数据库（单事务），只返回真正新增的文章
+            new_article_ids = self.db.add_articles_bulk(feed_id, articles_to_store)
+            new_count = len(new_article_ids)
+            duplicates = self.dedup.process_new_articles(new_article_ids)
 
-            if article_id:
-                new_count += 1
-
-                # # 【新增】如果文章成功插入，且内容足够，立即生成摘要
-                # if len(clean_content) > 50:
-                #     logger.info(f"正在生成摘要：{entry['title']}")
-                #     keywords, summary = self.summarizer.summarize(
-                #         content=clean_content,
-                #         title=entry['title']
-                #     )
-                #
-                #     # 只有当摘要生成成功（不包含错误标记）时才更新数据库
-                #     if '⚠️' not in summary:
-                #         self.db.update_article_summary(article_id, summary, keywords)
-                #         summarized_count += 1
-                #         logger.info(f"摘要生成成功：{entry['title']}")
-                #     else:
-                #         logger.warning(f"摘要生成失败：{entry['title']} - {summary}")
-                #
-                # # 避免触发 Ollama 或 API 限流，每次请求后暂停
-                # time.sleep(1)
-
-        self.db.update_feed_fetch_time(feed_id)
+            self.db.update_feed_fetch_time(feed_id, etag=parsed.get('etag'),
+                                           last_modified=parsed.get('last_modified'))
+        finally:
+            if fetch_round:
+                fetch_round.end_write()
 
         return {
             'feed_id': feed_id,
             'feed_name': feed['name'],
             'new_count': new_count,
             'summarized_count': summarized_count,  # 新增统计
+            'duplicate_count': len(duplicates),
             'total_count': len(parsed['entries'])
         }
 
     def _clean_html(self, html_content: str) -> str:
-        """清理HTML内容"""
-        if not html_content:
-            return ""
-
-        soup = BeautifulSoup(html_content, 'lxml')
-        text = soup.get_text(separator=' ', strip=True)
-
-        # 清理多余空白
-        text = re.sub(r'\s+', ' ', text)
-        text = text[:5000]  # 限制内容长度
-
-        return text
+        """清理HTML内容，合并空白并限制为 5000 字"""
+        return self.html_cleaner.clean(html_content)
 
 
 class BatchImporter:
@@ -286,44 +504,253 @@ class BatchImporter:
 
 
 class ContentExtractor:
-    """从URL提取正文内容"""
-
-    def __init__(self):
+    """
+    从URL提取正文内容（类 Readability 的正文块识别，去掉导航、页脚等噪声）
+    js_render_domains 中的站点在普通请求失败或正文过短时，改用共享的无头浏览器渲染（需安装 playwright）
+    """
+
+    # 网页响应体大小上限
+    MAX_PAGE_BYTES = 5 * 1024 * 1024
+    # 需要 JS 的站点，普通请求得到的正文短于这个长度时改用浏览器渲染
+    MIN_STATIC_TEXT_CHARS = 200
+
+    def __init__(self, html_cleaner_backend: str = 'auto', timeout: float = 60, pool_size: int = 10,
+                 js_render_domains: List[str] = None, browser_max_pages: int = 2,
+                 browser_page_timeout: float = 30):
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.timeout = timeout
+        self.main_content = MainContentExtractor(html_cleaner_backend=html_cleaner_backend)
+        self.js_render_domains = [d.lower().lstrip('.') for d in (js_render_domains or [])]
+        self.browser_max_pages = browser_max_pages
+        self.browser_page_timeout = browser_page_timeout
+
+    def needs_js(self, url: str) -> bool:
+        host = urlparse(url).netloc.lower().split(':')[0]
+        return any(host == d or host.endswith('.' + d) for d in self.js_render_domains)
+
+    def fetch(self, url: str, etag: str = None, last_modified: str = None) -> Dict:
+        """
+        下载网页并提取正文，传入校验信息时发送条件请求；网络错误直接抛出
+        :return: {'not_modified', 'text', 'etag', 'last_modified'}
+        """
+        if not self.needs_js(url):
+            return self._fetch_static(url, etag, last_modified)
 
-    def extract(self, url: str) -> str:
-        """提取网页正文"""
         try:
-            response = self.session.get(url, timeout=60)
+            result = self._fetch_static(url, etag, last_modified)
+            if result['not_modified'] or len(result['text']) >= self.MIN_STATIC_TEXT_CHARS:
+                return result
+        except Exception as e:
+            result = None
+            static_error = e
+        rendered = self._fetch_rendered(url)
+        if rendered:
+            return rendered
+        if result is None:
+            raise static_error
+        return result
+
+    def _fetch_rendered(self, url: str) -> Optional[Dict]:
+        """用浏览器池渲染网页，未安装 playwright 或渲染失败时返回 None"""
+        pool = get_browser_pool(self.browser_max_pages, self.browser_page_timeout)
+        # 浏览器启动失败后的冷却期内直接回退到普通请求的结果
+        if pool is None or not pool.available:
+            return None
+        try:
+            html = pool.fetch_html(url)
+        except Exception as e:
+            logger.warning(f"浏览器渲染失败 {url}: {e}")
+            return None
+        # 渲染结果没有可用的校验信息，过期后重新渲染
+        return {'not_modified': False, 'text': self.main_content.extract(html), 'etag': None, 'last_modified': None}
+
+    def _fetch_static(self, url: str, etag: str = None, last_modified: str = None) -> Dict:
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+            if response.status_code == 304:
+                return {'not_modified': True, 'text': None, 'etag': etag, 'last_modified': last_modified}
             response.raise_for_status()
+            body = read_limited(response, self.MAX_PAGE_BYTES, url)
+            # 响应头声明了编码时按声明解码，否则交给解析器根据 <meta> 判断
+            if 'charset' in response.headers.get('Content-Type', '').lower() and response.encoding:
+                body = body.decode(response.encoding, errors='replace')
+            return {
+                'not_modified': False,
+                'text': self.main_content.extract(body),
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+            }
 
-            soup = BeautifulSoup(response.content, 'lxml')
+    def extract(self, url: str) -> str:
+        """提取网页正文（限制为 5000 字），失败时返回空字符串"""
+        try:
+            return self.fetch(url)['text']
+        except Exception as e:
+            logger.error(f"Error extracting content from {url}: {e}")
+            return ""
 
-            # 尝试移除脚本和样式
-            for script in soup(["script", "style"]):
-                script.decompose()
 
-            # 获取正文
-            text = soup.get_text(separator=' ', strip=True)
+class ContentPrefetcher:
+    """
+    正文预取：为正文过短的文章下载原网页，提取正文写入页面缓存
+    - 独立线程池，与模型调用分开；摘要阶段只读缓存，不会等待网络
+    - 缓存新鲜时不访问网络，过期后用 ETag / Last-Modified 发条件请求
+    """
 
-            # 清理
-            text = re.sub(r'\s+', ' ', text)
-            text = text[:5000]
-            print(f'-----{text[:50]}')
+    # 正文短于这个长度的文章需要抓取原网页
+    MIN_CONTENT_CHARS = 1000
 
-            return text
-        except Exception as e:
-            logger.error(f"Error extracting content from {url}: {e}")
-            return ""
+    def __init__(self, cache: PageCache, max_workers: int = 4, per_host_limit: int = 2,
+                 timeout: float = 20, html_cleaner_backend: str = 'auto', **extractor_options):
+        """
+        :param extractor_options: 传给 ContentExtractor 的浏览器渲染选项（js_render_domains 等）
+        """
+        self.cache = cache
+        self.max_workers = max(1, int(max_workers or 1))
+        self.per_host_limit = max(1, int(per_host_limit or 1))
+        self.extractor = ContentExtractor(html_cleaner_backend, timeout=timeout, pool_size=self.max_workers,
+                                          **extractor_options)
+        self._host_semaphores = defaultdict(lambda: threading.Semaphore(self.per_host_limit))
+        self._host_lock = threading.Lock()
+
+    def needs_content(self, article: Dict) -> bool:
+        return bool(article.get('url')) and len(article.get('content') or '') < self.MIN_CONTENT_CHARS
+
+    def prefetch(self, articles: List[Dict],
+                 progress_callback: Callable[[int, int, str], None] = None) -> Dict:
+        """
+        预取一批文章的原网页正文
+        :param progress_callback: 每完成一个网页调用一次，参数为 (已完成数, 总数, 进度描述)
+        """
+        results = {'fetched': 0, 'not_modified': 0, 'failed': 0, 'cached': 0, 'total': 0}
+        urls = []
+        for article in articles:
+            if self.needs_content(article) and article['url'] not in urls:
+                urls.append(article['url'])
+
+        now = time.time()
+        stale = []
+        for url in urls:
+            if self.cache.is_fresh(self.cache.get(url), now):
+                results['cached'] += 1
+            else:
+                stale.append(url)
+        results['total'] = len(urls)
+        if not stale:
+            return results
+
+        logger.info(f"预取 {len(stale)} 个网页正文（{results['cached']} 个已缓存）")
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(stale)),
+                                thread_name_prefix='content-prefetch') as executor:
+            futures = [executor.submit(self._prefetch_one, url) for url in stale]
+            for done, future in enumerate(as_completed(futures), 1):
+                results[future.result()] += 1
+                if progress_callback:
+                    progress_callback(done, len(stale), f"正在预取正文 {done}/{len(stale)}")
+
+        # 按间隔清理过期条目，不在每批预取时遍历整个缓存目录
+        self.cache.prune()
+        return results
+
+    def _get_host_semaphore(self, url: str) -> threading.Semaphore:
+        host = urlparse(url).netloc.lower()
+        with self._host_lock:
+            return self._host_semaphores[host]
+
+    def _prefetch_one(self, url: str) -> str:
+        entry = self.cache.get(url)
+        # 上次失败但保留了正文的条目，校验信息仍然有效，可以继续发条件请求
+        validators = entry if entry and entry.get('text') else {}
+        with self._get_host_semaphore(url):
+            try:
+                result = self.extractor.fetch(url, etag=validators.get('etag'),
+                                              last_modified=validators.get('last_modified'))
+            except Exception as e:
+                logger.warning(f"预取正文失败 {url}: {e}")
+                # 临时故障不覆盖之前抓到的正文
+                self.cache.mark_failed(url, entry)
+                return 'failed'
+
+        if result['not_modified'] and validators:
+            self.cache.touch(entry)
+            return 'not_modified'
+        self.cache.put(url, result['text'] or '', result['etag'], result['last_modified'])
+        return 'fetched'
+
+
+class AdaptiveRateLimiter:
+    """
+    自适应令牌桶限流器
+    - 令牌按 rate（次/秒）匀速补充，桶容量为 burst
+    - 后端返回 429 时速率减半，并在 Retry-After 期间暂停发放令牌
+    - 连续成功后速率逐步回升，最高不超过初始速率
+    """
+
+    def __init__(self, rate: float, burst: int = 1, min_rate: float = 0.05,
+                 recover_after: int = 10):
+        self.max_rate = max(rate, min_rate)
+        self.rate = self.max_rate
+        self.min_rate = min_rate
+        self.burst = max(1, burst)
+        self.recover_after = recover_after
+
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._success_streak = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def acquire(self):
+        """阻塞直到拿到一个令牌"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_time = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            time.sleep(min(wait_time, 1.0))
+
+    def on_success(self):
+        with self._lock:
+            self._success_streak += 1
+            if self._success_streak >= self.recover_after and self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate * 1.25)
+                self._success_streak = 0
+
+    def on_rate_limited(self, retry_after: float = None):
+        with self._lock:
+            self._success_streak = 0
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = 0.0
+            pause = retry_after if retry_after else 1.0 / self.rate
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+            logger.warning(f"后端限流 (429)，速率降至 {self.rate * 60:.1f} 次/分钟，暂停 {pause:.1f} 秒")
 
 
 class Summarizer:
     # 【新增】在类级别定义 logger，确保即使模块级失效也能用
     _class_logger = logging.getLogger(__name__ + ".Summarizer")
 
+    # 失败重试的最长间隔
+    MAX_RETRY_DELAY_SECONDS = 24 * 3600
+
     def __init__(self, db: Database, api_key: str = None, base_url: str = None, model_name: str = None):
         self.db = db
         self.config = self._load_config()
@@ -335,6 +762,41 @@ class Summarizer:
         # 实例化时也绑定一下 logger
         self.logger = logging.getLogger(__name__)
 
+        # 并发摘要：线程数上限 + 按后端 429 自适应的请求速率
+        self.max_workers = max(1, int(self.config.get('summary_max_workers', 3)))
+        self.max_rate_limit_retries = 5
+        self.rate_limiter = AdaptiveRateLimiter(
+            rate=self.config.get('summary_requests_per_minute', 60) / 60.0,
+            burst=self.max_workers
+        )
+
+        # 摘要缓存：同一内容（多源转载、guid 变化）只调用一次模型
+        self.cache_prefix_chars = int(self.config.get('summary_cache_prefix_chars', 2000))
+        self.cache_max_entries = self.config.get('summary_cache_max_entries', 5000)
+        self.cache_ttl_days = self.config.get('summary_cache_ttl_days', 30)
+
+        # 失败重试：第 n 次失败后等待 base × 2^(n-1)，最长一天；达到次数上限后不再自动重试
+        self.max_attempts = max(1, int(self.config.get('summary_max_attempts', 5)))
+        self.retry_base_seconds = self.config.get('summary_retry_base_minutes', 10) * 60
+
+        # 正文预取：原网页正文由 prefetcher 写入磁盘缓存，生成摘要时只读缓存
+        self.page_cache = PageCache(self.config.get('page_cache_dir', 'page_cache'),
+                                    self.config.get('page_cache_ttl_days', 7))
+        self.prefetcher = ContentPrefetcher(
+            self.page_cache,
+            max_workers=self.config.get('prefetch_max_workers', 4),
+            timeout=self.config.get('prefetch_timeout_seconds', 20),
+            html_cleaner_backend=self.config.get('html_cleaner_backend', 'auto'),
+            js_render_domains=self.config.get('js_render_domains', ['medium.com']),
+            browser_max_pages=self.config.get('browser_max_pages', 2),
+            browser_page_timeout=self.config.get('browser_page_timeout_seconds', 30)
+        )
+
+        # 所有线程共用一个 OpenAI 客户端（内部的 HTTP 连接池是线程安全的）
+        self._client = None
+        self._client_key = None
+        self._client_lock = threading.Lock()
+
     def _load_config(self) -> Dict:
         """加载配置"""
         config_path = os.path.join(os.path.dirname(__file__), 'config.json')
@@ -346,6 +808,54 @@ class Summarizer:
             'summary_length': {'min': 100, 'max': 200}
         }
 
+    @staticmethod
+    def _normalize_for_hash(text: str) -> str:
+        """去掉 HTML 标签、空白和标点并转小写，使转载时的排版差异不影响哈希"""
+        text = re.sub(r'<[^>]+>', ' ', text or '')
+        return re.sub(r'[\W_]+', '', text.lower())
+
+    def content_hash(self, title: str, content: str) -> str:
+        """摘要缓存键：归一化标题 + 归一化正文前 N 个字符的 SHA-1"""
+        body = self._normalize_for_hash(content)[:self.cache_prefix_chars]
+        key = f"{self._normalize_for_hash(title)}\n{body}"
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def _get_client(self):
+        """获取共享的 OpenAI 客户端，api_key / base_url 被修改后自动重建"""
+        from openai import OpenAI
+
+        with self._client_lock:
+            key = (self.api_key, self.base_url)
+            if self._client is None or self._client_key != key:
+                # 关闭 SDK 内置重试，让 429 交给限流器处理
+                self._client = OpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=0)
+                self._client_key = key
+            return self._client
+
+    def _chat_completion(self, **kwargs):
+        """
+        经过限流器调用 chat.completions.create
+        遇到 429 时通知限流器降速并重试，不再使用固定休眠
+        """
+        from openai import RateLimitError
+
+        for attempt in range(self.max_rate_limit_retries + 1):
+            self.rate_limiter.acquire()
+            try:
+                response = self._get_client().chat.completions.create(**kwargs)
+            except RateLimitError as e:
+                if attempt >= self.max_rate_limit_retries:
+                    raise
+                retry_after = None
+                try:
+                    retry_after = float(e.response.headers.get('retry-after'))
+                except (AttributeError, TypeError, ValueError):
+                    pass
+                self.rate_limiter.on_rate_limited(retry_after)
+                continue
+            self.rate_limiter.on_success()
+            return response
+
 
     def _save_config(self):
         config_path = os.path.join(os.path.dirname(__file__), 'config.json')
@@ -356,6 +866,7 @@ class Summarizer:
         """
         解析 JSON 响应
         返回: (keywords_str, summary_text, quality_json_str, metadata_dict)
+        无法解析时抛出 ValueError
         """
         if not response:
             return "", "", "", {}
@@ -407,24 +918,24 @@ class Summarizer:
 
         except json.JSONDecodeError as e:
             logger.error(f"JSON 解析失败：{e}, 原始响应：{response[:200]}...")
-            # 降级处理：如果解析失败，返回原始文本作为摘要，标记错误
-            return "解析失败", f"⚠️ 格式错误无法解析 JSON: {response[:100]}", "", {}
+            raise ValueError(f"格式错误无法解析 JSON: {response[:100]}") from e
         except Exception as e:
             logger.error(f"解析过程出错：{e}")
-            return "错误", f"⚠️ 处理异常：{str(e)}", "", {}
+            raise ValueError(f"处理异常：{e}") from e
 
-    def summarize(self, content: str, title: str = "") -> Tuple[str, str]:
+    def summarize(self, content: str, title: str = "") -> Tuple[str, str, str]:
         """
         生成摘要、关键词及质量评分
         增加多重前置判断以减少大模型调用
+        返回: (状态, 关键词, 摘要内容)，状态为 SUMMARY_SKIPPED / SUMMARY_FAILED 时第三项是原因
         """
         # 1. 基础配置检查
         if not self.api_key and 'localhost' not in self.base_url:
-            return "", "⚠️ 未配置 API 密钥"
+            return SUMMARY_FAILED, "", "未配置 API 密钥"
 
         # 2. 内容空值检查
         if not content:
-            return "", "⚠️ 内容为空"
+            return SUMMARY_SKIPPED, "", "内容为空"
 
         # 3. 内容长度预处理
         clean_content = content.strip()
@@ -433,7 +944,7 @@ class Summarizer:
         # 【优化】过短内容直接跳过
         if content_len < 1000:
             logger.info(f"跳过过短文章 (长度:{content_len}): {title[:20]}...")
-            return "无", f"⚠️ 文章内容过短 ({content_len}字)，无需生成摘要。"
+            return SUMMARY_SKIPPED, "", f"文章内容过短 ({content_len}字)，无需生成摘要。"
 
         # 【优化】过长内容截断 (防止显存溢出，保留前 4000 字通常足够概括)
         max_content_len = 4000
@@ -445,20 +956,15 @@ class Summarizer:
         # 检查是否包含大量重复字符或典型广告词
         if clean_content.count("点击阅读全文") > 3 or clean_content.count("......") > 20:
              logger.info(f"疑似低质/广告文章，跳过：{title[:20]}...")
-             return "广告/低质", "⚠️ 检测到文章可能为低质内容或广告，已跳过生成。"
+             return SUMMARY_SKIPPED, "", "检测到文章可能为低质内容或广告，已跳过生成。"
 
         # 5. 简单的语言检测 (可选：如果只想要中文)
         # import re
         # if not re.search(r'[\u4e00-\u9fff]', clean_content):
-        #     return "非中文", "⚠️ 非中文内容，跳过生成。"
+        #     return SUMMARY_SKIPPED, "", "非中文内容，跳过生成。"
 
 
         try:
-            from openai import OpenAI
-
-            # model_name = 'deepseek-chat'  # 确保本地有此模型
-            client = OpenAI(api_key=self.api_key, base_url=self.base_url)
-
             language = self.config.get('summary_language', 'zh')
             min_len = self.config.get('summary_length', {}).get('min', 100)
             max_len = self.config.get('summary_length', {}).get('max', 200)
@@ -488,7 +994,7 @@ class Summarizer:
 文章内容： {content[:3000]}
 请直接输出 JSON 对象："""
 
-            response = client.chat.completions.create(
+            response = self._chat_completion(
                 model=self.model_name,
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=1000, # 增加 token 限制以容纳 JSON 结构
@@ -501,9 +1007,6 @@ class Summarizer:
             # 解析结果
             keywords, summary, quality_json, quality_info = self.parse_summary_response(full_response)
 
-            if '⚠️' in summary:
-                return keywords, summary
-
             # 构造最终存储内容：摘要 + 分隔符 + 质量信息 JSON
             # 这样可以在不修改数据库 schema 的情况下保留评分信息
             # 前端读取时可按 '\n---QUALITY---\n' 分割
@@ -511,7 +1014,7 @@ class Summarizer:
 
             print(f"{title} 审计完成 | 评分:{quality_info.get('score', 'N/A')} | 推荐:{quality_info.get('recommendation', 'N/A')}")
 
-            return keywords, final_summary_content
+            return SUMMARY_DONE, keywords, final_summary_content
 
         except Exception as e:
             # 防御性编程：防止 logger 未定义导致二次崩溃
@@ -520,56 +1023,102 @@ class Summarizer:
             except NameError:
                 # 如果 logger 真的未定义，使用 print 降级输出
                 print(f"[CRITICAL ERROR] Logger not defined. Original error: {e}")
-            return "", f"⚠️ 摘要生成失败：{str(e)}"
+            return SUMMARY_FAILED, "", f"摘要生成失败：{str(e)}"
 
-    # 在 fetcher.py 的 Summarizer 类中
-    def summarize_articles(self, articles: List[Dict]) -> Dict:
-        """批量生成摘要 - 增加动态延时和详细日志"""
+    def summarize_articles(self, articles: List[Dict],
+                           progress_callback: Callable[[int, int, str], None] = None,
+                           result_callback: Callable[[Dict, str], None] = None) -> Dict:
+        """
+        批量生成摘要 - 线程池并发处理，请求速率由限流器控制
+        :param progress_callback: 每完成一篇调用一次，参数为 (已完成数, 总数, 进度描述)
+        :param result_callback: 每完成一篇在调用线程中调用一次，参数为 (文章, 'success'/'cached'/'failed'/'skipped')
+        """
         results = {
             'success': 0,
             'failed': 0,
             'skipped': 0, # 新增跳过统计
+            'cached': 0,  # 命中摘要缓存的篇数（同时计入 success）
             'total': len(articles)
         }
-
-        for index, article in enumerate(articles):
-            # 双重检查：防止在长循环中状态变化
-            if article.get('summary'):
-                results['skipped'] += 1
-                continue
-
-            content = article.get('content', '')
-
-            # 如果没有内容但有链接，尝试提取 (保持原有逻辑)
-            if len(content)<1000 and article.get('url'):
-                # 注意：网络提取也耗时，可根据需要决定是否在这里做
-                extractor = ContentExtractor()
-                content = extractor.extract(article['url'])
-
-            # 调用带前置判断的 summarize
-            keywords, summary_content = self.summarize(content, article.get('title', ''))
-
-            # 只有当摘要不是“跳过”类的错误信息时才更新数据库？
-            # 这里策略：即使是“内容过短”也写入数据库，标记为已处理，避免下次重复尝试
-            self.db.update_article_summary(article['id'], summary_content, keywords)
-
-            if '⚠️' in summary_content:
-                # 区分是“跳过”还是“失败”
-                if "无需生成" in summary_content or "低质" in summary_content:
-                    results['skipped'] += 1
-                else:
-                    results['failed'] += 1
-            else:
-                results['success'] += 1
-
-            # 【优化】动态延时：根据文章长度调整休眠时间，给系统喘息机会
-            # 基础休眠 1 秒，每 1000 字增加 0.5 秒
-            sleep_time = 1.0 + (len(content) / 1000.0) * 0.5
-            time.sleep(sleep_time)
-
-            # 每处理 5 篇，打印一次进度，方便监控
-            if (index + 1) % 5 == 0:
-                logger.info(f"进度：{index + 1}/{len(articles)}")
-
+        if not articles:
+            return results
+
+        done = 0
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(articles)),
+                                thread_name_prefix='summarize') as executor:
+            futures = {executor.submit(self._summarize_one, article): article for article in articles}
+            for future in as_completed(futures):
+                article = futures[future]
+                try:
+                    status = future.result()
+                except Exception as e:
+                    logger.error(f"摘要任务异常：{article.get('title', '')[:20]} - {e}")
+                    status = 'failed'
+                if result_callback:
+                    result_callback(article, status)
+                if status == 'cached':
+                    results['cached'] += 1
+                    status = 'success'
+                results[status] += 1
+                done += 1
+
+                if progress_callback:
+                    progress_callback(done, len(articles),
+                                      f"正在生成摘要 {done}/{len(articles)}：{article.get('title', '')[:20]}")
+                # 每处理 5 篇，打印一次进度，方便监控
+                if done % 5 == 0:
+                    logger.info(f"进度：{done}/{len(articles)}")
+
+        if results['cached']:
+            logger.info(f"摘要缓存命中 {results['cached']} 篇")
+        self.db.prune_summary_cache(self.cache_max_entries, self.cache_ttl_days)
         return results
 
+    def _summarize_one(self, article: Dict) -> str:
+        """处理单篇文章，返回 'success' / 'cached' / 'failed' / 'skipped'"""
+        # 双重检查：防止在长循环中状态变化
+        if article.get('summary'):
+            return 'skipped'
+        # 近似重复的转载文章不再调用模型
+        if article.get('duplicate_of'):
+            return 'skipped'
+
+        content = article.get('content', '') or ''
+
+        # 正文过短时使用预取阶段缓存的原网页正文；这里只读缓存，不访问网络
+        if self.prefetcher.needs_content(article):
+            page_text = self.page_cache.get_text(article['url'])
+            if page_text and len(page_text) > len(content):
+                content = page_text
+
+        # 先查摘要缓存，命中则直接复用关键词、摘要和质量信息
+        content_hash = self.content_hash(article.get('title', ''), content)
+        cached = self.db.get_cached_summary(content_hash)
+        if cached:
+            self.db.update_article_summary(article['id'], cached['summary_content'], cached['keywords'])
+            return 'cached'
+
+        # 调用带前置判断的 summarize
+        status, keywords, summary_content = self.summarize(content, article.get('title', ''))
+
+        if status == SUMMARY_SKIPPED:
+            # 内容过短、广告等记为已跳过，不再重复尝试
+            self.db.record_summary_failure(article['id'], SUMMARY_SKIPPED, summary_content)
+            return 'skipped'
+        if status == SUMMARY_FAILED:
+            self.db.record_summary_failure(article['id'], SUMMARY_FAILED, summary_content,
+                                           self._next_retry_at(article.get('summary_attempts') or 0))
+            return 'failed'
+
+        self.db.update_article_summary(article['id'], summary_content, keywords)
+        # 只缓存成功的结果
+        self.db.put_cached_summary(content_hash, keywords, summary_content)
+        return 'success'
+
+    def _next_retry_at(self, previous_attempts: int) -> Optional[str]:
+        """本次失败后的重试时间（UTC，与 SQLite datetime('now') 格式一致），达到次数上限时返回 None"""
+        attempts = previous_attempts + 1
+        if attempts >= self.max_attempts:
+            return None
+        delay = min(self.retry_base_seconds * 2 ** (attempts - 1), self.MAX_RETRY_DELAY_SECONDS)
+        return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(time.time() + delay))
@@ -8,22 +8,30 @@ import sys
 import os
 import json
 import logging
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+import queue
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Optional, Tuple, Callable
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QSplitter, QListWidget, QListWidgetItem, QPushButton, QLineEdit,
+    QSplitter, QListWidget, QListWidgetItem, QListView, QPushButton, QLineEdit,
     QLabel, QTextEdit, QCheckBox, QGroupBox, QDialog, QDialogButtonBox,
     QMessageBox, QProgressBar, QToolBar, QStatusBar, QFrame,
     QScrollArea, QGridLayout, QFileDialog, QComboBox,
-    QButtonGroup, QRadioButton, QTextBrowser, QSizePolicy, QDateEdit, QSpinBox
+    QButtonGroup, QRadioButton, QTextBrowser, QSizePolicy, QDateEdit, QSpinBox,
+    QStyledItemDelegate, QStyle, QStyleOptionButton, QMenu
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer, QDate
-from PyQt6.QtGui import QAction, QFont, QPalette, QColor, QIntValidator, QIcon
+from PyQt6.QtCore import (
+    Qt, QThread, pyqtSignal, QTimer, QDate, QAbstractListModel, QModelIndex, QRect, QSize, QEvent
+)
+from PyQt6.QtGui import QAction, QFont, QFontMetrics, QPainter, QPalette, QColor, QIntValidator, QIcon
 
-from database import Database
+from database import Database, SUMMARY_SKIPPED, SUMMARY_FAILED, SUMMARY_JOB_PRIORITY_MANUAL
 from fetcher import RSSFetcher, Summarizer, BatchImporter
+from scheduler import FeedScheduler
+from summary_queue import SummaryJobRunner
 from obsidian_writer import ObsidianWriter
 
 # 配置日志
@@ -34,51 +42,93 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def describe_summary_status(article: Dict) -> Tuple[str, str]:
+    """没有摘要的文章显示的状态文字和颜色"""
+    if article.get('duplicate_of'):
+        # 近似重复文章不单独生成摘要，指向原文
+        return f"🔁 重复文章，原文 #{article['duplicate_of']}", "#6b7280"
+    status = article.get('summary_status')
+    error = article.get('summary_error') or ''
+    if status == SUMMARY_SKIPPED:
+        return f"⏭️ 已跳过：{error}", "#9ca3af"
+    if status == SUMMARY_FAILED:
+        attempts = article.get('summary_attempts') or 0
+        retry_at = article.get('summary_next_retry_at')
+        if retry_at:
+            # 数据库中是 UTC 时间，显示为本地时间
+            local = datetime.strptime(retry_at, '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc).astimezone()
+            return f"❌ 第{attempts}次生成失败，{local:%m-%d %H:%M} 自动重试：{error}", "#ef4444"
+        return f"❌ 已失败{attempts}次，不再自动重试：{error}", "#ef4444"
+    return "⏳ 等待生成摘要...", "#f59e0b"
+
+
 class FetchThread(QThread):
     """后台抓取线程"""
     progress = pyqtSignal(str)
     finished = pyqtSignal(dict)
     error = pyqtSignal(str)
-    articles_ready_for_summary = pyqtSignal(list)
-
-    def __init__(self, fetcher: RSSFetcher, db: Database):
+    summary_jobs_queued = pyqtSignal(int)
+
+    def __init__(self, fetcher: RSSFetcher, db: Database, scheduler: FeedScheduler = None,
+                 due_only: bool = False):
+        """
+        :param scheduler: 传入时由调度器抓取并记录各订阅源的调度状态
+        :param due_only: 只抓取调度器判定为到期的订阅源
+        """
         super().__init__()
         self.fetcher = fetcher
         self.db = db
+        self.scheduler = scheduler
+        self.due_only = due_only
 
     def run(self):
         try:
             self.progress.emit("正在获取订阅源...")
-            result = self.fetcher.fetch_all_feeds()
+            if self.scheduler:
+                result = self.scheduler.run(self.fetcher, due_only=self.due_only)
+            else:
+                result = self.fetcher.fetch_all_feeds()
             self.finished.emit(result)
 
             if result.get('new_articles', 0) > 0:
-                self.progress.emit("正在准备生成摘要...")
-                new_articles_needing_summary = self.db.get_articles_without_summary(limit=50,days_ago=1)
-                if new_articles_needing_summary:
-                    self.articles_ready_for_summary.emit(new_articles_needing_summary)
+                # 新文章写入摘要任务队列，由摘要线程领取处理
+                queued = self.db.enqueue_pending_summaries(days_ago=1)
+                if queued:
+                    self.summary_jobs_queued.emit(queued)
 
         except Exception as e:
             self.error.emit(str(e))
 
 
-# 在 gui.py 中找到 SummarizeThread 类
-
 class SummarizeThread(QThread):
-    """后台摘要生成线程"""
+    """后台摘要生成线程：从数据库任务队列领取任务，直到没有可执行的任务"""
     progress = pyqtSignal(str, int, int)
     finished = pyqtSignal(dict)
     error = pyqtSignal(str) # 保持信号不变，但我们可以发送更详细的信息
 
-    def __init__(self, summarizer: Summarizer, articles: List[Dict]):
+    def __init__(self, runner: SummaryJobRunner, article_ids: List[int] = None, enqueue_recent: bool = False):
+        """
+        :param article_ids: 用户手动要求生成摘要的文章，以高优先级入队
+        :param enqueue_recent: 先把最近一天的待摘要文章入队（启动时补上未入队的文章）
+        """
         super().__init__()
-        self.summarizer = summarizer
-        self.articles = articles
+        self.runner = runner
+        self.article_ids = article_ids or []
+        self.enqueue_recent = enqueue_recent
+        # 本线程处理过的文章，完成后刷新列表中对应的行
+        self.processed_ids: List[int] = []
 
     def run(self):
         try:
-            logger.info(f"开始为 {len(self.articles)} 篇文章生成摘要...")
-            result = self.summarizer.summarize_articles(self.articles)
+            if self.enqueue_recent:
+                self.runner.db.enqueue_pending_summaries(days_ago=1)
+            if self.article_ids:
+                self.runner.db.enqueue_summary_jobs(self.article_ids, SUMMARY_JOB_PRIORITY_MANUAL)
+            logger.info("开始处理摘要任务队列...")
+            result = self.runner.drain(
+                progress_callback=lambda done, total, msg: self.progress.emit(msg, done, total),
+                article_callback=lambda article, status: self.processed_ids.append(article['id'])
+            )
             logger.info(f"摘要生成完成：{result}")
             self.finished.emit(result)
         except Exception as e:
@@ -108,6 +158,307 @@ class BatchImportThread(QThread):
             self.error.emit(str(e))
 
 
+class QueryThread(QThread):
+    """
+    数据库只读查询线程：界面上的读操作都排队到这里执行，主线程不再等待 SQLite
+    - 每个请求属于一个 channel，同一 channel 只有最新的请求有效
+    - 排队中的旧请求直接丢弃，正在执行的旧请求通过 sqlite3 interrupt 中断
+    - 结果经 result_ready 回到主线程后再调用回调，过期结果不会回调
+    """
+    result_ready = pyqtSignal(str, int, object)
+    query_failed = pyqtSignal(str, str)
+
+    def __init__(self, db: Database, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._latest: Dict[str, int] = {}
+        self._running: Optional[Tuple[str, int]] = None
+        self._worker_ident = None
+        # channel -> (seq, callback)，只在主线程访问
+        self._callbacks: Dict[str, Tuple[int, Callable]] = {}
+        self.result_ready.connect(self._dispatch)
+
+    def submit(self, channel: Optional[str], fn: Callable, *args, callback: Callable = None, **kwargs) -> int:
+        """
+        提交查询，fn(*args, **kwargs) 在查询线程执行，结果传给 callback（主线程）
+        :param channel: 为 None 时请求互不取代（例如刷新不同的行）
+        """
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            channel = channel or f"#{seq}"
+            self._latest[channel] = seq
+            # 同一 channel 的旧查询仍在执行：直接中断，不再等它跑完
+            if self._running and self._running[0] == channel and self._worker_ident:
+                self.db.interrupt(self._worker_ident)
+        self._callbacks[channel] = (seq, callback)
+        self._queue.put((channel, seq, fn, args, kwargs))
+        return seq
+
+    def _is_current(self, channel: str, seq: int) -> bool:
+        with self._lock:
+            return self._latest.get(channel) == seq
+
+    def stop(self):
+        self._queue.put(None)
+        self.wait()
+
+    def run(self):
+        self._worker_ident = threading.get_ident()
+        while True:
+            request = self._queue.get()
+            if request is None:
+                break
+            channel, seq, fn, args, kwargs = request
+            with self._lock:
+                if self._latest.get(channel) != seq:
+                    continue
+                self._running = (channel, seq)
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if self._is_current(channel, seq):
+                    logger.exception(f"后台查询失败：{channel}")
+                    self.query_failed.emit(channel, f"{type(e).__name__}: {e}")
+                continue
+            finally:
+                with self._lock:
+                    self._running = None
+            if self._is_current(channel, seq):
+                self.result_ready.emit(channel, seq, result)
+
+    def _dispatch(self, channel: str, seq: int, result):
+        entry = self._callbacks.get(channel)
+        if not entry or entry[0] != seq:
+            return
+        del self._callbacks[channel]
+        with self._lock:
+            self._latest.pop(channel, None)
+        if entry[1]:
+            entry[1](result)
+
+
+class ArticleListModel(QAbstractListModel):
+    """
+    文章列表模型：每行对应一篇文章的 dict（UserRole 返回整个 dict）
+    标星、选中、摘要变化时只刷新对应行，不再整页重建
+    """
+    check_toggled = pyqtSignal(int, bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._articles: List[Dict] = []
+        self._rows: Dict[int, int] = {}
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._articles)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        article = self._articles[index.row()]
+        if role == Qt.ItemDataRole.UserRole:
+            return article
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return article.get('title', '无标题')
+        if role == Qt.ItemDataRole.CheckStateRole:
+            return Qt.CheckState.Checked if article.get('is_selected', 0) == 1 else Qt.CheckState.Unchecked
+        return None
+
+    def setData(self, index: QModelIndex, value, role: int = Qt.ItemDataRole.EditRole) -> bool:
+        if not index.isValid() or role != Qt.ItemDataRole.CheckStateRole:
+            return False
+        checked = value in (Qt.CheckState.Checked, Qt.CheckState.Checked.value)
+        article = self._articles[index.row()]
+        article['is_selected'] = 1 if checked else 0
+        self.dataChanged.emit(index, index, [role])
+        self.check_toggled.emit(article['id'], checked)
+        return True
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlag:
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsUserCheckable
+
+    def set_articles(self, articles: List[Dict]):
+        self.beginResetModel()
+        self._articles = articles
+        self._rows = {article['id']: row for row, article in enumerate(articles)}
+        self.endResetModel()
+
+    def article_at(self, row: int) -> Dict:
+        """直接返回行对应的 dict（经 data(UserRole) 取出的是转换后的副本）"""
+        return self._articles[row]
+
+    def article_by_id(self, article_id: int) -> Optional[Dict]:
+        row = self._rows.get(article_id)
+        return self._articles[row] if row is not None else None
+
+    def update_articles(self, changes: Dict[int, Dict]):
+        """按文章 id 合并字段，只对受影响的行发出 dataChanged"""
+        rows = []
+        for article_id, fields in changes.items():
+            row = self._rows.get(article_id)
+            if row is not None:
+                self._articles[row].update(fields)
+                rows.append(row)
+        if rows:
+            self.dataChanged.emit(self.index(min(rows)), self.index(max(rows)))
+
+
+class ArticleItemDelegate(QStyledItemDelegate):
+    """按需绘制文章行：只有可见行才会被绘制，不再为每篇文章创建控件"""
+    # 点击复选框以外的区域（Qt6 的 QListView.clicked 在点击复选框时也会触发，不能直接用）
+    row_clicked = pyqtSignal(QModelIndex)
+    PADDING = 8
+    SPACING = 4
+    CHECKBOX_SIZE = 16
+    TITLE_LINES = 2
+    SUMMARY_LINES = 2
+    SUMMARY_PREVIEW_CHARS = 100
+
+    def _fonts(self, option) -> Tuple[QFont, QFont]:
+        title_font = QFont(option.font)
+        title_font.setPixelSize(13)
+        title_font.setWeight(QFont.Weight.DemiBold)
+        small_font = QFont(option.font)
+        small_font.setPixelSize(11)
+        return title_font, small_font
+
+    def _checkbox_rect(self, rect: QRect) -> QRect:
+        return QRect(rect.left() + self.PADDING, rect.top() + self.PADDING + 1,
+                     self.CHECKBOX_SIZE, self.CHECKBOX_SIZE)
+
+    def sizeHint(self, option, index) -> QSize:
+        title_font, small_font = self._fonts(option)
+        title_h = QFontMetrics(title_font).lineSpacing()
+        small_h = QFontMetrics(small_font).lineSpacing()
+        height = (self.PADDING * 2 + title_h * self.TITLE_LINES
+                  + self.SPACING * 2 + small_h * (1 + self.SUMMARY_LINES))
+        return QSize(option.rect.width(), height)
+
+    def paint(self, painter: QPainter, option, index):
+        if not index.isValid():
+            return
+        article = index.model().article_at(index.row())
+        painter.save()
+        rect = option.rect
+        title_font, small_font = self._fonts(option)
+        title_fm, small_fm = QFontMetrics(title_font), QFontMetrics(small_font)
+
+        # 背景与分隔线
+        selected = bool(option.state & QStyle.StateFlag.State_Selected)
+        painter.fillRect(rect, QColor("#eff6ff") if selected else QColor("white"))
+        painter.setPen(QColor("#f3f4f6"))
+        painter.drawLine(rect.bottomLeft(), rect.bottomRight())
+
+        # 复选框 + 星标
+        checkbox_opt = QStyleOptionButton()
+        checkbox_opt.rect = self._checkbox_rect(rect)
+        checkbox_opt.state = QStyle.StateFlag.State_Enabled | (
+            QStyle.StateFlag.State_On if article.get('is_selected', 0) == 1 else QStyle.StateFlag.State_Off
+        )
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawPrimitive(QStyle.PrimitiveElement.PE_IndicatorCheckBox, checkbox_opt, painter, option.widget)
+
+        star_left = checkbox_opt.rect.right() + 8
+        painter.setFont(title_font)
+        painter.setPen(QColor("#1f2937"))
+        star_icon = "⭐" if article.get('is_starred', 0) == 1 else "☆"
+        painter.drawText(QRect(star_left, rect.top() + self.PADDING, 20, title_fm.lineSpacing()),
+                         Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop, star_icon)
+
+        # 标题：最多两行
+        left = star_left + 24
+        width = max(10, rect.right() - self.PADDING - left)
+        top = rect.top() + self.PADDING
+        title_h = title_fm.lineSpacing() * self.TITLE_LINES
+        title = title_fm.elidedText(article.get('title') or '无标题', Qt.TextElideMode.ElideRight,
+                                    width * self.TITLE_LINES - title_fm.averageCharWidth() * 4)
+        painter.drawText(QRect(left, top, width, title_h),
+                         Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop | Qt.TextFlag.TextWordWrap, title)
+        top += title_h + self.SPACING
+
+        # 来源 | 日期 | 质量评分徽章 | 关键词
+        painter.setFont(small_font)
+        line_h = small_fm.lineSpacing()
+        x = left
+        prefix = f"📰 {article.get('feed_name', '未知')} | {(article.get('published_at') or '')[:10]} "
+        painter.setPen(QColor("#6b7280"))
+        painter.drawText(QRect(x, top, width, line_h), Qt.AlignmentFlag.AlignLeft, prefix)
+        x += small_fm.horizontalAdvance(prefix)
+
+        score = article.get('quality_score', 0) or 0
+        rec = article.get('quality_recommendation', '') or ''
+        if score > 0:
+            badge = f"[{score}分]" + (f" ({rec})" if rec else "")
+            badge_font = QFont(small_font)
+            badge_font.setBold(True)
+            painter.setFont(badge_font)
+            painter.setPen(QColor("#10b981" if score >= 75 else ("#f59e0b" if score >= 60 else "#ef4444")))
+            painter.drawText(QRect(x, top, max(0, left + width - x), line_h), Qt.AlignmentFlag.AlignLeft, badge)
+            x += QFontMetrics(badge_font).horizontalAdvance(badge)
+            painter.setFont(small_font)
+            painter.setPen(QColor("#6b7280"))
+            painter.drawText(QRect(x, top, max(0, left + width - x), line_h), Qt.AlignmentFlag.AlignLeft, " | ")
+            x += small_fm.horizontalAdvance(" | ")
+
+        keywords = article.get('keywords', '') or ''
+        if keywords and x < left + width:
+            text = small_fm.elidedText(f"🔑 {keywords}", Qt.TextElideMode.ElideRight, left + width - x)
+            painter.drawText(QRect(x, top, left + width - x, line_h), Qt.AlignmentFlag.AlignLeft, text)
+        top += line_h + self.SPACING
+
+        # 摘要预览
+        summary = article.get('summary', '')
+        summary_rect = QRect(left, top, width, line_h * self.SUMMARY_LINES)
+        if summary:
+            # 如果包含质量分隔符，只取前半部分作为预览
+            preview = summary.split('---QUALITY---')[0].strip()
+            if len(preview) > self.SUMMARY_PREVIEW_CHARS:
+                preview = preview[:self.SUMMARY_PREVIEW_CHARS] + "..."
+            preview = small_fm.elidedText(f"📝 {preview}", Qt.TextElideMode.ElideRight,
+                                          width * self.SUMMARY_LINES - small_fm.averageCharWidth() * 4)
+            painter.setPen(QColor("#4b5563"))
+            painter.drawText(summary_rect,
+                             Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop | Qt.TextFlag.TextWordWrap, preview)
+        else:
+            status_text, status_color = describe_summary_status(article)
+            status_text = small_fm.elidedText(status_text, Qt.TextElideMode.ElideRight, width)
+            painter.setPen(QColor(status_color))
+            painter.drawText(summary_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop, status_text)
+
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index) -> bool:
+        """点击复选框区域或按空格键时切换选中状态"""
+        toggle = False
+        if event.type() in (QEvent.Type.MouseButtonPress, QEvent.Type.MouseButtonRelease,
+                            QEvent.Type.MouseButtonDblClick):
+            if event.button() != Qt.MouseButton.LeftButton:
+                return False
+            hit = self._checkbox_rect(option.rect).adjusted(-4, -4, 4, 4).contains(event.position().toPoint())
+            if not hit:
+                if event.type() == QEvent.Type.MouseButtonRelease:
+                    self.row_clicked.emit(index)
+                return False
+            # 吞掉复选框上的按下/双击事件，避免触发行点击（打开详情）
+            if event.type() != QEvent.Type.MouseButtonRelease:
+                return True
+            toggle = True
+        elif event.type() == QEvent.Type.KeyPress and event.key() == Qt.Key.Key_Space:
+            toggle = True
+
+        if not toggle:
+            return False
+        checked = index.data(Qt.ItemDataRole.CheckStateRole) == Qt.CheckState.Checked
+        new_state = Qt.CheckState.Unchecked if checked else Qt.CheckState.Checked
+        return model.setData(index, new_state, Qt.ItemDataRole.CheckStateRole)
+
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -122,8 +473,19 @@ class MainWindow(QMainWindow):
         base_url = self.config.get('openai_base_url', 'http://localhost:11434/v1')
         model_name = self.config.get('openai_model_name', 'qwen3:8b')
 
-        self.fetcher = RSSFetcher(self.db, api_key=api_key, base_url=base_url)
+        self.fetcher = RSSFetcher(
+            self.db, api_key=api_key, base_url=base_url,
+            max_workers=self.config.get('fetch_max_workers', 8),
+            per_host_limit=self.config.get('fetch_per_host_limit', 2),
+            fetch_deadline=self.config.get('fetch_deadline_seconds', 600),
+            max_feed_bytes=self.config.get('fetch_max_feed_mb', 10) * 1024 * 1024,
+            max_age_days=self.config.get('fetch_max_age_days', 3),
+            html_cleaner_backend=self.config.get('html_cleaner_backend', 'auto')
+        )
         self.summarizer = Summarizer(self.db, api_key=api_key, base_url=base_url, model_name=model_name)
+        # 摘要任务存放在数据库队列中，重启后继续处理；可与后台服务同时消费
+        self.summary_runner = SummaryJobRunner(self.db, self.summarizer,
+                                               lease_seconds=self.config.get('summary_job_lease_seconds', 600))
         self.batch_importer = BatchImporter(self.db, self.fetcher)
         self.obsidian_writer = ObsidianWriter()
 
@@ -133,16 +495,34 @@ class MainWindow(QMainWindow):
         # self.auto_refresh_timer.start(30000 * 2)  # 30000 毫秒 = 30 秒
         # ----------------------------------
 
+        # 按订阅源更新频率调度：定时器只负责定期检查，真正抓取的只有到期的订阅源
+        self.scheduler = FeedScheduler(
+            self.db,
+            min_interval=self.config.get('fetch_min_interval_minutes', 15) * 60,
+            max_interval=self.config.get('fetch_max_interval_hours', 24) * 3600,
+            default_interval=self.config.get('fetch_interval_hours', 24) * 3600
+        )
         self.auto_fetch_timer = QTimer()
-        self.auto_fetch_timer.timeout.connect(self.fetch_all_feeds)
+        self.auto_fetch_timer.timeout.connect(self.fetch_due_feeds)
 
         self.current_feed_id = None
         self.current_view = "all"
 
+        # 所有读查询都在这个线程中执行
+        self.query_thread = QueryThread(self.db, self)
+        self.query_thread.query_failed.connect(
+            lambda channel, error: self.statusBar().showMessage(f"查询失败：{error}")
+        )
+        self.query_thread.start()
+
         self.current_page = 1
         self.page_size = 50
         self.total_pages = 1
         self.current_articles = []
+        # 键集分页游标：_page_cursors[i] 为第 i+1 页的起始游标（第一页为 None）
+        # 筛选条件变化时整体失效
+        self._page_cursors = [None]
+        self._page_cursor_filters = None
 
         if self.config.get('obsidian_vault_path'):
             self.obsidian_writer.set_vault_path(self.config['obsidian_vault_path'])
@@ -156,7 +536,10 @@ class MainWindow(QMainWindow):
         self._start_auto_fetch_scheduler()
 
         if self.config.get('auto_fetch_on_startup', True):
-            QTimer.singleShot(500, self.fetch_all_feeds)
+            # 调度状态保存在数据库中，启动时只补抓已到期的订阅源
+            QTimer.singleShot(500, self.fetch_due_feeds)
+        # 继续处理上次退出时队列中未完成的摘要任务
+        QTimer.singleShot(1000, lambda: self.auto_summarize_new_articles(enqueue_recent=True))
 
     def trigger_auto_refresh(self):
         # 检查是否已有抓取任务在运行
@@ -176,12 +559,38 @@ class MainWindow(QMainWindow):
         self.fetch_all_feeds()
 
 
+    # 关闭窗口时等待后台线程结束的最长时间（毫秒）
+    SHUTDOWN_WAIT_MS = 5000
+
     # 【新增】窗口关闭时清理定时器
     def closeEvent(self, event):
         # if hasattr(self, 'auto_refresh_timer'):
         #     self.auto_refresh_timer.stop()
         if hasattr(self, 'auto_fetch_timer'):
             self.auto_fetch_timer.stop()
+        self.query_thread.stop()
+        if self._summarizing():
+            # 当前这批完成后不再领取新任务
+            self.summary_runner.stop()
+
+        # 先等后台线程结束，再关闭连接池，避免关闭仍在使用中的连接
+        deadline = time.monotonic() + self.SHUTDOWN_WAIT_MS / 1000
+        still_running = []
+        for name in ('_fetch_worker', '_summarize_worker', '_import_worker'):
+            worker = getattr(self, name, None)
+            if worker is None or not worker.isRunning():
+                continue
+            remaining_ms = max(0, int((deadline - time.monotonic()) * 1000))
+            if not worker.wait(remaining_ms):
+                still_running.append(name)
+
+        # 未完成的摘要任务释放租约，让下次启动或后台服务立即接手
+        self.summary_runner.release()
+        if still_running:
+            # 仍在运行的线程继续使用自己的连接，连接随进程退出关闭
+            logger.warning(f"后台线程未在 {self.SHUTDOWN_WAIT_MS / 1000:g} 秒内结束：{', '.join(still_running)}")
+        else:
+            self.db.close()
         event.accept()
 
     def _load_config(self) -> Dict:
@@ -196,16 +605,20 @@ class MainWindow(QMainWindow):
         with open(config_path, 'w', encoding='utf-8') as f:
             json.dump(self.config, f, ensure_ascii=False, indent=4)
 
+    # 检查到期订阅源的周期（毫秒）
+    SCHEDULER_TICK_MS = 60 * 1000
+
     def _start_auto_fetch_scheduler(self):
         self.auto_fetch_timer.stop()
         interval_hours = self.config.get('fetch_interval_hours', 24)
         if interval_hours <= 0:
             logger.info("自动抓取已禁用 (interval <= 0)")
             return
-        interval_ms = int(interval_hours * 60 * 60 * 1000)
-        self.auto_fetch_timer.start(interval_ms)
-        logger.info(f"自动抓取已启动，间隔：{interval_hours} 小时")
-        self.statusBar().showMessage(f"自动抓取已启用：每 {interval_hours} 小时一次")
+        self.scheduler.default_interval = min(max(interval_hours * 3600, self.scheduler.min_interval),
+                                              self.scheduler.max_interval)
+        self.auto_fetch_timer.start(self.SCHEDULER_TICK_MS)
+        logger.info(f"自动抓取已启动，默认间隔：{interval_hours} 小时，按各订阅源更新频率自适应调整")
+        self.statusBar().showMessage("自动抓取已启用：按各订阅源的更新频率调度")
 
     def apply_styles(self):
         self.setStyleSheet("""
@@ -231,6 +644,7 @@ class MainWindow(QMainWindow):
             QListWidget { border: none; background-color: white; border-radius: 8px; }
             QListWidget::item { padding: 8px; border-bottom: 1px solid #f3f4f6; }
             QListWidget::item:selected { background-color: #eff6ff; }
+            QListView { border: none; background-color: white; border-radius: 8px; }
             QScrollArea { border: none; }
             QLabel { color: #374151; }
             QTextEdit, QTextBrowser {
@@ -424,8 +838,14 @@ class MainWindow(QMainWindow):
 
         # 搜索输入框
         self.search_keyword_input = QLineEdit()
-        self.search_keyword_input.setPlaceholderText("标题/摘要/关键字")
+        self.search_keyword_input.setPlaceholderText("标题/摘要/关键字/正文，空格分隔多个词")
         self.search_keyword_input.returnPressed.connect(self.apply_filters)
+        # 输入停顿后自动搜索；查询在后台线程执行，连续输入时旧查询会被取消
+        self.search_debounce_timer = QTimer(self)
+        self.search_debounce_timer.setSingleShot(True)
+        self.search_debounce_timer.setInterval(300)
+        self.search_debounce_timer.timeout.connect(self.apply_filters)
+        self.search_keyword_input.textChanged.connect(self.search_debounce_timer.start)
         filter_layout.addWidget(self.search_keyword_input, row, 5, 1, 2) # 横跨 2 列
 
         # 搜索按钮
@@ -446,6 +866,7 @@ class MainWindow(QMainWindow):
         self.sort_combo.addItem("🕒 时间倒序", "time")
         self.sort_combo.addItem("⭐ 分数优先", "time_score")
         self.sort_combo.addItem("🔥 仅按评分", "score")
+        self.sort_combo.addItem("🎯 搜索相关度", "relevance")
         self.sort_combo.setCurrentIndex(0)
         self.sort_combo.currentIndexChanged.connect(self.apply_filters)
         filter_layout.addWidget(self.sort_combo, row, 1, 1, 3)
@@ -472,8 +893,20 @@ class MainWindow(QMainWindow):
         layout.addWidget(filter_group)
 
         # --- 文章列表 ---
-        self.article_list = QListWidget()
-        self.article_list.itemClicked.connect(self.on_article_clicked)
+        # 模型 + 委托绘制：只绘制可见行，行高固定，翻页和局部刷新都不再重建控件
+        self.article_model = ArticleListModel(self)
+        self.article_model.check_toggled.connect(self.on_article_toggled)
+        self.article_list = QListView()
+        self.article_list.setModel(self.article_model)
+        self.article_delegate = ArticleItemDelegate(self.article_list)
+        self.article_delegate.row_clicked.connect(self.on_article_clicked)
+        self.article_list.setItemDelegate(self.article_delegate)
+        self.article_list.setUniformItemSizes(True)
+        self.article_list.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        # Ctrl/Shift 多选后右键批量标星、选中
+        self.article_list.setSelectionMode(QListView.SelectionMode.ExtendedSelection)
+        self.article_list.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.article_list.customContextMenuRequested.connect(self.show_article_context_menu)
         layout.addWidget(self.article_list)
 
         # --- 分页控制 ---
@@ -510,6 +943,11 @@ class MainWindow(QMainWindow):
         self.deselect_all_btn.clicked.connect(self.clear_selections)
         bottom.addWidget(self.deselect_all_btn)
 
+        self.select_filtered_btn = QPushButton("☑ 全选筛选结果")
+        self.select_filtered_btn.setStyleSheet("background-color: #0ea5e9; color: white; font-weight: bold;")
+        self.select_filtered_btn.clicked.connect(self.select_all_filtered_articles)
+        bottom.addWidget(self.select_filtered_btn)
+
         self.generate_report_btn = QPushButton("📊 生成报告")
         self.generate_report_btn.setStyleSheet("background-color: #7c3aed; color: white; font-weight: bold;")
         self.generate_report_btn.clicked.connect(self.generate_report)
@@ -632,8 +1070,10 @@ class MainWindow(QMainWindow):
         self.load_articles()
 
     def load_feeds(self):
+        self.query_thread.submit('feeds', self.db.get_all_feeds, callback=self._on_feeds_loaded)
+
+    def _on_feeds_loaded(self, feeds: List[Dict]):
         self.feed_list.clear()
-        feeds = self.db.get_all_feeds()
         for feed in feeds:
             item = QListWidgetItem(f"📰 {feed['name']}")
             item.setData(Qt.ItemDataRole.UserRole, feed)
@@ -641,9 +1081,8 @@ class MainWindow(QMainWindow):
             self.feed_list.addItem(item)
         self.statusBar().showMessage(f"已加载 {len(feeds)} 个订阅源")
 
-    def load_articles(self):
-        self.article_list.clear()
-
+    def _current_filters(self) -> Dict:
+        """收集当前界面上的筛选条件"""
         # 日期筛选
         has_date_filter = self.enable_date_filter.isChecked()
         start_date = self.start_date_input.date().toString("yyyy-MM-dd") if has_date_filter else None
@@ -661,66 +1100,89 @@ class MainWindow(QMainWindow):
         if not quality_recommendation:
             quality_recommendation = None
 
-        # 排序方式
+        return {
+            'feed_id': self.current_feed_id,
+            'selected_only': self.current_view == "selected",
+            'starred_only': self.current_view == "starred",
+            'start_date': start_date,
+            'end_date': end_date,
+            'has_summary': has_summary,
+            'search_keyword': self.search_keyword_input.text().strip(),
+            'quality_recommendation': quality_recommendation,
+        }
+
+    def load_articles(self):
+        filters = self._current_filters()
         sort_by = self.sort_combo.currentData()
 
-        # 搜索关键词
-        search_keyword = self.search_keyword_input.text().strip()
-
-        # 视图状态
-        selected_only = (self.current_view == "selected")
-        starred_only = (self.current_view == "starred")
-
-        # 获取总数 (传递新参数)
-        total_count = self.db.get_articles_count(
-            feed_id=self.current_feed_id,
-            selected_only=selected_only,
-            starred_only=starred_only,
-            start_date=start_date,
-            end_date=end_date,
-            has_summary=has_summary,
-            search_keyword=search_keyword,
-            quality_recommendation=quality_recommendation  # 【新增】
+        # 筛选条件、排序或每页数量变化后，之前记录的分页游标全部失效
+        cursor_filters = (tuple(sorted(filters.items())), sort_by, self.page_size)
+        if cursor_filters != self._page_cursor_filters:
+            self._page_cursor_filters = cursor_filters
+            self._page_cursors = [None]
+
+        # 有游标时使用键集分页，相关度排序或缺少游标时退回 OFFSET 分页
+        page_index = self.current_page - 1
+        cursor = None
+        use_keyset = sort_by in Database.KEYSET_SORT_KEYS and page_index < len(self._page_cursors)
+        if use_keyset:
+            cursor = self._page_cursors[page_index]
+
+        self.query_thread.submit(
+            'articles', self._query_article_page, filters, sort_by,
+            self.current_page, self.page_size, use_keyset, cursor,
+            callback=lambda result: self._on_articles_loaded(result, filters, sort_by)
         )
 
-        self.total_pages = max(1, (total_count + self.page_size - 1) // self.page_size)
-        if self.current_page > self.total_pages:
-            self.current_page = self.total_pages
-
-        # 获取文章列表 (传递新参数)
-        articles = self.db.get_articles_paginated(
-            feed_id=self.current_feed_id,
-            selected_only=selected_only,
-            starred_only=starred_only,
-            start_date=start_date,
-            end_date=end_date,
-            has_summary=has_summary,
-            search_keyword=search_keyword,
-            page=self.current_page,
-            page_size=self.page_size,
-            sort_by=sort_by,
-            quality_recommendation=quality_recommendation  # 【新增】
-        )
+    def _query_article_page(self, filters: Dict, sort_by: str, page: int, page_size: int,
+                            use_keyset: bool, cursor: Optional[Tuple]) -> Dict:
+        """在查询线程中执行：统计总数并读取一页文章（不访问任何界面控件）"""
+        # 获取总数：数据库无写入时复用缓存结果，翻页不再重复计数
+        total_count = self.db.get_articles_count_cached(**filters)
+        total_pages = max(1, (total_count + page_size - 1) // page_size)
+        if page > total_pages:
+            # 数据变少导致页码越界时，游标不再对应该页
+            page, use_keyset = total_pages, False
+
+        if use_keyset:
+            articles = self.db.get_articles_keyset(cursor=cursor, page_size=page_size, sort_by=sort_by, **filters)
+        else:
+            articles = self.db.get_articles_paginated(page=page, page_size=page_size, sort_by=sort_by, **filters)
+        return {
+            'total_count': total_count,
+            'total_pages': total_pages,
+            'page': page,
+            'used_keyset': use_keyset,
+            'articles': articles,
+        }
+
+    def _on_articles_loaded(self, result: Dict, filters: Dict, sort_by: str):
+        articles = result['articles']
+        total_count = result['total_count']
+        self.total_pages = result['total_pages']
+        self.current_page = result['page']
+
+        page_index = self.current_page - 1
+        if result['used_keyset'] and articles:
+            del self._page_cursors[page_index + 1:]
+            self._page_cursors.append(Database.keyset_cursor(articles[-1], sort_by))
 
         self.current_articles = articles
         self.update_pagination_info(total_count)
-
-        for article in articles:
-            self._add_article_item(article)
+        self.article_model.set_articles(articles)
 
         # 更新状态栏提示
         filter_info = []
-        if quality_recommendation:
-            filter_info.append(f"推荐:{quality_recommendation}")
-        if search_keyword:
-            filter_info.append(f"搜索:{search_keyword}")
+        if filters['quality_recommendation']:
+            filter_info.append(f"推荐:{filters['quality_recommendation']}")
+        if filters['search_keyword']:
+            filter_info.append(f"搜索:{filters['search_keyword']}")
 
         status_msg = f"已加载 {len(articles)} / {total_count} 篇"
         if filter_info:
             status_msg += f" ({', '.join(filter_info)})"
         self.statusBar().showMessage(status_msg)
 
-
     def update_pagination_info(self, total_count: int):
         self.page_info_label.setText(f"第 {self.current_page} / {self.total_pages} 页")
         self.total_count_label.setText(f"总计：{total_count} 条")
@@ -742,90 +1204,17 @@ class MainWindow(QMainWindow):
         self.current_page = 1
         self.load_articles()
 
-    def _add_article_item(self, article: Dict):
-        item_widget = QWidget()
-        # 【优化 1】设置大小策略，允许垂直扩展，强制水平受限
-        item_widget.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Preferred)
-
-        layout = QVBoxLayout(item_widget)
-        layout.setContentsMargins(8, 8, 8, 8)
-        layout.setSpacing(5)
-
-        title_layout = QHBoxLayout()
-        title_layout.setSpacing(8) # 增加内部间距
-
-        is_starred = article.get('is_starred', 0) == 1 # 修复逻辑判断
-        star_icon = "⭐" if is_starred else "☆"
-
-        checkbox = QCheckBox()
-        checkbox.setChecked(article.get('is_selected', 0) == 1)
-        checkbox.stateChanged.connect(lambda state, aid=article['id']: self.on_article_toggled(aid, state))
-        # 防止 checkbox 挤压空间
-        checkbox.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
-        title_layout.addWidget(checkbox)
-
-        star_label = QLabel(star_icon)
-        star_label.setStyleSheet("font-size: 14px;")
-        star_label.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
-        title_layout.addWidget(star_label)
-
-        title = QLabel(article.get('title', '无标题'))
-        # 【优化 2】核心修复：强制换行和字数限制
-        title.setStyleSheet("font-weight: 600; color: #1f2937; font-size: 13px;")
-        title.setWordWrap(True)          # 开启自动换行
-        title.setMinimumWidth(100)       # 设置最小宽度，防止被压缩成一条线
-        title.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Preferred) # 允许水平扩展
-        title_layout.addWidget(title)
-
-        # 将标题设为拉伸因子，让它占据剩余空间
-        title_layout.setStretchFactor(title, 1)
-
-        layout.addLayout(title_layout)
-
-        # 【新增】解析并显示质量评分徽章
-        score = article.get('quality_score', 0) or 0
-        rec = article.get('quality_recommendation', '') or ''
-        score_badge = ""
-        if score > 0:
-            color = "#10b981" if score >= 75 else ("#f59e0b" if score >= 60 else "#ef4444")
-            badge_text = f"[{score}分]"
-            if rec:
-                badge_text += f" ({rec})"
-            score_badge = f" <span style='color:{color}; font-weight:bold; font-size:10px;'>{badge_text}</span> | "
-
-        keywords = article.get('keywords', '') or ''
-        info_text = f"📰 {article.get('feed_name', '未知')} | {article.get('published_at', '')[:10]} {score_badge}"
-        if keywords:
-            info_text += f"🔑 {keywords}"
-
-        info = QLabel(info_text)
-        info.setStyleSheet("color: #6b7280; font-size: 11px;")
-        info.setWordWrap(True) # 信息栏也允许换行
-        layout.addWidget(info)
-
-        summary = article.get('summary', '')
-        if summary:
-            # 如果包含质量分隔符，只取前半部分作为预览
-            preview_text = summary.split('---QUALITY---')[0].strip() if '---QUALITY---' in summary else summary
-            # 稍微增加预览长度，因为现在空间更充裕了
-            summary_preview = preview_text[:100] + "..." if len(preview_text) > 100 else preview_text
-            summary_label = QLabel(f"📝 {summary_preview}")
-            summary_label.setStyleSheet("color: #4b5563; font-size: 11px; line-height: 1.4;")
-            summary_label.setWordWrap(True)
-            layout.addWidget(summary_label)
-        else:
-            summary_label = QLabel("⏳ 等待生成摘要...")
-            summary_label.setStyleSheet("color: #f59e0b; font-size: 11px;")
-            layout.addWidget(summary_label)
+    def _refresh_article_rows(self, article_ids: List[int], then: Callable = None):
+        """从数据库重新读取指定文章，只刷新列表中对应的行；then 在刷新完成后调用"""
+        if not article_ids:
+            return
 
-        item = QListWidgetItem()
-        # 【优化 3】关键：根据内容计算正确的高度提示
-        # 先让 layout 计算所需大小，然后设置为 item 的 size hint
-        item.setSizeHint(item_widget.sizeHint())
-        item.setData(Qt.ItemDataRole.UserRole, article)
+        def on_loaded(rows: List[Dict]):
+            self.article_model.update_articles({row['id']: row for row in rows})
+            if then:
+                then(rows)
 
-        self.article_list.addItem(item)
-        self.article_list.setItemWidget(item, item_widget)
+        self.query_thread.submit(None, self.db.get_articles_by_ids, list(article_ids), callback=on_loaded)
 
     def on_feed_clicked(self, item):
         feed = item.data(Qt.ItemDataRole.UserRole)
@@ -838,15 +1227,17 @@ class MainWindow(QMainWindow):
             self.nav_selected_btn.setStyleSheet("text-align: left;")
             self.load_articles()
 
-    def on_article_clicked(self, item):
-        article = item.data(Qt.ItemDataRole.UserRole)
-        if article:
-            self.show_article_detail(article)
+    def on_article_clicked(self, index: QModelIndex):
+        if index.isValid():
+            # 详情与列表共用同一个 dict，行刷新后详情随之更新
+            self.show_article_detail(self.article_model.article_at(index.row()))
 
-    def on_article_toggled(self, article_id: int, state):
-        is_checked = (state == Qt.CheckState.Checked.value)
+    def on_article_toggled(self, article_id: int, is_checked: bool):
         self.db.select_article(article_id, is_checked)
         self.update_selected_count()
+        if getattr(self, 'current_article', None) and self.current_article['id'] == article_id:
+            self.current_article['is_selected'] = 1 if is_checked else 0
+            self.show_article_detail(self.current_article)
 
     def show_article_detail(self, article: Dict):
         self.current_article = article
@@ -884,7 +1275,12 @@ class MainWindow(QMainWindow):
             except Exception as e:
                 logger.error(f"解析质量 JSON 失败：{e}")
 
-        self.detail_summary.setText(f"📝 {summary_text}")
+        if summary_text:
+            self.detail_summary.setText(f"📝 {summary_text}")
+        else:
+            self.detail_summary.setText(describe_summary_status(article)[0])
+            if article.get('duplicate_of'):
+                self._show_duplicate_source(article)
 
         # === 渲染质量审计面板 ===
         if quality_info:
@@ -942,27 +1338,51 @@ class MainWindow(QMainWindow):
     def toggle_article_star(self):
         if hasattr(self, 'current_article') and self.current_article:
             self.db.toggle_article_star(self.current_article['id'])
-            self.load_articles()
             self._refresh_current_article_detail()
 
     def toggle_current_article_selection(self):
         if hasattr(self, 'current_article') and self.current_article:
             self.db.toggle_article_selection(self.current_article['id'])
-            self.load_articles()
             self.update_selected_count()
             self._refresh_current_article_detail()
 
     def _refresh_current_article_detail(self):
-        article = self.db.get_articles(feed_id=self.current_article['feed_id'])
-        for a in article:
-            if a['id'] == self.current_article['id']:
-                self.current_article = a
-                break
-        self.show_article_detail(self.current_article)
+        article_id = self.current_article['id']
+
+        def on_refreshed(rows: List[Dict]):
+            # 列表中有该文章时详情与列表共用同一个 dict；不在当前页时合并读取结果
+            article = self.article_model.article_by_id(article_id)
+            if article is None:
+                article = self.current_article
+                if rows:
+                    article.update(rows[0])
+            if getattr(self, 'current_article', None) and self.current_article['id'] == article_id:
+                self.current_article = article
+                self.show_article_detail(article)
+
+        self._refresh_article_rows([article_id], then=on_refreshed)
+
+    def _show_duplicate_source(self, article: Dict):
+        """详情中补充显示重复文章原文的标题和摘要"""
+        def on_loaded(rows: List[Dict]):
+            # 加载期间切换了文章则不再更新
+            if not rows or self.current_article is not article:
+                return
+            source = rows[0]
+            summary = (source.get('summary') or '').split('---QUALITY---', 1)[0].strip()
+            text = f"{describe_summary_status(article)[0]}：{source.get('title') or '无标题'}"
+            if summary:
+                text += f"\n📝 {summary}"
+            self.detail_summary.setText(text)
+
+        self.query_thread.submit('duplicate_source', self.db.get_articles_by_ids, [article['duplicate_of']],
+                                 ['id', 'title', 'summary'], callback=on_loaded)
 
     def update_selected_count(self):
-        selected = self.db.get_selected_articles()
-        self.selected_count_label.setText(f"已选择：{len(selected)}")
+        self.query_thread.submit(
+            'selected_count', self.db.get_selected_count,
+            callback=lambda count: self.selected_count_label.setText(f"已选择：{count}")
+        )
 
     def add_feed(self):
         url = self.url_input.text().strip()
@@ -1031,47 +1451,86 @@ class MainWindow(QMainWindow):
         QMessageBox.warning(self, "错误", f"批量导入失败：{error}")
 
     def fetch_all_feeds(self):
+        """手动刷新：抓取全部订阅源"""
+        self._start_fetch(due_only=False)
+
+    def fetch_due_feeds(self):
+        """定时检查：有到期的订阅源时才启动抓取线程"""
+        if hasattr(self, '_fetch_worker') and self._fetch_worker.isRunning():
+            return
+
+        def on_checked(due_feeds: List[Dict]):
+            if due_feeds and not (hasattr(self, '_fetch_worker') and self._fetch_worker.isRunning()):
+                self._start_fetch(due_only=True)
+
+        self.query_thread.submit('due_feeds', self.scheduler.due_feeds, callback=on_checked)
+
+    def _start_fetch(self, due_only: bool):
         logger.debug("触发自动/手动抓取任务")
         self.refresh_btn.setEnabled(False)
         self.refresh_btn.setText("抓取中...")
 
         # 【修复】使用更具体的变量名 _fetch_worker
-        self._fetch_worker = FetchThread(self.fetcher, self.db)
+        self._fetch_worker = FetchThread(self.fetcher, self.db, scheduler=self.scheduler, due_only=due_only)
         self._fetch_worker.progress.connect(self.statusBar().showMessage)
         self._fetch_worker.finished.connect(self.on_fetch_finished)
         self._fetch_worker.error.connect(self.on_fetch_error)
-        self._fetch_worker.articles_ready_for_summary.connect(self.auto_summarize_new_articles)
+        self._fetch_worker.summary_jobs_queued.connect(lambda queued: self.auto_summarize_new_articles())
         self._fetch_worker.start()
 
 
-    def auto_summarize_new_articles(self, articles: List[Dict]):
-        if not self.summarizer.api_key and 'localhost' not in getattr(self.summarizer, 'base_url', ''):
-            logger.info("未配置 API Key，跳过自动摘要生成")
-            return
-        logger.info(f"检测到 {len(articles)} 篇新文章，开始自动生成摘要...")
-        self.statusBar().showMessage(f"正在为新文章生成摘要 ({len(articles)}篇)...")
+    def _summarizing(self) -> bool:
+        return hasattr(self, '_summarize_worker') and self._summarize_worker.isRunning()
 
+    def _start_summarize_worker(self, on_finished: Callable, article_ids: List[int] = None,
+                                enqueue_recent: bool = False):
         # 【修复】使用更具体的变量名 _summarize_worker
-        self._summarize_worker = SummarizeThread(self.summarizer, articles)
+        self._summarize_worker = SummarizeThread(self.summary_runner, article_ids, enqueue_recent)
         self._summarize_worker.progress.connect(lambda msg, c, t: self.statusBar().showMessage(msg))
-        self._summarize_worker.finished.connect(self.on_auto_summarize_finished)
+        self._summarize_worker.finished.connect(on_finished)
         self._summarize_worker.error.connect(self.on_summarize_error)
         self._summarize_worker.start()
 
+    def auto_summarize_new_articles(self, enqueue_recent: bool = False):
+        """启动摘要线程处理任务队列；已在运行时新任务会被它继续领取"""
+        if not self.summarizer.api_key and 'localhost' not in getattr(self.summarizer, 'base_url', ''):
+            logger.info("未配置 API Key，跳过自动摘要生成")
+            return
+        if self._summarizing():
+            return
+        logger.info("开始自动处理摘要任务队列...")
+        self._start_summarize_worker(self.on_auto_summarize_finished, enqueue_recent=enqueue_recent)
+
+    def _resume_summary_queue(self):
+        """线程退出前后新加入的任务可能没被领取，队列中还有可执行任务时再启动一次"""
+        def on_stats(stats: Dict):
+            if stats['ready']:
+                self.auto_summarize_new_articles()
+
+        self.query_thread.submit('summary_queue', self.db.get_summary_queue_stats, callback=on_stats)
 
     def on_auto_summarize_finished(self, result: Dict):
         success = result.get('success', 0)
         total = result.get('total', 0)
-        logger.info(f"自动摘要完成：成功{success}/{total}")
-        self.statusBar().showMessage(f"自动摘要完成：{success}篇成功")
-        self.load_articles()
+        self._refresh_article_rows(self._summarize_worker.processed_ids)
+        if total:
+            logger.info(f"自动摘要完成：成功{success}/{total}")
+            self.statusBar().showMessage(f"自动摘要完成：{success}篇成功")
+        self._resume_summary_queue()
 
     def on_fetch_finished(self, result: Dict):
         self.refresh_btn.setEnabled(True)
         self.refresh_btn.setText("🔄 刷新")
+        if result.get('total_feeds', 0) == 0:
+            # 定时检查时没有到期的订阅源
+            self.statusBar().clearMessage()
+            return
         self.load_articles()
         total = result.get('new_articles', 0)
         msg = f"抓取完成，新增 {total} 篇文章"
+        duplicates = result.get('duplicate_articles', 0)
+        if duplicates:
+            msg += f"（其中 {duplicates} 篇为转载重复）"
         self.statusBar().showMessage(msg)
         logger.info(msg)
 
@@ -1103,17 +1562,17 @@ class MainWindow(QMainWindow):
         except Exception:
             ui_count = 0
 
-        # 获取选中的文章
-        all_selected_articles = self.db.get_selected_articles()
+        # 获取选中的文章：在查询线程中读取，读取完成后继续
+        self.query_thread.submit(
+            'summary_candidates', self.db.get_selected_articles,
+            callback=lambda articles: self._start_summaries(articles, ui_count, is_local_mode)
+        )
 
+    def _start_summaries(self, all_selected_articles: List[Dict], ui_count: int, is_local_mode: bool):
         # 数据同步检查
         if len(all_selected_articles) == 0 and ui_count > 0:
-            import time
-            time.sleep(0.1)
-            all_selected_articles = self.db.get_selected_articles()
-            if len(all_selected_articles) == 0:
-                QMessageBox.warning(self, "数据同步异常", "界面显示已选择但系统无法获取数据。")
-                return
+            QMessageBox.warning(self, "数据同步异常", "界面显示已选择但系统无法获取数据。")
+            return
 
         # 过滤掉已经有摘要的文章
         articles_to_process = []
@@ -1159,21 +1618,26 @@ class MainWindow(QMainWindow):
             if config_key:
                 self.summarizer.api_key = config_key
 
-        # 启动线程
-        # 【修复】使用 _summarize_worker
-        self._summarize_worker = SummarizeThread(self.summarizer, articles_to_process)
-        self._summarize_worker.progress.connect(self.statusBar().showMessage)
-        self._summarize_worker.finished.connect(self.on_summarize_finished)
-        self._summarize_worker.error.connect(self.on_summarize_error)
-        self._summarize_worker.start()
+        article_ids = [a['id'] for a in articles_to_process]
+        if self._summarizing():
+            # 正在处理队列时只需提升这些文章的优先级，运行中的线程会优先领取
+            self.db.enqueue_summary_jobs(article_ids, SUMMARY_JOB_PRIORITY_MANUAL)
+            self.summarize_btn.setEnabled(True)
+            self.summarize_btn.setText("🤖 生成摘要")
+            self.statusBar().showMessage(f"已将 {len(article_ids)} 篇文章加入摘要队列，优先处理")
+            return
+
+        # 启动线程：文章以高优先级入队，线程处理完整个队列后结束
+        self._start_summarize_worker(self.on_summarize_finished, article_ids=article_ids)
 
     def on_summarize_finished(self, result: Dict):
         self.summarize_btn.setEnabled(True)
         self.summarize_btn.setText("🤖 生成摘要")
         success = result.get('success', 0)
         failed = result.get('failed', 0)
-        self.load_articles()
+        self._refresh_article_rows(self._summarize_worker.processed_ids)
         QMessageBox.information(self, "完成", f"摘要生成完成\n成功：{success}\n失败：{failed}")
+        self._resume_summary_queue()
 
     def on_summarize_error(self, error: str):
         # 【关键修改】再次记录错误到日志，确保即使线程内漏掉也能捕获
@@ -1193,19 +1657,66 @@ class MainWindow(QMainWindow):
         QMessageBox.warning(self, "错误", detailed_msg)
 
 
+    def _set_articles_flag(self, article_ids: List[int], field: str, value: bool):
+        """批量设置选中/标星（一个事务），只刷新列表中对应的行"""
+        if not article_ids:
+            return
+        if field == 'is_selected':
+            self.db.select_articles(article_ids, value)
+        else:
+            self.db.star_articles(article_ids, value)
+        self.article_model.update_articles({aid: {field: 1 if value else 0} for aid in article_ids})
+        if getattr(self, 'current_article', None) and self.current_article['id'] in article_ids:
+            self.current_article[field] = 1 if value else 0
+            self.show_article_detail(self.current_article)
+        if field == 'is_selected':
+            self.update_selected_count()
+
     def select_all_articles(self):
-        for article in self.current_articles:
-            self.db.select_article(article['id'], True)
-        self.load_articles()
-        self.update_selected_count()
+        self._set_articles_flag([a['id'] for a in self.current_articles], 'is_selected', True)
 
     def clear_selections(self):
-        for article in self.current_articles:
-            self.db.deselect_article(article['id'])
-        self.load_articles()
-        self.update_selected_count()
+        self._set_articles_flag([a['id'] for a in self.current_articles], 'is_selected', False)
+
+    def select_all_filtered_articles(self):
+        """选中当前筛选条件下的全部文章（不限于当前页）"""
+        filters = self._current_filters()
+        reply = QMessageBox.question(
+            self, "确认", f"将选中当前筛选结果中的全部文章（{self.total_count_label.text()}）",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+
+        def on_done(count: int):
+            self.article_model.update_articles({a['id']: {'is_selected': 1} for a in self.current_articles})
+            self.update_selected_count()
+            self.statusBar().showMessage(f"已选中 {count} 篇文章")
+
+        # 匹配结果可能很多，整条 UPDATE 放到查询线程执行
+        self.query_thread.submit(None, self.db.select_articles_by_filter, True, callback=on_done, **filters)
+
+    def show_article_context_menu(self, pos):
+        """右键菜单：对列表中选中的多行批量标星/选中"""
+        rows = sorted({index.row() for index in self.article_list.selectionModel().selectedIndexes()})
+        if not rows:
+            index = self.article_list.indexAt(pos)
+            if not index.isValid():
+                return
+            rows = [index.row()]
+        article_ids = [self.article_model.article_at(row)['id'] for row in rows]
+
+        menu = QMenu(self)
+        menu.addAction(f"⭐ 标星 ({len(article_ids)})",
+                       lambda: self._set_articles_flag(article_ids, 'is_starred', True))
+        menu.addAction("☆ 取消标星", lambda: self._set_articles_flag(article_ids, 'is_starred', False))
+        menu.addSeparator()
+        menu.addAction("☑ 选中", lambda: self._set_articles_flag(article_ids, 'is_selected', True))
+        menu.addAction("☐ 取消选中", lambda: self._set_articles_flag(article_ids, 'is_selected', False))
+        menu.exec(self.article_list.viewport().mapToGlobal(pos))
 
     def apply_filters(self):
+        self.search_debounce_timer.stop()
         self.current_page = 1
         self.load_articles()
 
@@ -1221,6 +1732,7 @@ class MainWindow(QMainWindow):
         self.recommend_filter_combo.setCurrentIndex(0)
 
         self.search_keyword_input.clear()
+        self.search_debounce_timer.stop()
         self.current_page = 1
         self.load_articles()
 
@@ -1232,7 +1744,10 @@ class MainWindow(QMainWindow):
             if reply == QMessageBox.StandardButton.Yes:
                 self.show_settings()
                 return
-        selected = self.db.get_selected_articles()
+        self.query_thread.submit('report_articles', self.db.get_selected_articles,
+                                 callback=self._show_report_preview)
+
+    def _show_report_preview(self, selected: List[Dict]):
         if not selected:
             QMessageBox.warning(self, "提示", "请先选择要包含在报告中的文章")
             return
@@ -1336,7 +1851,7 @@ class SettingsDialog(QDialog):
         layout.addLayout(vault_layout)
 
         interval_layout = QHBoxLayout()
-        interval_layout.addWidget(QLabel("自动抓取间隔 (小时):"))
+        interval_layout.addWidget(QLabel("默认抓取间隔 (小时，0 为关闭):"))
         self.interval_input = QLineEdit()
         self.interval_input.setText(str(self.config.get('fetch_interval_hours', 24)))
         self.interval_input.setValidator(QIntValidator(0, 1000, self))
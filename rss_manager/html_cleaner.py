@@ -0,0 +1,207 @@
+"""
+HTML 转纯文本模块 - 抓取入库和正文提取共用，可选择不同的解析后端
+- bs4: 原实现，构建完整的 BeautifulSoup 树，最慢，作为对照
+- lxml: 基于 lxml 的事件遍历，达到字数上限后停止遍历
+- stdlib: 标准库 HTMLParser 分块喂入，达到字数上限后停止解析，无第三方依赖
+- selectolax: 可选依赖，安装后 auto 模式优先使用
+"""
+import re
+from html.parser import HTMLParser
+from typing import List, Union
+import logging
+
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree
+    import lxml.html
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+try:
+    from selectolax.parser import HTMLParser as SelectolaxParser
+    HAS_SELECTOLAX = True
+except ImportError:
+    HAS_SELECTOLAX = False
+
+logger = logging.getLogger(__name__)
+
+# 文本不参与输出的标签
+SKIP_TAGS = frozenset(['script', 'style', 'noscript', 'template', 'iframe', 'svg'])
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.I)
+# lxml 不接受带编码声明的 str，解析前去掉
+_XML_DECLARATION_RE = re.compile(r'^\s*<\?xml[^>]*\?>')
+
+BACKENDS = ('auto', 'selectolax', 'lxml', 'stdlib', 'bs4')
+
+
+def _decode(html: Union[str, bytes]) -> str:
+    """bytes 按 <meta charset> 解码；未声明时依次尝试 UTF-8、GB18030"""
+    if isinstance(html, str):
+        return html
+    match = _META_CHARSET_RE.search(html[:4096])
+    if match:
+        try:
+            return html.decode(match.group(1).decode('ascii'), errors='replace')
+        except LookupError:
+            pass
+    for encoding in ('utf-8', 'gb18030'):
+        try:
+            return html.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return html.decode('utf-8', errors='replace')
+
+
+def parse_html_tree(html: Union[str, bytes]):
+    """用 lxml 解析为元素树，只有空白或注释的文档返回 None"""
+    try:
+        return lxml.html.fromstring(_XML_DECLARATION_RE.sub('', _decode(html), count=1))
+    except etree.ParserError:
+        return None
+
+
+class TextCollector:
+    """累积文本片段（内部空白合并为单个空格）并统计长度，超过上限后 full 为 True"""
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self.parts: List[str] = []
+        self.length = 0
+
+    def add(self, text: str) -> bool:
+        text = ' '.join(text.split())
+        if text:
+            self.parts.append(text)
+            self.length += len(text) + 1
+        return self.full
+
+    @property
+    def full(self) -> bool:
+        return bool(self.max_chars) and self.length > self.max_chars
+
+    def result(self) -> str:
+        text = ' '.join(self.parts)
+        return text[:self.max_chars] if self.max_chars else text
+
+
+class _StdlibTextParser(HTMLParser):
+    def __init__(self, collector: TextCollector):
+        super().__init__(convert_charrefs=True)
+        self.collector = collector
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.collector.add(data)
+
+
+class HtmlCleaner:
+    """
+    把 HTML 转成以单个空格分隔的纯文本，并截断到 max_chars
+    输出与原 BeautifulSoup 实现一致：get_text(separator=' ', strip=True) 后合并空白
+    """
+
+    # stdlib 后端每次喂入的字符数，达到上限后不再继续
+    STDLIB_CHUNK = 16 * 1024
+
+    def __init__(self, backend: str = 'auto', max_chars: int = 5000):
+        self.max_chars = max_chars
+        self.backend = self._resolve_backend(backend)
+        self._clean = getattr(self, f'_clean_{self.backend}')
+
+    @staticmethod
+    def _resolve_backend(backend: str) -> str:
+        backend = (backend or 'auto').lower()
+        if backend not in BACKENDS:
+            logger.warning(f"未知的 HTML 清洗后端 {backend}，使用 auto")
+            backend = 'auto'
+        if backend == 'selectolax' and not HAS_SELECTOLAX:
+            logger.warning("未安装 selectolax，HTML 清洗改用 auto")
+            backend = 'auto'
+        if backend == 'lxml' and not HAS_LXML:
+            backend = 'stdlib'
+        if backend == 'auto':
+            backend = 'selectolax' if HAS_SELECTOLAX else 'lxml' if HAS_LXML else 'stdlib'
+        return backend
+
+    def clean(self, html: Union[str, bytes]) -> str:
+        if not html:
+            return ""
+        try:
+            return self._clean(html)
+        except Exception as e:
+            # 快速后端解析失败时退回最宽松的 BeautifulSoup
+            logger.warning(f"HTML 清洗失败（{self.backend}），改用 bs4：{e}")
+            return self._clean_bs4(html)
+
+    def _clean_bs4(self, html: Union[str, bytes]) -> str:
+        soup = BeautifulSoup(html, 'lxml')
+        for tag in soup(list(SKIP_TAGS)):
+            tag.decompose()
+        text = _WHITESPACE_RE.sub(' ', soup.get_text(separator=' ', strip=True))
+        return text[:self.max_chars] if self.max_chars else text
+
+    def _clean_lxml(self, html: Union[str, bytes]) -> str:
+        root = parse_html_tree(html)
+        if root is None:
+            return ""
+
+        collector = TextCollector(self.max_chars)
+        skip_depth = 0
+        for event, element in etree.iterwalk(root, events=('start', 'end')):
+            # 注释、处理指令的 tag 不是字符串，只保留其后的 tail 文本
+            is_tag = isinstance(element.tag, str)
+            skipped = is_tag and element.tag in SKIP_TAGS
+            if event == 'start':
+                if skipped:
+                    skip_depth += 1
+                elif is_tag and not skip_depth and element.text:
+                    if collector.add(element.text):
+                        break
+            else:
+                if skipped:
+                    skip_depth -= 1
+                if not skip_depth and element.tail and element is not root:
+                    if collector.add(element.tail):
+                        break
+        return collector.result()
+
+    def _clean_stdlib(self, html: Union[str, bytes]) -> str:
+        html = _decode(html)
+        collector = TextCollector(self.max_chars)
+        parser = _StdlibTextParser(collector)
+        start = 0
+        while start < len(html):
+            # 在 '<' 处切块，避免一段文字被切开后多出空格
+            end = start + self.STDLIB_CHUNK
+            if end < len(html):
+                cut = html.rfind('<', start + 1, end)
+                end = cut if cut > 0 else end
+            parser.feed(html[start:end])
+            if collector.full:
+                return collector.result()
+            start = end
+        parser.close()
+        return collector.result()
+
+    def _clean_selectolax(self, html: Union[str, bytes]) -> str:
+        tree = SelectolaxParser(_decode(html))
+        tree.strip_tags(list(SKIP_TAGS))
+        root = tree.body or tree.root
+        if root is None:
+            return ""
+        collector = TextCollector(self.max_chars)
+        collector.add(root.text(separator=' '))
+        return collector.result()
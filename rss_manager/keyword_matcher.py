@@ -0,0 +1,104 @@
+"""
+关键词匹配模块 - 把所有关键词编译成一个 Aho-Corasick 自动机，一次扫描文本找出全部命中
+- 不区分大小写，同一关键词多次出现只计一次
+- 每个关键词带权重，命中关键词的权重之和作为文章的关键词得分
+- 可直接在 Python 中使用，也可注册为 SQLite 自定义函数在查询中过滤和排序
+"""
+import sqlite3
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+# SQLite 中的函数名：kw_score(字段1, 字段2, ...) 返回命中关键词的权重之和
+SQL_FUNCTION_NAME = 'kw_score'
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick 多模式匹配
+    keywords 可以是关键词列表（权重均为 1），也可以是 {关键词: 权重} 或 [(关键词, 权重)]
+    """
+
+    def __init__(self, keywords: Union[Dict[str, int], Iterable[Union[str, Tuple[str, int]]]] = ()):
+        items = keywords.items() if isinstance(keywords, dict) else keywords
+        self.keywords: List[str] = []
+        self.weights: List[int] = []
+        seen = {}
+        for item in items:
+            keyword, weight = (item, 1) if isinstance(item, str) else item
+            keyword = (keyword or '').lower().strip()
+            if not keyword:
+                continue
+            # 权重至少为 1，保证命中任一关键词时得分大于 0
+            weight = max(1, int(weight or 1))
+            if keyword in seen:
+                # 重复的关键词保留较高的权重
+                self.weights[seen[keyword]] = max(self.weights[seen[keyword]], weight)
+                continue
+            seen[keyword] = len(self.keywords)
+            self.keywords.append(keyword)
+            self.weights.append(weight)
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def _build(self):
+        # 状态 0 为根；goto[s] 为字符到下一状态的映射，outputs[s] 为在状态 s 结束的关键词下标
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[Tuple[int, ...]] = [()]
+
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._outputs.append(())
+                state = next_state
+            self._outputs[state] += (index,)
+
+        # 广度优先计算失败指针，并把失败状态的输出合并进来
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._outputs[next_state] += self._outputs[self._fail[next_state]]
+
+    def _scan(self, text: str, found: Set[int]):
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        state = 0
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+
+    def find_indices(self, *texts: Optional[str]) -> Set[int]:
+        found: Set[int] = set()
+        if self.keywords:
+            for text in texts:
+                if text:
+                    self._scan(str(text), found)
+        return found
+
+    def find(self, *texts: Optional[str]) -> List[str]:
+        """返回在任一文本中出现的关键词，按构造时的顺序"""
+        return [self.keywords[i] for i in sorted(self.find_indices(*texts))]
+
+    def score(self, *texts: Optional[str]) -> int:
+        """命中关键词的权重之和，未命中返回 0"""
+        return sum(self.weights[i] for i in self.find_indices(*texts))
+
+    def register(self, conn: sqlite3.Connection, name: str = SQL_FUNCTION_NAME):
+        """在连接上注册 SQL 函数 name(字段...)，返回关键词得分"""
+        conn.create_function(name, -1, self.score, deterministic=True)
@@ -1,8 +1,13 @@
 """
 RSS订阅管理器 - 主入口文件
+用法：
+    python main.py                    # 启动图形界面
+    python main.py --headless         # 以后台服务运行（不加载 PyQt）
+    python main.py --headless --once  # 后台流程只执行一轮后退出
 """
 import sys
 import os
+import argparse
 import logging
 # 配置根日志记录器
 logging.basicConfig(
@@ -13,7 +18,21 @@ logging.basicConfig(
 # 添加当前目录到路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from gui import main
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="RSS订阅管理器")
+    parser.add_argument('--headless', action='store_true', help="以无界面后台服务运行")
+    parser.add_argument('--once', action='store_true', help="后台服务只执行一轮 抓取→摘要→日报 后退出")
+    parser.add_argument('--config', help="后台服务使用的配置文件，默认为程序目录下的 config.json")
+    return parser.parse_args()
+
 
 if __name__ == '__main__':
-    main()
+    args = parse_args()
+    if args.headless:
+        # 后台模式不导入 gui，避免加载 Qt
+        import daemon
+        sys.exit(daemon.main(once=args.once, config_path=args.config))
+    else:
+        from gui import main
+        main()
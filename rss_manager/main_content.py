@@ -0,0 +1,185 @@
+"""
+网页正文提取模块 - 类 Readability 的打分算法，从整页 HTML 中找出正文所在的块
+去掉导航、页脚、侧栏、推荐阅读等噪声，找不到可信的正文块时退回整页纯文本
+"""
+import re
+from typing import Dict, List, Union
+import logging
+
+from html_cleaner import HtmlCleaner, TextCollector, HAS_LXML, SKIP_TAGS, parse_html_tree
+
+logger = logging.getLogger(__name__)
+
+# 直接丢弃的结构性标签
+NOISE_TAGS = SKIP_TAGS | {'nav', 'header', 'footer', 'aside', 'form', 'button', 'select', 'textarea'}
+# 参与打分的文本块
+SCORE_TAGS = {'p', 'pre', 'td', 'blockquote', 'li', 'section', 'div'}
+
+NEGATIVE_RE = re.compile(
+    r'comment|footer|footnote|sidebar|side-bar|widget|nav|menu|breadcrumb|share|social|'
+    r'related|recommend|promo|advert|\bad[s-]?\b|banner|sponsor|popup|modal|login|subscribe|'
+    r'copyright|tags?\b|author-info|hot-?list|rank',
+    re.I
+)
+POSITIVE_RE = re.compile(r'article|content|main|post|entry|body|text|story|detail|rich_media', re.I)
+
+# 中英文逗号都视为“句子丰富”的信号
+COMMA_RE = re.compile(r'[,，、；;]')
+
+MIN_PARAGRAPH_CHARS = 25
+# 提取结果短于这个长度时认为没找到正文，退回整页文本
+MIN_MAIN_TEXT_CHARS = 200
+
+
+def _class_weight(element) -> int:
+    weight = 0
+    for attr in ('class', 'id'):
+        value = element.get(attr)
+        if not value:
+            continue
+        if NEGATIVE_RE.search(value):
+            weight -= 25
+        if POSITIVE_RE.search(value):
+            weight += 25
+    return weight
+
+
+def _text_length(element) -> int:
+    return len(''.join(element.itertext()).strip())
+
+
+def _link_density(element, text_length: int) -> float:
+    if not text_length:
+        return 0.0
+    link_length = sum(_text_length(a) for a in element.iter('a'))
+    return link_length / text_length
+
+
+class MainContentExtractor:
+    """
+    正文提取
+    1. 删除噪声标签，以及 class/id 明显是导航、评论、推荐的块（除非同时带有正文特征）
+    2. 按段落长度和逗号数给段落打分，分数累加到父节点和祖父节点
+    3. 按链接密度折算后取最高分的块，连同得分接近的兄弟节点一起输出
+    """
+
+    def __init__(self, max_chars: int = 5000, html_cleaner_backend: str = 'auto'):
+        self.max_chars = max_chars
+        self.fallback = HtmlCleaner(html_cleaner_backend, max_chars=max_chars)
+
+    def extract(self, html: Union[str, bytes]) -> str:
+        if not html:
+            return ""
+        if HAS_LXML:
+            try:
+                text = self._extract_main(html)
+                if len(text) >= MIN_MAIN_TEXT_CHARS:
+                    return text
+            except Exception as e:
+                logger.debug(f"正文提取失败，使用整页文本：{e}")
+        return self.fallback.clean(html)
+
+    def _extract_main(self, html: Union[str, bytes]) -> str:
+        root = parse_html_tree(html)
+        if root is None:
+            return ""
+
+        self._strip_noise(root)
+        candidates = self._score_candidates(root)
+        if not candidates:
+            return ""
+
+        # 链接密度高的块（导航、列表页）按比例降分
+        for element, score in candidates.items():
+            candidates[element] = score * (1 - _link_density(element, _text_length(element)))
+        top = max(candidates, key=candidates.get)
+        return self._collect_text(self._siblings_to_keep(top, candidates))
+
+    @staticmethod
+    def _strip_noise(root):
+        noise = []
+        for element in root.iter():
+            if not isinstance(element.tag, str):
+                noise.append(element)
+            elif element.tag in NOISE_TAGS:
+                noise.append(element)
+            elif element.tag not in ('html', 'body', 'article', 'main') and _class_weight(element) < 0:
+                noise.append(element)
+        for element in noise:
+            parent = element.getparent()
+            if parent is None:
+                continue
+            # 保留尾随文本，避免删除节点时把后面的正文一起带走
+            if element.tail:
+                previous = element.getprevious()
+                if previous is not None:
+                    previous.tail = (previous.tail or '') + element.tail
+                else:
+                    parent.text = (parent.text or '') + element.tail
+            parent.remove(element)
+
+    @staticmethod
+    def _score_candidates(root) -> Dict:
+        candidates: Dict = {}
+
+        def initial_score(element) -> float:
+            score = _class_weight(element)
+            if element.tag in ('article', 'main'):
+                score += 10
+            elif element.tag in ('div', 'section'):
+                score += 5
+            elif element.tag in ('ul', 'ol', 'li', 'form', 'th'):
+                score -= 3
+            return score
+
+        for element in root.iter(*SCORE_TAGS):
+            text = ' '.join(''.join(element.itertext()).split())
+            if len(text) < MIN_PARAGRAPH_CHARS:
+                continue
+            # div / section 只有直接包含文本时才视为段落
+            if element.tag in ('div', 'section') and not (element.text and element.text.strip()):
+                continue
+
+            score = 1 + len(COMMA_RE.findall(text)) + min(len(text) // 100, 3)
+            parent = element.getparent()
+            if parent is None:
+                continue
+            grandparent = parent.getparent()
+            for ancestor, share in ((parent, 1.0), (grandparent, 0.5)):
+                if ancestor is None or not isinstance(ancestor.tag, str):
+                    continue
+                if ancestor not in candidates:
+                    candidates[ancestor] = initial_score(ancestor)
+                candidates[ancestor] += score * share
+        return candidates
+
+    @staticmethod
+    def _siblings_to_keep(top, candidates: Dict) -> List:
+        """正文常被拆成几个并列的块，得分接近或本身就是长段落的兄弟节点一并保留"""
+        parent = top.getparent()
+        if parent is None:
+            return [top]
+        threshold = max(10.0, candidates[top] * 0.2)
+        kept = []
+        for sibling in parent:
+            if sibling is top:
+                kept.append(sibling)
+                continue
+            if not isinstance(sibling.tag, str):
+                continue
+            if candidates.get(sibling, 0) >= threshold:
+                kept.append(sibling)
+            elif sibling.tag == 'p':
+                text_length = _text_length(sibling)
+                if text_length > 80 and _link_density(sibling, text_length) < 0.25:
+                    kept.append(sibling)
+        return kept
+
+    def _collect_text(self, elements: List) -> str:
+        collector = TextCollector(self.max_chars)
+        for element in elements:
+            for text in element.itertext():
+                if collector.add(text):
+                    return collector.result()
+        return collector.result()
+
@@ -1,18 +1,163 @@
-from playwright.sync_api import sync_playwright
+"""
+Playwright 浏览器池 - 为需要执行 JS 才能显示正文的站点（如 Medium）渲染网页
+- 后台线程里运行一个常驻 Chromium，所有请求共用，不再每篇文章启动一次浏览器
+- 复用同一个浏览器上下文和有限数量的页面，上下文定期重建以释放内存
+- 拦截图片、字体、音视频请求
+- 以正文节点出现且文本长度稳定作为加载完成，不再等待 networkidle + 固定 2 秒
+"""
+import asyncio
+import atexit
+import threading
+import time
+from typing import Optional
+import logging
 
+try:
+    from playwright.async_api import async_playwright
+    HAS_PLAYWRIGHT = True
+except ImportError:
+    HAS_PLAYWRIGHT = False
 
-def fetch_medium_article(url):
-    """使用 Playwright无头模式获取 Medium 文章页面内容"""
-    with sync_playwright() as p:
-        # 启动浏览器（无头模式）
-        browser = p.chromium.launch(headless=True)
-        
-        # 创建浏览器上下文
-        context = browser.new_context(
-            user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/146.0.0.0 Safari/537.36",
+logger = logging.getLogger(__name__)
+
+USER_AGENT = ("Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/146.0.0.0 Safari/537.36")
+BLOCKED_RESOURCE_TYPES = frozenset(['image', 'font', 'media'])
+# 出现任一节点即认为正文开始渲染
+READY_SELECTOR = 'article, main, [role="main"]'
+
+
+class BrowserPool:
+    """
+    常驻浏览器池，线程安全
+    Playwright 对象只能在创建它的线程中使用，这里由一个专用线程运行 asyncio 事件循环，
+    其他线程通过 fetch_html 提交任务并等待结果
+    """
+
+    # 正文出现后等待文本长度稳定的最长时间（秒）
+    READY_TIMEOUT = 5
+    READY_POLL_INTERVAL = 0.25
+    # 启动失败（如未安装浏览器）后的冷却时间（秒），期间不再尝试启动，调用方回退到普通请求
+    LAUNCH_RETRY_COOLDOWN = 600
+
+    def __init__(self, max_pages: int = 2, page_timeout: float = 30,
+                 recycle_after: int = 100, headless: bool = True):
+        """
+        :param max_pages: 同时打开的页面数上限
+        :param page_timeout: 单个页面导航的超时（秒）
+        :param recycle_after: 上下文累计打开这么多个网页后重建，释放缓存和内存
+        """
+        if not HAS_PLAYWRIGHT:
+            raise RuntimeError("未安装 playwright：pip install playwright && playwright install chromium")
+        self.max_pages = max(1, int(max_pages or 1))
+        self.page_timeout = page_timeout
+        self.recycle_after = recycle_after
+        self.headless = headless
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+        self._start_error: Optional[BaseException] = None
+        self._launch_failed_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+        # 以下只在事件循环线程中访问
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._page_slots = None
+        self._idle_pages = []
+        self._busy = 0
+        self._context_uses = 0
+
+    # ---------- 对外接口（任意线程） ----------
+
+    @property
+    def available(self) -> bool:
+        """最近一次启动失败后的冷却期内为 False"""
+        failed_at = self._launch_failed_at
+        return failed_at is None or time.monotonic() - failed_at >= self.LAUNCH_RETRY_COOLDOWN
+
+    def start(self):
+        """启动浏览器，重复调用无副作用；启动失败后冷却期内直接抛出异常，不再重试"""
+        with self._lock:
+            if self._thread is None:
+                if not self.available:
+                    raise RuntimeError(f"浏览器启动失败，{self.LAUNCH_RETRY_COOLDOWN} 秒内不再重试：{self._start_error}")
+                self._started.clear()
+                self._start_error = None
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._run_loop, name='browser-pool', daemon=True)
+                self._thread.start()
+            thread = self._thread
+        self._started.wait()
+        if self._start_error:
+            with self._lock:
+                if self._thread is thread:
+                    self._thread = None
+                    self._launch_failed_at = time.monotonic()
+            raise RuntimeError(f"浏览器启动失败：{self._start_error}")
+        self._launch_failed_at = None
+
+    def fetch_html(self, url: str) -> str:
+        """渲染网页并返回 HTML，失败时抛出异常"""
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(self._render(url), self._loop)
+        try:
+            return future.result(timeout=self.page_timeout + self.READY_TIMEOUT + 10)
+        except Exception:
+            future.cancel()
+            raise
+
+    def close(self):
+        with self._lock:
+            thread, loop = self._thread, self._loop
+            self._thread = None
+        if thread is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(timeout=10)
+        except Exception as e:
+            logger.warning(f"关闭浏览器失败：{e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+
+    # ---------- 事件循环线程 ----------
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._launch())
+        except BaseException as e:
+            self._start_error = e
+            # chromium 启动失败时 Playwright 驱动进程已经在运行，需要一并停止，否则每次重试都泄漏一个
+            try:
+                self._loop.run_until_complete(self._shutdown())
+            except Exception as stop_error:
+                logger.warning(f"停止 Playwright 失败：{stop_error}")
+            self._started.set()
+            self._loop.close()
+            return
+        self._started.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.close()
+
+    async def _launch(self):
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=self.headless)
+        self._page_slots = asyncio.Semaphore(self.max_pages)
+        await self._new_context()
+        logger.info(f"浏览器池已启动，页面上限 {self.max_pages}")
+
+    async def _new_context(self):
+        self._context = await self._browser.new_context(
+            user_agent=USER_AGENT,
             viewport={"width": 1920, "height": 1080}
         )
-        
+        await self._context.route('**/*', self._route)
+
         # # 添加 cookies
         # cookies = [
         #     {"name": "g_state", "value": "{\"i_l\":0,\"i_ll\":1768707205376}", "domain": ".medium.com", "path": "/"},
@@ -26,34 +171,138 @@ def fetch_medium_article(url):
         #     {"name": "_ga_7JY7T788PK", "value": "GS2.1.s1773542210$o14$g1$t1773542288$j53$l0$h0", "domain": ".medium.com", "path": "/"},
         #     {"name": "_dd_s", "value": "rum=0&expire=1773543209360", "domain": ".medium.com", "path": "/"}
         # ]
-        # context.add_cookies(cookies)
-        
-        # 创建新页面
-        page = context.new_page()
-        
+        # await self._context.add_cookies(cookies)
+
+        self._idle_pages = []
+        self._context_uses = 0
+
+    @staticmethod
+    async def _route(route):
+        if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _recycle_context(self):
+        old_context = self._context
+        await self._new_context()
         try:
-            # 访问页面并等待加载
-            page.goto(url, wait_until="networkidle")
-            
-            # 等待页面完全加载
-            page.wait_for_timeout(2000)
-            
-            # 获取页面内容
-            content = page.content()
-            
-            return content
-            
-        except Exception as e:
-            print(f"Error fetching page: {e}")
-            return None
-        finally:
-            browser.close()
+            await old_context.close()
+        except Exception:
+            pass
+
+    async def _render(self, url: str) -> str:
+        async with self._page_slots:
+            # 没有页面在用时才重建上下文，避免打断其他请求
+            if self._context_uses >= self.recycle_after and self._busy == 0:
+                await self._recycle_context()
+
+            page = self._idle_pages.pop() if self._idle_pages else await self._context.new_page()
+            context = self._context
+            self._busy += 1
+            self._context_uses += 1
+            reusable = False
+            try:
+                await page.goto(url, wait_until='domcontentloaded', timeout=self.page_timeout * 1000)
+                await self._wait_ready(page)
+                html = await page.content()
+                reusable = True
+                return html
+            finally:
+                self._busy -= 1
+                await self._release_page(page, reusable and context is self._context)
+
+    async def _release_page(self, page, reusable: bool):
+        if reusable and not page.is_closed():
+            try:
+                # 回到空白页，释放上一个网页的 DOM 和脚本
+                await page.goto('about:blank')
+                self._idle_pages.append(page)
+                return
+            except Exception:
+                pass
+        try:
+            await page.close()
+        except Exception:
+            pass
+
+    async def _wait_ready(self, page):
+        """等正文节点出现，再等 body 文本长度连续两次不变"""
+        deadline = time.monotonic() + self.READY_TIMEOUT
+        try:
+            await page.wait_for_selector(READY_SELECTOR, state='attached', timeout=self.READY_TIMEOUT * 1000)
+        except Exception:
+            # 没有语义化标签的页面，直接进入文本稳定判断
+            pass
+
+        last_length, stable = -1, 0
+        while time.monotonic() < deadline:
+            length = await page.evaluate('document.body ? document.body.innerText.length : 0')
+            if length and length == last_length:
+                stable += 1
+                if stable >= 2:
+                    return
+            else:
+                stable = 0
+            last_length = length
+            await asyncio.sleep(self.READY_POLL_INTERVAL)
+
+    async def _shutdown(self):
+        for obj in (self._context, self._browser):
+            if obj is not None:
+                try:
+                    await obj.close()
+                except Exception:
+                    pass
+        self._context = self._browser = None
+        playwright, self._playwright = self._playwright, None
+        if playwright is not None:
+            await playwright.stop()
+
+
+_shared_pool: Optional[BrowserPool] = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_browser_pool(max_pages: int = 2, page_timeout: float = 30) -> Optional[BrowserPool]:
+    """进程内共享的浏览器池（首次调用时的参数生效），未安装 playwright 时返回 None"""
+    global _shared_pool
+    if not HAS_PLAYWRIGHT:
+        return None
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = BrowserPool(max_pages=max_pages, page_timeout=page_timeout)
+        return _shared_pool
+
+
+def shutdown_browser_pool():
+    global _shared_pool
+    with _shared_pool_lock:
+        pool, _shared_pool = _shared_pool, None
+    if pool:
+        pool.close()
+
+
+atexit.register(shutdown_browser_pool)
+
+
+def fetch_medium_article(url):
+    """使用共享的无头浏览器获取 Medium 文章页面内容"""
+    pool = get_browser_pool()
+    if pool is None:
+        print("未安装 playwright，无法渲染页面")
+        return None
+    try:
+        return pool.fetch_html(url)
+    except Exception as e:
+        print(f"Error fetching page: {e}")
+        return None
 
 
 if __name__ == "__main__":
     url = "https://medium.com/@munchieblak/a-i-and-the-demonic-966c7ee904de"
     content = fetch_medium_article(url)
-    
+
     if content:
         print(content)
         print("\n" + "="*50)
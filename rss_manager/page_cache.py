@@ -0,0 +1,152 @@
+"""
+网页正文磁盘缓存 - 按 URL 缓存预取到的正文和 HTTP 校验信息（ETag / Last-Modified）
+摘要阶段只读缓存，重复运行时也不会重新下载网页
+"""
+import os
+import json
+import time
+import hashlib
+import tempfile
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PageCache:
+    """
+    每个 URL 一个 JSON 文件：<cache_dir>/<sha1 前两位>/<sha1>.json
+    - 内容：url, text, etag, last_modified, fetched_at, failed, failed_at
+    - 抓取失败时保留已有的正文和校验信息，只标记 failed 并记录 failed_at
+    - 写入先落临时文件再原子替换，多线程、多进程（GUI 与后台服务）同时读写安全
+    - 超过 ttl_days 未更新的条目由 prune() 删除；遍历整个目录的清理最多每 PRUNE_INTERVAL_SECONDS 执行一次，
+      上次清理时间记录在目录下的标记文件中，多个进程共用
+    """
+
+    # 成功的条目在这段时间内视为新鲜，超过后用校验信息发条件请求
+    FRESH_SECONDS = 24 * 3600
+    # 抓取失败的 URL 隔这么久再重试
+    FAILURE_RETRY_SECONDS = 3600
+    # 两次清理之间的最短间隔
+    PRUNE_INTERVAL_SECONDS = 6 * 3600
+    PRUNE_MARKER = '.last_prune'
+
+    def __init__(self, cache_dir: str = 'page_cache', ttl_days: float = 7):
+        self.cache_dir = cache_dir
+        self.ttl_days = ttl_days
+
+    def _path(self, url: str) -> str:
+        digest = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], f'{digest}.json')
+
+    def get(self, url: str) -> Optional[Dict]:
+        try:
+            with open(self._path(url), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # sha1 冲突或文件被替换时不返回别的 URL 的内容
+        return entry if entry.get('url') == url else None
+
+    def get_text(self, url: str) -> Optional[str]:
+        """缓存中的正文（最近一次抓取失败时返回之前保留的正文），没有时返回 None"""
+        entry = self.get(url)
+        if not entry:
+            return None
+        return entry.get('text') or None
+
+    def is_fresh(self, entry: Optional[Dict], now: float = None) -> bool:
+        if not entry:
+            return False
+        now = now or time.time()
+        if entry.get('failed'):
+            return now - entry.get('failed_at', entry.get('fetched_at', 0)) < self.FAILURE_RETRY_SECONDS
+        return now - entry.get('fetched_at', 0) < self.FRESH_SECONDS
+
+    def put(self, url: str, text: str = '', etag: str = None, last_modified: str = None,
+            failed: bool = False):
+        now = time.time()
+        self._write({
+            'url': url,
+            'text': text,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': now,
+            'failed': failed,
+            'failed_at': now if failed else None,
+        })
+
+    def mark_failed(self, url: str, entry: Optional[Dict] = None):
+        """
+        记录一次抓取失败：已有正文时保留正文、校验信息和原抓取时间，只标记失败时间；
+        没有可用缓存时写入空的失败条目
+        """
+        entry = entry if entry is not None else self.get(url)
+        if not entry or not entry.get('text'):
+            self.put(url, failed=True)
+            return
+        self._write(dict(entry, failed=True, failed_at=time.time()))
+
+    def _write(self, entry: Dict):
+        path = self._path(entry['url'])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def touch(self, entry: Dict):
+        """服务端返回 304：内容不变，只刷新抓取时间"""
+        self.put(entry['url'], entry.get('text', ''), entry.get('etag'), entry.get('last_modified'))
+
+    def _prune_due(self, now: float) -> bool:
+        """距上次清理超过间隔时返回 True，并立即更新标记，避免其他线程/进程重复清理"""
+        marker = os.path.join(self.cache_dir, self.PRUNE_MARKER)
+        try:
+            if now - os.path.getmtime(marker) < self.PRUNE_INTERVAL_SECONDS:
+                return False
+        except OSError:
+            # 标记不存在（首次清理）或目录尚未创建
+            if not os.path.isdir(self.cache_dir):
+                return False
+        try:
+            with open(marker, 'a'):
+                pass
+            os.utime(marker, (now, now))
+        except OSError:
+            pass
+        return True
+
+    def prune(self, force: bool = False) -> int:
+        """
+        删除超过 ttl_days 未更新的条目，返回删除数量
+        :param force: 忽略清理间隔立即清理
+        """
+        if not self.ttl_days:
+            return 0
+        now = time.time()
+        if not force and not self._prune_due(now):
+            return 0
+        cutoff = now - self.ttl_days * 86400
+        removed = 0
+        for dirpath, _, filenames in os.walk(self.cache_dir):
+            for name in filenames:
+                if name == self.PRUNE_MARKER:
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    continue
+        if removed:
+            logger.info(f"页面缓存清理 {removed} 个过期条目")
+        return removed
@@ -0,0 +1,137 @@
+"""
+抓取调度模块 - 按各订阅源的更新频率决定抓取间隔，只抓取到期的订阅源
+"""
+import statistics
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional
+import logging
+
+from database import Database
+
+logger = logging.getLogger(__name__)
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class FeedScheduler:
+    """
+    订阅源自适应调度
+    - 抓取间隔取最近文章发布间隔中位数的一半，限制在 [min_interval, max_interval] 内
+    - 长时间没有新文章的源，按距上次发布的时长逐步放慢
+    - 抓取失败按 2^n 退避，成功后恢复
+    - 状态保存在 feed_schedule 表，程序重启后从上次的进度继续
+    """
+
+    def __init__(self, db: Database, min_interval: float = 15 * 60, max_interval: float = 24 * 3600,
+                 default_interval: float = 3600, history_size: int = 20):
+        """
+        :param default_interval: 历史文章不足以估计更新频率时使用的间隔（秒）
+        :param history_size: 估计更新频率时参考的最近文章数
+        """
+        self.db = db
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.default_interval = min(max(default_interval, min_interval), self.max_interval)
+        self.history_size = history_size
+
+    def _clamp(self, seconds: float) -> int:
+        return int(min(max(seconds, self.min_interval), self.max_interval))
+
+    def compute_interval(self, publish_times: List[str], now: datetime = None) -> int:
+        """根据发布时间历史计算抓取间隔（秒）"""
+        now = now or datetime.now()
+        times = []
+        for value in publish_times:
+            try:
+                times.append(datetime.strptime(value[:19], TIME_FORMAT))
+            except (TypeError, ValueError):
+                continue
+        times.sort()
+
+        gaps = [(b - a).total_seconds() for a, b in zip(times, times[1:])]
+        gaps = [gap for gap in gaps if gap > 0]
+        if not gaps:
+            return self._clamp(self.default_interval)
+
+        interval = statistics.median(gaps) / 2
+        # 沉寂的源：距上次发布越久，抓取越稀疏
+        idle = (now - times[-1]).total_seconds()
+        if idle > interval * 4:
+            interval = max(interval, idle / 4)
+        return self._clamp(interval)
+
+    def due_feeds(self, feeds: List[Dict] = None, now: datetime = None) -> List[Dict]:
+        """返回已到期的订阅源；从未调度过的订阅源视为到期"""
+        now = now or datetime.now()
+        feeds = feeds if feeds is not None else self.db.get_all_feeds()
+        schedules = self.db.get_feed_schedules()
+        now_str = now.strftime(TIME_FORMAT)
+        return [
+            feed for feed in feeds
+            if feed['id'] not in schedules or schedules[feed['id']]['next_due_at'] <= now_str
+        ]
+
+    def next_due_at(self) -> Optional[str]:
+        """最早的下次抓取时间，没有调度记录时返回 None"""
+        schedules = self.db.get_feed_schedules()
+        if not schedules:
+            return None
+        return min(s['next_due_at'] for s in schedules.values())
+
+    def record_results(self, feeds: List[Dict], result: Dict, now: datetime = None):
+        """
+        根据 fetch_all_feeds 的结果更新调度状态
+        因全局截止时间被放弃的订阅源不更新，下一轮仍然到期
+        """
+        now = now or datetime.now()
+        now_str = now.strftime(TIME_FORMAT)
+        schedules = self.db.get_feed_schedules()
+        succeeded = {r['feed_id'] for r in result.get('feeds', [])}
+        failed = set(result.get('failed_feed_ids', []))
+
+        updates = []
+        for feed in feeds:
+            feed_id = feed['id']
+            previous = schedules.get(feed_id, {})
+            if feed_id in succeeded:
+                history = self.db.get_feed_publish_history(feed_id, self.history_size)
+                interval = self.compute_interval(history, now)
+                updates.append({
+                    'feed_id': feed_id,
+                    'interval_seconds': interval,
+                    'next_due_at': (now + timedelta(seconds=interval)).strftime(TIME_FORMAT),
+                    'failure_count': 0,
+                    'last_attempt_at': now_str,
+                    'last_success_at': now_str,
+                })
+            elif feed_id in failed:
+                failures = previous.get('failure_count', 0) + 1
+                base = previous.get('interval_seconds') or self.default_interval
+                backoff = self._clamp(base * 2 ** failures)
+                updates.append({
+                    'feed_id': feed_id,
+                    'interval_seconds': base,
+                    'next_due_at': (now + timedelta(seconds=backoff)).strftime(TIME_FORMAT),
+                    'failure_count': failures,
+                    'last_attempt_at': now_str,
+                    'last_success_at': previous.get('last_success_at'),
+                })
+                logger.info(f"订阅源 {feed.get('name', feed_id)} 连续失败 {failures} 次，{backoff // 60} 分钟后重试")
+
+        self.db.save_feed_schedules(updates)
+
+    def run(self, fetcher, due_only: bool = True) -> Dict:
+        """
+        抓取订阅源并更新调度状态
+        :param due_only: True 时只抓取到期的订阅源，False 时抓取全部（手动刷新）
+        """
+        feeds = self.db.get_all_feeds()
+        if due_only:
+            feeds = self.due_feeds(feeds)
+        if not feeds:
+            return fetcher.fetch_all_feeds(feeds=[])
+
+        logger.info(f"本轮抓取 {len(feeds)} 个订阅源")
+        result = fetcher.fetch_all_feeds(feeds=feeds)
+        self.record_results(feeds, result)
+        return result
@@ -0,0 +1,121 @@
+"""
+摘要任务队列模块 - 从 summary_jobs 表领取任务并生成摘要
+- 任务存放在数据库中，程序重启后未完成的任务继续处理
+- 领取任务时写入租约，租约到期前其他工作者不会领取；进程崩溃后租约到期自动重新领取
+- GUI、后台服务的多个线程/进程可以同时消费同一个队列
+"""
+import os
+import socket
+import threading
+import uuid
+from typing import Callable, Dict
+import logging
+
+from database import Database
+from fetcher import Summarizer
+
+logger = logging.getLogger(__name__)
+
+
+class SummaryJobRunner:
+    """
+    摘要任务消费者
+    每批领取 batch_size 个任务，预取正文后并发生成摘要，逐篇按结果出队或释放；
+    租约需覆盖一批任务的处理时间，默认批大小为摘要线程数的两倍
+    """
+
+    def __init__(self, db: Database, summarizer: Summarizer, lease_seconds: int = 600,
+                 batch_size: int = None, worker_id: str = None):
+        """
+        :param lease_seconds: 租约时长（秒），超过后任务可被其他工作者重新领取
+        :param worker_id: 工作者标识，写入租约便于排查，默认为 主机名:进程号
+        """
+        self.db = db
+        self.summarizer = summarizer
+        self.lease_seconds = max(60, int(lease_seconds))
+        self.batch_size = max(1, int(batch_size or summarizer.max_workers * 2))
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+
+        self._stop = threading.Event()
+        # 本工作者当前持有的租约，正常退出时释放，崩溃时等待到期
+        self._leases = set()
+        self._leases_lock = threading.Lock()
+
+    def stop(self):
+        """当前这批完成后停止领取新任务"""
+        self._stop.set()
+
+    def release(self) -> int:
+        """释放本工作者持有的所有租约，任务立即可被重新领取，返回释放的任务数"""
+        with self._leases_lock:
+            leases = list(self._leases)
+        return self.db.release_summary_jobs(leases)
+
+    def _new_lease(self) -> str:
+        # 每批使用独立的租约标识，完成任务时凭它确认任务没有被超时接管
+        lease = f"{self.worker_id}:{threading.get_ident()}:{uuid.uuid4().hex[:12]}"
+        with self._leases_lock:
+            self._leases.add(lease)
+        return lease
+
+    def _drop_lease(self, lease: str):
+        with self._leases_lock:
+            self._leases.discard(lease)
+
+    def _finish(self, article: Dict, status: str):
+        self.db.finish_summary_job(article['id'], article['job_lease_owner'],
+                                   max_attempts=self.summarizer.max_attempts,
+                                   retry_seconds=self.summarizer.retry_base_seconds)
+
+    def drain(self, progress_callback: Callable[[int, int, str], None] = None,
+              should_stop: Callable[[], bool] = None, max_jobs: int = None,
+              article_callback: Callable[[Dict, str], None] = None) -> Dict:
+        """
+        持续领取并处理任务，直到队列中没有可执行的任务、收到停止请求或处理满 max_jobs 篇
+        :param progress_callback: 参数为 (已完成数, 已领取数, 进度描述)
+        :param article_callback: 每完成一篇调用一次，参数为 (文章, 状态)
+        :return: 与 Summarizer.summarize_articles 相同格式的累计结果
+        """
+        totals = {'success': 0, 'failed': 0, 'skipped': 0, 'cached': 0, 'total': 0}
+        self._stop.clear()
+
+        def stopping() -> bool:
+            return self._stop.is_set() or bool(should_stop and should_stop())
+
+        def on_result(article: Dict, status: str):
+            self._finish(article, status)
+            if article_callback:
+                article_callback(article, status)
+
+        while not stopping():
+            limit = self.batch_size
+            if max_jobs:
+                limit = min(limit, max_jobs - totals['total'])
+                if limit <= 0:
+                    break
+
+            lease = self._new_lease()
+            try:
+                jobs = self.db.claim_summary_jobs(lease, limit, self.lease_seconds)
+                if not jobs:
+                    break
+                logger.info(f"领取 {len(jobs)} 个摘要任务")
+                done_before = totals['total']
+                batch_progress = None
+                if progress_callback:
+                    def batch_progress(done, total, msg):
+                        progress_callback(done_before + done, done_before + total, msg)
+
+                # 先预取正文过短文章的原网页，摘要阶段只读缓存
+                self.summarizer.prefetcher.prefetch(jobs, progress_callback=batch_progress)
+                result = self.summarizer.summarize_articles(jobs, progress_callback=batch_progress,
+                                                            result_callback=on_result)
+                for key in totals:
+                    totals[key] += result.get(key, 0)
+            finally:
+                # 正常情况下任务已逐篇出队或释放，这里只处理中途异常时剩下的任务
+                self.db.release_summary_jobs([lease])
+                self._drop_lease(lease)
+
+        return totals
+